@@ -0,0 +1,113 @@
+"""Linked Node objects against the flat Arena backend.
+
+    python benchmarks/bench_arena.py [units] [modules]
+
+Compares parse time, memory per node, a whole-program pass counting nodes
+by kind, and what the garbage collector pays while ``modules`` parsed
+copies of synthetic_program(units) are held in memory.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from common import best_of, synthetic_program
+
+from chocopy.parser.arena import NODE_CLASSES, Arena
+from chocopy.parser.node import Node
+from chocopy.parser.parser import Parser
+from chocopy.scanner.buffer import TokenBuffer
+
+
+def parse_objects(buffer: TokenBuffer) -> Node:
+    buffer.cursor = 0
+    return Parser(buffer).parse()
+
+
+def parse_arena(buffer: TokenBuffer) -> Arena:
+    buffer.cursor = 0
+    arena = Arena()
+    Parser(buffer, ast=arena).parse()
+    return arena
+
+
+def count_objects(root: Node) -> Counter:
+    counts = Counter()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        counts[type(node)] += 1
+        for name in node._fields:
+            value = getattr(node, name)
+            if isinstance(value, Node):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(value)
+    return counts
+
+
+def count_arena(arena: Arena) -> Counter:
+    return Counter({NODE_CLASSES[code]: n for code, n in Counter(arena.kinds).items()})
+
+
+def held_bytes(func) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return held
+
+
+def collect_time(modules: list) -> tuple[float, int]:
+    """Time of a full collection while ``modules`` are alive."""
+    tracked = len(gc.get_objects())
+    start = time.perf_counter()
+    gc.collect()
+    return time.perf_counter() - start, tracked
+
+
+def main(argv: list[str]):
+    units = int(argv[0]) if argv else 200
+    copies = int(argv[1]) if len(argv) > 1 else 50
+    buffer = TokenBuffer(synthetic_program(units))
+    count = len(parse_arena(buffer))
+    print(f"synthetic_program({units}): {count} nodes")
+
+    objects = parse_objects(buffer)
+    arena = parse_arena(buffer)
+    assert count_objects(objects) == count_arena(arena)
+
+    print("parse")
+    for name, parse in (("objects", parse_objects), ("arena", parse_arena)):
+        elapsed = best_of(lambda: parse(buffer)) * 1e9 / count
+        print(f"  {name:>7}: {elapsed:8.1f} ns/node")
+
+    print("memory")
+    for name, parse in (("objects", parse_objects), ("arena", parse_arena)):
+        held = held_bytes(lambda: parse(buffer))
+        print(f"  {name:>7}: {held / count:8.1f} B/node")
+
+    print("count nodes by kind")
+    for name, tree, count_kinds in (
+        ("objects", objects, count_objects),
+        ("arena", arena, count_arena),
+    ):
+        elapsed = best_of(lambda: count_kinds(tree)) * 1e9 / count
+        print(f"  {name:>7}: {elapsed:8.1f} ns/node")
+
+    print(f"gc.collect() holding {copies} modules")
+    del objects, arena
+    for name, parse in (("objects", parse_objects), ("arena", parse_arena)):
+        modules = [parse(buffer) for _ in range(copies)]
+        elapsed, tracked = collect_time(modules)
+        print(f"  {name:>7}: {elapsed * 1e3:8.1f} ms, {tracked:9d} tracked objects")
+        del modules
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
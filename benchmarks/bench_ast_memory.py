@@ -0,0 +1,51 @@
+"""Memory held by a parsed AST, in bytes per node.
+
+Parses synthetic_program(units) from a prebuilt TokenBuffer under
+tracemalloc and reports what the tree keeps alive once parsing is done:
+
+    python benchmarks/bench_ast_memory.py [units]
+"""
+
+import sys
+import tracemalloc
+
+from common import synthetic_program
+
+from chocopy.parser.node import Node
+from chocopy.parser.parser import Parser
+from chocopy.scanner.buffer import TokenBuffer
+
+
+def count_nodes(root: Node) -> int:
+    count = 0
+    stack = [root]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, Node):
+            count += 1
+            for cls in type(value).__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    stack.append(getattr(value, name, None))
+            stack.extend(getattr(value, "__dict__", {}).values())
+    return count
+
+
+def main(argv: list[str]):
+    units = int(argv[0]) if argv else 500
+    buffer = TokenBuffer(synthetic_program(units))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    program = Parser(buffer).parse()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    nodes = count_nodes(program)
+    print(f"AST of synthetic_program({units}): {nodes} nodes")
+    print(f"  {held / 2**20:7.1f} MiB held, {held / nodes:6.1f} B/node")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
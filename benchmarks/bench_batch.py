@@ -0,0 +1,55 @@
+"""Scaling of the multi-file front end with worker processes.
+
+    python benchmarks/bench_batch.py [files] [units] [workers ...]
+
+Writes ``files`` copies of synthetic_program(units) to a temporary
+directory and parses them with parse_files for each worker count. On a
+machine with N free CPUs the wall time should fall about N-fold.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import synthetic_program
+
+from chocopy.parser.batch import parse_files
+
+
+def main(argv: list[str]):
+    files = int(argv[0]) if argv else 200
+    units = int(argv[1]) if len(argv) > 1 else 5
+    cpus = os.cpu_count() or 1
+    counts = [int(arg) for arg in argv[2:]] or sorted({1, 2, 4, cpus})
+    print(f"{files} files of synthetic_program({units}), {cpus} CPUs")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(files):
+            path = Path(directory) / f"module{i}.choco"
+            path.write_text(synthetic_program(units))
+            paths.append(path)
+
+        serial = None
+        for workers in counts:
+            start = time.perf_counter()
+            results = parse_files(paths, workers=workers)
+            elapsed = time.perf_counter() - start
+            serial = serial or elapsed
+            assert all(result.ok for result in results)
+
+            parse = [result.parse_time for result in results]
+            serialize = sum(result.serialize_time for result in results)
+            print(
+                f"  {workers:>2} workers: {elapsed * 1e3:8.1f} ms "
+                f"({serial / elapsed:4.2f}x), per file "
+                f"parse {sum(parse) / files * 1e3:6.2f} ms mean "
+                f"{max(parse) * 1e3:6.2f} ms max, "
+                f"serialize {serialize / files * 1e3:5.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,52 @@
+"""Parsing against loading from the on-disk parse cache.
+
+    python benchmarks/bench_cache.py [units]
+
+Times scanning and parsing synthetic_program(units), a cache miss (parse,
+serialize, write) and a cache hit (read, deserialize), and reports the
+size of the cache entry.
+"""
+
+import sys
+import tempfile
+
+from common import best_of, synthetic_program
+
+from chocopy.parser.cache import ParseCache
+from chocopy.parser.parser import Parser
+from chocopy.parser.serialize import dumps, loads
+from chocopy.scanner.scanner import Scanner
+
+
+def main(argv: list[str]):
+    units = int(argv[0]) if argv else 300
+    source = synthetic_program(units)
+    data = source.encode()
+    print(f"synthetic_program({units}): {len(data)} bytes")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ParseCache(directory)
+
+        def miss():
+            cache.path(data).unlink(missing_ok=True)
+            cache.parse(data)
+
+        parse = best_of(lambda: Parser(Scanner(source)).parse())
+        missed = best_of(miss)
+        hit = best_of(lambda: cache.parse(data))
+        entry = cache.path(data).read_bytes()
+        decode = best_of(lambda: loads(entry))
+
+    encoded = dumps(Parser(Scanner(source)).parse())
+    assert encoded == entry
+    print(f"  {'scan + parse':>12}: {parse * 1e3:8.1f} ms")
+    print(f"  {'cache miss':>12}: {missed * 1e3:8.1f} ms")
+    print(f"  {'cache hit':>12}: {hit * 1e3:8.1f} ms ({parse / hit:.1f}x faster)")
+    print(f"  {'loads()':>12}: {decode * 1e3:8.1f} ms")
+    print(f"  entry: {len(entry)} bytes")
+    if hit >= parse:
+        sys.exit("loading from the cache is not faster than parsing")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,80 @@
+"""Subtype and join queries on deep class hierarchies.
+
+    python benchmarks/bench_hierarchy.py [depth ...]
+
+Builds a chain of ``depth`` classes with a side branch off every fourth
+one and times random is_subtype and join queries on it. It also type
+checks a program that joins classes from all over such a chain, whose
+cost should grow linearly, not quadratically, with its depth.
+"""
+
+import random
+import sys
+import time
+
+from common import best_of
+
+from chocopy.parser.parser import Parser
+from chocopy.scanner.buffer import TokenBuffer
+from chocopy.semantic.checker import Checker
+from chocopy.semantic.types import ClassInfo, ClassValueType, Hierarchy
+
+
+def chain(depth: int) -> tuple[Hierarchy, list[ClassValueType]]:
+    hierarchy = Hierarchy()
+    base = hierarchy.classes["object"]
+    types = []
+    for i in range(depth):
+        info = ClassInfo(f"C{i}", base)
+        hierarchy.add(info)
+        types.append(info.type)
+        if i % 4 == 0:
+            side = ClassInfo(f"S{i}", info)
+            hierarchy.add(side)
+            types.append(side.type)
+        base = info
+    return hierarchy, types
+
+
+def chain_program(depth: int) -> str:
+    classes = "".join(
+        f"class C{i}({'object' if i == 0 else f'C{i - 1}'}):\n    pass\n"
+        for i in range(depth)
+    )
+    rng = random.Random(depth)
+    statements = "".join(
+        f"print([C{rng.randrange(depth)}(), C{rng.randrange(depth)}()])\n"
+        for _ in range(depth)
+    )
+    return classes + statements
+
+
+def main(argv: list[str]):
+    depths = [int(arg) for arg in argv] or [500, 1000, 2000, 4000]
+    queries = 20_000
+    print(f"random queries on a chain ({queries} each)")
+    for depth in depths:
+        hierarchy, types = chain(depth)
+        rng = random.Random(depth)
+        pairs = [(rng.choice(types), rng.choice(types)) for _ in range(queries)]
+
+        start = time.perf_counter()
+        hierarchy.is_subtype(*pairs[0])
+        setup = time.perf_counter() - start
+        subtype = best_of(lambda: [hierarchy.is_subtype(a, b) for a, b in pairs])
+        join = best_of(lambda: [hierarchy.join(a, b) for a, b in pairs], repeat=1)
+        print(
+            f"  depth {depth:>5}: first query {setup * 1e3:7.2f} ms, "
+            f"is_subtype {subtype * 1e9 / queries:8.1f} ns, "
+            f"join {join * 1e9 / queries:9.1f} ns"
+        )
+
+    print("type checking joins over a chain")
+    for depth in depths:
+        program = Parser(TokenBuffer(chain_program(depth))).parse()
+        elapsed = best_of(lambda: Checker().check(program), repeat=3)
+        print(f"  depth {depth:>5}: {elapsed * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,57 @@
+"""Re-checking a large program after small edits.
+
+    python benchmarks/bench_incremental.py [units ...]
+
+Checks semantic_program(units) with a fresh Checker, then with an
+IncrementalChecker: first whole, then again unchanged, after an edit to
+the body of one function, and after one to an attribute type of the
+class at the root of an inheritance chain. Programs are parsed up front;
+only checking is timed.
+"""
+
+import sys
+import time
+
+from bench_semantic import semantic_program
+from common import best_of
+
+from chocopy.parser.parser import Parser
+from chocopy.scanner.buffer import TokenBuffer
+from chocopy.semantic.checker import Checker
+from chocopy.semantic.incremental import IncrementalChecker
+
+
+def edits(source: str) -> list[tuple[str, str]]:
+    body = source.replace("return total\n", "return total + 1\n", 1)
+    interface = source.replace("size8: int = 8", "size8: bool = True", 1)
+    return [("unchanged", source), ("body edit", body), ("interface edit", interface)]
+
+
+def main(argv: list[str]):
+    for units in [int(arg) for arg in argv] or [500, 1000, 2000]:
+        source = semantic_program(units)
+        program = Parser(TokenBuffer(source)).parse()
+        full = best_of(lambda: Checker(recover=True).check(program), repeat=3)
+        print(f"{units} classes and functions: full check {full * 1e3:8.1f} ms")
+
+        checker = IncrementalChecker()
+        first = best_of(lambda: IncrementalChecker().check(program, source), repeat=3)
+        print(f"  {'first check':<16}{first * 1e3:8.1f} ms")
+        for name, edited in edits(source):
+            edited_program = Parser(TokenBuffer(edited)).parse()
+            elapsed = float("inf")
+            for _ in range(3):
+                # Start from the original each time to redo the same edit.
+                checker.check(program, source)
+                start = time.perf_counter()
+                report = checker.check(edited_program, edited)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            print(
+                f"  {name:<16}{elapsed * 1e3:8.1f} ms, "
+                f"{len(report.checked):5d} checked, {report.skipped:5d} skipped "
+                f"({full / elapsed:5.1f}x faster)"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,156 @@
+"""Execution throughput on classic ChocoPy programs.
+
+    python benchmarks/bench_interpreter.py [name ...]
+
+Runs each program in PROGRAMS, parsed and type checked up front, with
+each engine in ENGINES, and prints its wall time and the number of AST
+nodes evaluated per second. The node count is taken once, by a run of the
+tree-walking Interpreter that counts them, and is the measure of work for
+every run. The closure Compiler's time includes compiling the program,
+and the last column is its speedup over the tree walker; both engines must
+print the same output.
+"""
+
+import io
+import sys
+
+from common import best_of
+
+from chocopy.interpreter.compiler import Compiler
+from chocopy.interpreter.interpreter import Interpreter
+from chocopy.parser.parser import Parser
+from chocopy.scanner.buffer import TokenBuffer
+from chocopy.semantic.checker import Checker
+
+FIB = """def fib(n: int) -> int:
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+print(fib(20))
+"""
+
+SIEVE = """def sieve(limit: int) -> int:
+    marks: [bool] = None
+    ip: int = 2
+    jp: int = 0
+    count: int = 0
+    marks = [False]
+    while len(marks) <= limit:
+        marks = marks + marks
+    while ip <= limit:
+        if not marks[ip]:
+            count = count + 1
+            jp = ip + ip
+            while jp <= limit:
+                marks[jp] = True
+                jp = jp + ip
+        ip = ip + 1
+    return count
+
+print(sieve(50000))
+"""
+
+NESTED = """total: int = 0
+ip: int = 0
+jp: int = 0
+while ip < 300:
+    jp = 0
+    while jp < 300:
+        total = total + ip * jp % 7
+        jp = jp + 1
+    ip = ip + 1
+print(total)
+"""
+
+OBJECTS = """class Node(object):
+    value: int = 0
+    next: "Node" = None
+    def __init__(self: "Node") -> object:
+        pass
+    def total(self: "Node") -> int:
+        node: Node = None
+        sum: int = 0
+        node = self
+        while not (node is None):
+            sum = sum + node.value
+            node = node.next
+        return sum
+
+class Tail(Node):
+    def total(self: "Tail") -> int:
+        return self.value * 2
+
+head: Node = None
+item: Node = None
+ip: int = 0
+head = Tail()
+while ip < 2000:
+    item = Node()
+    item.value = ip
+    item.next = head
+    head = item
+    ip = ip + 1
+for ip in [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]:
+    print(head.total() + ip)
+"""
+
+PROGRAMS = {"fib": FIB, "sieve": SIEVE, "nested": NESTED, "objects": OBJECTS}
+ENGINES = {"tree": Interpreter, "closures": Compiler}
+
+
+def load(source: str):
+    program = Parser(TokenBuffer(source)).parse()
+    Checker().check(program)
+    return program
+
+
+def count_nodes(program) -> int:
+    """Nodes the Interpreter evaluates or executes to run ``program``."""
+    steps = 0
+
+    def counted(rule):
+        def step(*args):
+            nonlocal steps
+            steps += 1
+            return rule(*args)
+
+        return step
+
+    class Counting(Interpreter):
+        EXPRESSIONS = {
+            cls: counted(rule) for cls, rule in Interpreter.EXPRESSIONS.items()
+        }
+        STATEMENTS = {
+            cls: counted(rule) for cls, rule in Interpreter.STATEMENTS.items()
+        }
+
+    Counting(io.StringIO()).run(program)
+    return steps
+
+
+def output(engine: type, program) -> str:
+    out = io.StringIO()
+    engine(out).run(program)
+    return out.getvalue()
+
+
+def main(argv: list[str]):
+    for name in argv or list(PROGRAMS):
+        program = load(PROGRAMS[name])
+        nodes = count_nodes(program)
+        outputs = {output(engine, program) for engine in ENGINES.values()}
+        assert len(outputs) == 1, f"{name}: the engines disagree"
+        times = {}
+        for label, engine in ENGINES.items():
+            elapsed = best_of(lambda: engine(io.StringIO()).run(program), repeat=3)
+            times[label] = elapsed
+            speedup = times["tree"] / elapsed
+            print(
+                f"{name:<8}{label:<9}{nodes:>10} nodes {elapsed * 1e3:9.1f} ms "
+                f"{nodes / elapsed / 1e6:7.2f} M nodes/s {speedup:6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,81 @@
+"""Peak RSS of holding a whole token stream in memory.
+
+Variants: dict-backed Token objects, slotted Token objects and TokenBuffer.
+
+Each variant runs in a fresh interpreter so peak RSS is not shared:
+
+    python benchmarks/bench_memory.py [units]
+"""
+
+import subprocess
+import sys
+
+from common import synthetic_program
+
+from chocopy.common import token
+from chocopy.scanner import scanner
+from chocopy.scanner.buffer import TokenBuffer
+
+
+def use_dict_tokens():
+    """Swap in the former dict-backed Token and Position dataclasses."""
+    from dataclasses import dataclass, fields
+
+    def unslotted(cls):
+        namespace = {"__annotations__": dict(cls.__annotations__)}
+        for field in fields(cls):
+            namespace[field.name] = field.default
+        return dataclass(type(cls.__name__, (), namespace))
+
+    scanner.Position = unslotted(token.Position)
+    scanner.Token = unslotted(token.Token)
+
+
+def measure(variant: str, units: int):
+    import resource
+
+    if variant == "dict":
+        use_dict_tokens()
+
+    source = synthetic_program(units)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if variant == "buffer":
+        tokens = TokenBuffer(source)
+    else:
+        sc = scanner.Scanner(source, fast=True)
+        tokens = []
+        while True:
+            t = sc.scan_token()
+            tokens.append(t)
+            if t.tokentyp == token.TokenType.EOF:
+                break
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{len(source)} {len(tokens)} {baseline} {peak}")
+
+
+def main(argv: list[str]):
+    units = int(argv[0]) if argv else 2000
+    print(f"token stream of synthetic_program({units})")
+    for variant in ("dict", "slots", "buffer"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--measure", variant, str(units)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        chars, count, baseline, peak = map(int, out)
+        grown = (peak - baseline) * 1024
+        print(
+            f"  {variant:>6}: {count} tokens from {chars} chars,"
+            f" peak RSS {peak / 1024:7.1f} MiB"
+            f" (+{grown / 2**20:6.1f} MiB, {grown / count:6.1f} B/token)"
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        measure(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(sys.argv[1:])
@@ -0,0 +1,172 @@
+"""Parser micro-benchmarks.
+
+Run from the repository root:
+
+    python benchmarks/bench_parser.py [name ...]
+
+Every benchmark reports metrics where lower is better. ``--save FILE``
+records them as a baseline, and ``--compare FILE`` fails if a metric got
+worse than the baseline by more than ``--tolerance``.
+"""
+
+import argparse
+import json
+import sys
+
+from common import best_of, synthetic_program
+
+from chocopy.parser.parser import Parser
+from chocopy.scanner.buffer import TokenBuffer
+from chocopy.scanner.scanner import tokenize_all
+
+EXPRESSIONS = [
+    "a + b * c - d // e % f",
+    "not a and b or c and not d",
+    "a < b and b <= c or c == d and d != e",
+    "-a * -b + (c - d) * (e + f) // g",
+    "xs[i + 1].value(a, b * 2)[0] is None",
+    "[a, b + c, d * e][i] if a > b else -c",
+]
+
+
+def expression_source(lines: int) -> str:
+    return "".join(
+        f"result = {EXPRESSIONS[i % len(EXPRESSIONS)]}\n" for i in range(lines)
+    )
+
+
+def count_calls(func) -> int:
+    """Number of Python-level function calls made while running ``func``."""
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event == "call":
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        func()
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def measure(name: str, source: str) -> dict[str, float]:
+    """Parse ``source`` from a TokenBuffer and report per-token costs.
+
+    Calls per token are deterministic, so they catch hot-path regressions
+    that the wall time of a noisy machine hides.
+    """
+    count = len(tokenize_all(source))
+    buffer = TokenBuffer(source)
+
+    def parse():
+        buffer.cursor = 0
+        Parser(buffer).parse()
+
+    # Token access is the same for every parser; count it out.
+    def drain():
+        buffer.cursor = 0
+        for _ in range(count):
+            buffer.scan_token()
+
+    calls = (count_calls(parse) - count_calls(drain)) / count
+    elapsed = best_of(parse) * 1e9 / count
+    print(f"{name} ({count} tokens)")
+    print(f"  {calls:8.2f} calls/token {elapsed:8.1f} ns/token")
+    return {"calls/token": calls, "ns/token": elapsed}
+
+
+def bench_expressions():
+    """Expression-heavy assignments."""
+    return measure("expressions", expression_source(3000))
+
+
+def bench_statements():
+    """Simple statements: pass, return, assignment and expression lines."""
+    body = "".join(
+        f"    pass\n    xs{i}[0] = ob.ab{i}\n    print(ab{i})\n    return\n"
+        for i in range(2000)
+    )
+    return measure("statements", f"def f() -> object:\n{body}")
+
+
+def bench_program():
+    """Whole-program parse of the synthetic benchmark program."""
+    return measure("program", synthetic_program(100))
+
+
+def bench_deep():
+    """Time per nesting level of deep expressions and blocks."""
+    print("deep nesting")
+    results = {}
+    cases = {
+        "not": lambda n: "not " * n + "ab\n",
+        "parentheses": lambda n: "(" * n + "ab" + ")" * n + "\n",
+        "blocks": lambda n: "".join(
+            "    " * level + "while ab:\n" for level in range(n)
+        )
+        + "    " * n
+        + "pass\n",
+    }
+    for name, make in cases.items():
+        sizes = (100, 1_000) if name == "blocks" else (1_000, 10_000, 100_000)
+        for depth in sizes:
+            buffer = TokenBuffer(make(depth))
+
+            def parse():
+                buffer.cursor = 0
+                Parser(buffer).parse()
+
+            elapsed = best_of(parse, repeat=3) * 1e9 / depth
+            print(f"  {name:>11} {depth:>7}: {elapsed:8.1f} ns/level")
+        results[f"{name} ns/level"] = elapsed
+    return results
+
+
+BENCHMARKS = {
+    "expressions": bench_expressions,
+    "statements": bench_statements,
+    "program": bench_program,
+    "deep": bench_deep,
+}
+
+
+def regressions(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> list[str]:
+    return [
+        f"{key}: {value:.2f} vs {baseline[key]:.2f}"
+        for key, value in results.items()
+        if key in baseline and value > baseline[key] * (1 + tolerance)
+    ]
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*", choices=[[], *BENCHMARKS])
+    parser.add_argument("--save", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        for metric, value in BENCHMARKS[name]().items():
+            results[f"{name} {metric}"] = value
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            failed = regressions(results, json.load(f), args.tolerance)
+        for line in failed:
+            print(f"regression: {line}")
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,181 @@
+"""Scanner micro-benchmarks.
+
+Run from the repository root:
+
+    python benchmarks/bench_scanner.py [name ...]
+"""
+
+import sys
+import time
+
+from common import best_of, synthetic_program
+
+from chocopy.common.token import TokenType
+from chocopy.scanner.incremental import IncrementalScanner
+from chocopy.scanner.scanner import Scanner, tokenize, tokenize_all
+
+
+def drain(scanner: Scanner) -> int:
+    count = 0
+    while scanner.scan_token().tokentyp != TokenType.EOF:
+        count += 1
+    return count
+
+
+def nested_blocks(depth: int, repeat: int = 1) -> str:
+    lines = []
+    for _ in range(repeat):
+        for level in range(depth):
+            lines.append("    " * level + "if True:")
+        lines.append("    " * depth + "pass")
+    lines.append("pass")
+    return "\n".join(lines)
+
+
+def bench_dedent_cascade():
+    """Time per DEDENT while draining an EOF cascade of growing depth."""
+    print("dedent cascade at EOF")
+    for depth in (1_000, 10_000, 100_000):
+        scanner = Scanner("")
+        scanner.indent_stack = list(range(0, 4 * depth, 4))
+
+        start = time.perf_counter()
+        count = drain(scanner)
+        elapsed = time.perf_counter() - start
+
+        print(f"  depth {depth:>7}: {elapsed * 1e9 / count:8.1f} ns/token")
+
+
+def bench_nested_blocks():
+    """Time per token for repeated 32-level nesting and dedent."""
+    print("nested blocks (depth 32)")
+    for repeat in (10, 100, 1_000):
+        source = nested_blocks(32, repeat)
+
+        start = time.perf_counter()
+        count = drain(Scanner(source))
+        elapsed = time.perf_counter() - start
+
+        print(f"  {count:>7} tokens: {elapsed * 1e9 / count:8.1f} ns/token")
+
+
+def bench_engines():
+    """Default character-wise engine against the regex fast path."""
+    source = synthetic_program(200)
+    print(f"engines ({len(source)} chars)")
+    for name, fast in (("default", False), ("fast", True)):
+        count = drain(Scanner(source, fast=fast))
+        elapsed = best_of(lambda: drain(Scanner(source, fast=fast)))
+        print(
+            f"  {name:>7}: {elapsed * 1e3:8.1f} ms"
+            f" {elapsed * 1e9 / count:8.1f} ns/token"
+        )
+
+
+def bench_lazy_positions():
+    """Eager per-token line/column tracking against lazy positions."""
+    source = synthetic_program(200)
+    print(f"positions ({len(source)} chars)")
+    for name, options in (
+        ("eager", {"fast": True}),
+        ("lazy", {"lazy_positions": True}),
+    ):
+        count = drain(Scanner(source, **options))
+        elapsed = best_of(lambda: drain(Scanner(source, **options)))
+        print(f"  {name:>7}: {elapsed * 1e9 / count:8.1f} ns/token")
+
+    lines = Scanner(source, lazy_positions=True).lines
+    assert lines is not None
+    offsets = range(0, len(source), 7)
+    elapsed = best_of(lambda: [lines.locate(offset) for offset in offsets])
+    print(f"  lookup: {elapsed * 1e9 / len(offsets):8.1f} ns/position")
+
+
+def bench_iteration():
+    """Overhead of the ways to pull a whole token stream."""
+    source = synthetic_program(50)
+
+    def scan_token_loop():
+        sc = Scanner(source, fast=True)
+        tokens = []
+        while True:
+            token = sc.scan_token()
+            tokens.append(token)
+            if token.tokentyp == TokenType.EOF:
+                return tokens
+
+    paths = {
+        "scan_token loop": scan_token_loop,
+        "for ... in Scanner": lambda: [t for t in Scanner(source, fast=True)],
+        "tokenize()": lambda: [t for t in tokenize(source, fast=True)],
+        "tokenize_all()": lambda: tokenize_all(source, fast=True),
+    }
+    count = len(tokenize_all(source))
+    print(f"iteration ({count} tokens)")
+    for name, func in paths.items():
+        elapsed = best_of(func, repeat=20)
+        print(f"  {name:>18}: {elapsed * 1e9 / count:8.1f} ns/token")
+
+
+def bench_operators():
+    """Operator-dense source: long arithmetic and comparison chains."""
+    chain = "a+b-c*d//e%f<=g>=h==i!=j<k>l-(m+n)*[o,p][q]"
+    source = "\n".join(f"x{i} = {chain}" for i in range(2000))
+    count = drain(Scanner(source))
+    print(f"operators ({count} tokens)")
+    for name, fast in (("default", False), ("fast", True)):
+        elapsed = best_of(lambda: drain(Scanner(source, fast=fast)), repeat=10)
+        print(f"  {name:>7}: {elapsed * 1e9 / count:8.1f} ns/token")
+
+
+def bench_incremental():
+    """Per-keystroke cost: incremental edit against a full rescan, at
+    growing buffer sizes; an edit should cost the same at every size."""
+    keystrokes = "total2"
+    for units in (200, 800, 3200):
+        source = synthetic_program(units)
+        start = source.index("total = total + items[i]", len(source) // 2)
+        line = source.count("\n", 0, start) + 1
+        char = start - source.rfind("\n", 0, start) - 1
+        print(f"incremental ({len(source)} chars, {len(keystrokes)} keystrokes)")
+
+        def full():
+            text = source
+            for i, c in enumerate(keystrokes):
+                text = text[: start + i] + c + text[start + i :]
+                tokenize_all(text, fast=True)
+
+        inc = IncrementalScanner(source)
+
+        def incremental():
+            # Type the keystrokes, then delete them in one more edit.
+            for i, c in enumerate(keystrokes):
+                inc.edit((line, char + i), (line, char + i), c)
+            inc.edit((line, char), (line, char + len(keystrokes)), "")
+
+        for name, func, edits in (
+            ("full", full, len(keystrokes)),
+            ("incremental", incremental, len(keystrokes) + 1),
+        ):
+            elapsed = best_of(func, repeat=3)
+            print(f"  {name:>11}: {elapsed * 1e3 / edits:8.3f} ms/keystroke")
+
+
+BENCHMARKS = {
+    "dedent": bench_dedent_cascade,
+    "nested": bench_nested_blocks,
+    "engines": bench_engines,
+    "positions": bench_lazy_positions,
+    "iteration": bench_iteration,
+    "operators": bench_operators,
+    "incremental": bench_incremental,
+}
+
+
+def main(argv: list[str]):
+    for name in argv or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
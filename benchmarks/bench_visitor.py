@@ -0,0 +1,225 @@
+"""Visitor dispatch against hand-written isinstance chains.
+
+    python benchmarks/bench_visitor.py [units]
+
+Every contender runs the same pass over synthetic_program(units): count
+variable references, calls and binary operators. The isinstance version
+is what a pass looks like without traversal infrastructure: a recursive
+function testing the node classes in node.py order.
+"""
+
+import sys
+
+from bench_parser import count_calls
+from common import best_of, synthetic_program
+
+from chocopy.parser.node import (
+    AssignStmt,
+    BinaryExpr,
+    CallExpr,
+    ClassDefinition,
+    ClassType,
+    ExprStmt,
+    ForStmt,
+    FunctionDefinition,
+    GlobalDeclaration,
+    IDStringLiteral,
+    IfExpr,
+    IfStmt,
+    IndexExpr,
+    ListLiteral,
+    ListType,
+    Literal,
+    MemberExpr,
+    NoneLocalDeclaration,
+    PassStmt,
+    Program,
+    ReturnStmt,
+    TypedVar,
+    UnaryExpr,
+    VariableDefinition,
+    VariableNode,
+    WhileStmt,
+)
+from chocopy.parser.parser import Parser
+from chocopy.parser.visitor import NodeVisitor, NodeWalker, walk
+from chocopy.scanner.buffer import TokenBuffer
+
+
+class Counts:
+    def __init__(self):
+        self.names = self.calls = self.operators = 0
+
+
+def count_isinstance(node, counts: Counts):
+    if isinstance(node, Literal) or isinstance(node, IDStringLiteral):
+        pass
+    elif isinstance(node, ClassType):
+        pass
+    elif isinstance(node, ListType):
+        count_isinstance(node.element_type, counts)
+    elif isinstance(node, TypedVar):
+        count_isinstance(node.type, counts)
+    elif isinstance(node, VariableDefinition):
+        count_isinstance(node.var, counts)
+        count_isinstance(node.literal, counts)
+    elif isinstance(node, (GlobalDeclaration, NoneLocalDeclaration)):
+        pass
+    elif isinstance(node, UnaryExpr):
+        count_isinstance(node.operand, counts)
+    elif isinstance(node, BinaryExpr):
+        counts.operators += 1
+        count_isinstance(node.left, counts)
+        count_isinstance(node.right, counts)
+    elif isinstance(node, MemberExpr):
+        count_isinstance(node.obj, counts)
+        count_isinstance(node.member, counts)
+    elif isinstance(node, IndexExpr):
+        count_isinstance(node.list_obj, counts)
+        count_isinstance(node.index, counts)
+    elif isinstance(node, CallExpr):
+        counts.calls += 1
+        count_isinstance(node.function, counts)
+        for arg in node.args:
+            count_isinstance(arg, counts)
+    elif isinstance(node, ListLiteral):
+        for element in node.elements:
+            count_isinstance(element, counts)
+    elif isinstance(node, VariableNode):
+        counts.names += 1
+    elif isinstance(node, IfExpr):
+        count_isinstance(node.node, counts)
+        count_isinstance(node.cond, counts)
+        count_isinstance(node.else_branch, counts)
+    elif isinstance(node, IfStmt):
+        count_isinstance(node.condition, counts)
+        for stmt in node.then_block + node.else_block:
+            count_isinstance(stmt, counts)
+    elif isinstance(node, WhileStmt):
+        count_isinstance(node.condition, counts)
+        for stmt in node.body:
+            count_isinstance(stmt, counts)
+    elif isinstance(node, ForStmt):
+        count_isinstance(node.iterable, counts)
+        for stmt in node.body:
+            count_isinstance(stmt, counts)
+    elif isinstance(node, AssignStmt):
+        count_isinstance(node.target, counts)
+        count_isinstance(node.value, counts)
+    elif isinstance(node, ExprStmt):
+        count_isinstance(node.expr, counts)
+    elif isinstance(node, ReturnStmt):
+        if node.value is not None:
+            count_isinstance(node.value, counts)
+    elif isinstance(node, PassStmt):
+        pass
+    elif isinstance(node, FunctionDefinition):
+        for child in node.params + node.var_defs + node.func_defs:
+            count_isinstance(child, counts)
+        count_isinstance(node.return_type, counts)
+        for stmt in node.statements:
+            count_isinstance(stmt, counts)
+    elif isinstance(node, ClassDefinition):
+        for child in node.var_defs + node.method_defs:
+            count_isinstance(child, counts)
+    elif isinstance(node, Program):
+        for child in node.declarations + node.statements:
+            count_isinstance(child, counts)
+
+
+class CountVisitor(NodeVisitor):
+    def __init__(self):
+        self.counts = Counts()
+
+    def visit_VariableNode(self, node):
+        self.counts.names += 1
+
+    def visit_CallExpr(self, node):
+        self.counts.calls += 1
+        self.generic_visit(node)
+
+    def visit_BinaryExpr(self, node):
+        self.counts.operators += 1
+        self.generic_visit(node)
+
+
+class CountWalker(NodeWalker):
+    def __init__(self):
+        self.counts = Counts()
+
+    def enter_VariableNode(self, node):
+        self.counts.names += 1
+
+    def enter_CallExpr(self, node):
+        self.counts.calls += 1
+
+    def enter_BinaryExpr(self, node):
+        self.counts.operators += 1
+
+
+def run_isinstance(program) -> Counts:
+    counts = Counts()
+    count_isinstance(program, counts)
+    return counts
+
+
+def run_visitor(program) -> Counts:
+    visitor = CountVisitor()
+    visitor.visit(program)
+    return visitor.counts
+
+
+def run_walker(program) -> Counts:
+    walker = CountWalker()
+    walker.walk(program)
+    return walker.counts
+
+
+def run_walk(program) -> Counts:
+    counts = Counts()
+    for node in walk(program):
+        cls = type(node)
+        if cls is VariableNode:
+            counts.names += 1
+        elif cls is CallExpr:
+            counts.calls += 1
+        elif cls is BinaryExpr:
+            counts.operators += 1
+    return counts
+
+
+def main(argv: list[str]):
+    units = int(argv[0]) if argv else 500
+    program = Parser(TokenBuffer(synthetic_program(units))).parse()
+    nodes = sum(1 for _ in walk(program))
+    print(f"synthetic_program({units}): {nodes} nodes")
+
+    expected = vars(run_isinstance(program))
+    for name, run in (
+        ("isinstance", run_isinstance),
+        ("NodeVisitor", run_visitor),
+        ("NodeWalker", run_walker),
+        ("walk()", run_walk),
+    ):
+        assert vars(run(program)) == expected
+        calls = count_calls(lambda: run(program)) / nodes
+        elapsed = best_of(lambda: run(program)) * 1e9 / nodes
+        print(f"  {name:>11}: {calls:6.2f} calls/node {elapsed:8.1f} ns/node")
+
+    depth = 100_000
+    deep = Parser(TokenBuffer("-" * depth + "ab\n")).parse()
+    print(f"{depth} nested unary operators")
+    for name, run in (
+        ("isinstance", run_isinstance),
+        ("NodeVisitor", run_visitor),
+        ("NodeWalker", run_walker),
+    ):
+        try:
+            elapsed = best_of(lambda: run(deep), repeat=3) * 1e9 / depth
+            print(f"  {name:>11}: {elapsed:8.1f} ns/level")
+        except RecursionError:
+            print(f"  {name:>11}: RecursionError")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,60 @@
+"""Helpers shared by the benchmark scripts."""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+CLASS = """class Point{i}(object):
+    x: int = 0
+    y: int = {i}
+    label: str = "point\\t{i}"
+
+    def move(self: "Point{i}", dx: int, dy: int) -> object:
+        self.x = self.x + dx * 2 - dy // 3 % 7
+        self.y = self.y - (dx + dy) * {i}
+
+"""
+
+VARIABLE = """values{i}: [int] = None
+"""
+
+FUNCTION = """def sum{i}(items: [int]) -> int:
+    total: int = 0
+    i: int = 0
+    # walk the list
+    while i < len(items) and not total > 2147483:
+        total = total + items[i] * {i} // 4
+        i = i + 1
+    return total if total >= 0 else -total
+
+"""
+
+STATEMENT = """values{i} = [1, 2, 3, {i}, 5]
+if sum{i}(values{i}) == {i} or values{i}[0] != 1:
+    print("mismatch {i}")
+else:
+    print(sum{i}(values{i}))
+"""
+
+
+def synthetic_program(units: int) -> str:
+    """Return a valid ChocoPy program with ``units`` classes, globals,
+    functions and statement groups."""
+    return "".join(
+        template.format(i=i)
+        for template in (CLASS, VARIABLE, FUNCTION, STATEMENT)
+        for i in range(units)
+    )
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Return the fastest wall time of ``repeat`` calls to ``func``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,247 @@
+"""The ``chocopy`` command: scan, parse and run ChocoPy files.
+
+    chocopy [--tokens | --ast | --run] [--engine {closures,tree}] [--recover]
+            [--time-phases] [--profile [FILE]] FILE ...
+
+Errors go to stderr and make the exit status 1. Timings and profiles go to
+stderr as well, so that token and AST dumps and program output on stdout
+stay clean.
+"""
+
+import argparse
+import cProfile
+import pstats
+import sys
+import time
+from typing import Any, BinaryIO, Iterator, Optional, TextIO
+
+from chocopy.common.errors import ChocoPyError
+from chocopy.common.token import Token
+from chocopy.interpreter.compiler import Compiler
+from chocopy.interpreter.interpreter import Interpreter
+from chocopy.parser.node import Node, Program
+from chocopy.parser.parser import Parser
+from chocopy.parser.visitor import walk
+from chocopy.scanner.buffer import TokenBuffer
+from chocopy.scanner.scanner import Scanner
+from chocopy.semantic.checker import Checker
+
+PHASES = (("read", "bytes"), ("scan", "tokens"), ("parse", "nodes"))
+ENGINES = {"closures": Compiler, "tree": Interpreter}
+
+
+def format_token(token: Token) -> str:
+    pos = token.position
+    return f"{pos.line}:{pos.column}\t{token.tokentyp.name}\t{token.lexeme!r}"
+
+
+def format_tree(root: Node) -> Iterator[str]:
+    """Lines of an indented dump of ``root``, one node or field per line."""
+    # (indent, field name, value) still to print; works at any depth.
+    stack: list[tuple[int, str, Any]] = [(0, "", root)]
+    while stack:
+        indent, name, value = stack.pop()
+        prefix = "  " * indent + (f"{name}:" if name else "")
+        if isinstance(value, list):
+            if value:
+                yield prefix
+                stack.extend((indent + 1, "", item) for item in reversed(value))
+            else:
+                yield prefix + " []"
+            continue
+        scalars = []
+        children = []
+        for field in value._fields:
+            item = getattr(value, field)
+            if isinstance(item, (Node, list)):
+                children.append((indent + 1, field, item))
+            else:
+                scalars.append(f" {field}={item!r}")
+        pos = value.pos
+        head = f"{type(value).__name__} [{pos.line}, {pos.column}]"
+        yield (prefix + " " if name else prefix) + head + "".join(scalars)
+        stack.extend(reversed(children))
+
+
+class Run:
+    """One invocation: the files, what to print, and the phase totals."""
+
+    def __init__(self, args: argparse.Namespace, out: TextIO, err: TextIO):
+        self.args = args
+        self.out = out
+        self.err = err
+        self.times = dict.fromkeys((name for name, _ in PHASES), 0.0)
+        self.counts = dict.fromkeys((name for name, _ in PHASES), 0)
+        self.failed = False
+        # Programs run on a thread of their own, which the profile follows.
+        self.profile = cProfile.Profile() if args.profile else None
+
+    def compile(self, path: str):
+        try:
+            f = open(path, "rb")
+        except OSError as error:
+            print(f"chocopy: {error}", file=self.err)
+            self.failed = True
+            return
+
+        args = self.args
+        with f:
+            try:
+                if args.time_phases:
+                    program, diagnostics = self.compile_phases(f)
+                else:
+                    program, diagnostics = self.compile_stream(f)
+            except ChocoPyError as error:
+                program, diagnostics = None, [error]
+            except (OSError, UnicodeDecodeError) as error:
+                # The file is decoded while it is scanned, so this can come
+                # after some of its tokens have been printed.
+                print(f"{path}: {error}", file=self.err)
+                self.failed = True
+                return
+
+        for error in diagnostics:
+            print(f"{path}: {error}", file=self.err)
+        self.failed |= bool(diagnostics)
+        if program is not None and args.ast:
+            for line in format_tree(program):
+                print(line, file=self.out)
+        if program is not None and args.run and not diagnostics:
+            self.execute(path, program)
+
+    def execute(self, path: str, program: Program):
+        """Type check ``program`` and run it if it is well typed."""
+        try:
+            Checker().check(program)
+            ENGINES[self.args.engine](self.out).run(program, self.profile)
+        except ChocoPyError as error:
+            print(f"{path}: {error}", file=self.err)
+            self.failed = True
+
+    def compile_stream(self, f: BinaryIO) -> tuple[Optional[Program], list]:
+        """Scan while parsing, without reading the file whole."""
+        sc = Scanner.from_file(f)
+        if self.args.tokens:
+            for token in sc:
+                print(format_token(token), file=self.out)
+            return None, []
+        parser = Parser(sc, recover=self.args.recover)
+        return parser.parse(), parser.diagnostics
+
+    def compile_phases(self, f: BinaryIO) -> tuple[Optional[Program], list]:
+        """Read, scan and parse one phase at a time and add up their cost."""
+        start = time.perf_counter()
+        data = f.read()
+        source = data.decode()
+        read = time.perf_counter()
+        self.times["read"] += read - start
+        self.counts["read"] += len(data)
+
+        buffer = TokenBuffer(source)
+        scanned = time.perf_counter()
+        self.times["scan"] += scanned - read
+        self.counts["scan"] += len(buffer)
+        if self.args.tokens:
+            # As when streaming, the tokens up to the first bad one.
+            first, error = buffer.errors[0] if buffer.errors else (len(buffer), None)
+            for i in range(first):
+                print(format_token(buffer.token(i)), file=self.out)
+            if error is not None:
+                raise error
+            return None, []
+
+        parser = Parser(buffer, recover=self.args.recover)
+        program = parser.parse()
+        self.times["parse"] += time.perf_counter() - scanned
+        self.counts["parse"] += sum(1 for _ in walk(program))
+        return program, parser.diagnostics
+
+    def report_phases(self):
+        print(f"{'phase':<8}{'ms':>10}{'count':>12}{'per second':>16}", file=self.err)
+        for name, unit in PHASES:
+            elapsed = self.times[name]
+            count = self.counts[name]
+            rate = f"{count / elapsed:14.0f}" if elapsed else " " * 14
+            print(
+                f"{name:<8}{elapsed * 1e3:10.2f}{count:12d}  {rate} {unit}/s",
+                file=self.err,
+            )
+        total = sum(self.times.values())
+        print(f"{'total':<8}{total * 1e3:10.2f}", file=self.err)
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="chocopy", description="Scan, parse and run ChocoPy files."
+    )
+    parser.add_argument("files", nargs="+", metavar="FILE")
+    dump = parser.add_mutually_exclusive_group()
+    dump.add_argument("--tokens", action="store_true", help="print the tokens")
+    dump.add_argument("--ast", action="store_true", help="print the syntax tree")
+    dump.add_argument(
+        "--run", action="store_true", help="type check and run the program"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="closures",
+        help="run by compiling to closures or by walking the syntax tree "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--recover",
+        action="store_true",
+        help="report every syntax error instead of stopping at the first",
+    )
+    parser.add_argument(
+        "--time-phases",
+        action="store_true",
+        help="run read, scan and parse one after the other and print the "
+        "wall time and bytes, tokens and nodes of each",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="run under cProfile and print the top functions, or save the "
+        "stats to FILE for pstats or snakeviz",
+    )
+    parser.add_argument(
+        "--profile-limit",
+        type=int,
+        default=25,
+        metavar="N",
+        help="functions to print with --profile (default: %(default)s)",
+    )
+    return parser
+
+
+def main(
+    argv: Optional[list[str]] = None,
+    out: TextIO = sys.stdout,
+    err: TextIO = sys.stderr,
+) -> int:
+    args = argument_parser().parse_args(argv)
+    run = Run(args, out, err)
+
+    profile = run.profile
+    if profile is not None:
+        profile.enable()
+    for path in args.files:
+        run.compile(path)
+    if profile is not None:
+        profile.disable()
+        if args.profile == "-":
+            stats = pstats.Stats(profile, stream=err)
+            stats.sort_stats("cumulative").print_stats(args.profile_limit)
+        else:
+            profile.dump_stats(args.profile)
+
+    if args.time_phases:
+        run.report_phases()
+    return 1 if run.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
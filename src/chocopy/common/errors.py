@@ -18,3 +18,7 @@ class SyntaxError(ChocoPyError):
 
 class SemanticError(ChocoPyError):
     pass
+
+
+class RuntimeError(ChocoPyError):
+    pass
@@ -67,9 +67,14 @@ class TokenType(enum.Enum):
     INDENT = "indent"
     DEDENT = "dedent"
 
+    # Members are singletons, so identity hashing is enough and keeps set
+    # and dict lookups on token types in C; Enum's default is Python code.
+    __hash__ = object.__hash__
+
 
 OPERATORS = {
     "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
     "*": TokenType.MULTIPLY,
     "%": TokenType.PERCENT,
     "(": TokenType.BRACKET_LEFT,
@@ -79,6 +84,15 @@ OPERATORS = {
     ",": TokenType.COMMA,
     ":": TokenType.COLON,
     ".": TokenType.DOT,
+    "<": TokenType.LESS,
+    ">": TokenType.GREATER,
+    "=": TokenType.EQUAL,
+    "//": TokenType.DOUBLE_SLASH,
+    "->": TokenType.ARROW,
+    "<=": TokenType.LESS_EQUAL,
+    ">=": TokenType.GREATER_EQUAL,
+    "==": TokenType.DOUBLE_EQUAL,
+    "!=": TokenType.NOT_EQUAL,
 }
 
 
@@ -122,13 +136,13 @@ KEYWORDS = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     line: int
     column: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     tokentyp: TokenType
     lexeme: str
@@ -0,0 +1,692 @@
+import cProfile
+import sys
+from typing import Any, Callable, Optional, TextIO
+
+from chocopy.common.errors import RuntimeError
+from chocopy.interpreter.interpreter import NEXT
+from chocopy.interpreter.runtime import (
+    INT_MAX,
+    INT_MIN,
+    ClassValue,
+    Instance,
+    divide,
+    length,
+    modulo,
+    run_deep,
+    text,
+    wrap,
+)
+from chocopy.parser.node import (
+    AssignStmt,
+    BinaryExpr,
+    BoolLiteral,
+    CallExpr,
+    ClassDefinition,
+    ErrorNode,
+    Expr,
+    ExprStmt,
+    ForStmt,
+    FunctionDefinition,
+    GlobalDeclaration,
+    IDStringLiteral,
+    IfExpr,
+    IfStmt,
+    IndexExpr,
+    IntegerLiteral,
+    ListLiteral,
+    Literal,
+    MemberExpr,
+    NoneLiteral,
+    NoneLocalDeclaration,
+    PassStmt,
+    Program,
+    ReturnStmt,
+    Stmt,
+    StringLiteral,
+    UnaryExpr,
+    VariableDefinition,
+    VariableNode,
+    WhileStmt,
+)
+
+# A frame is a list: the frame of the enclosing function, or None, in slot
+# 0 and the variables of one call after it. Code takes its frame and gives
+# a value (expressions) or NEXT or the value returned (statements).
+Frame = list
+Code = Callable[[Frame], Any]
+# Where a variable lives: in the global slot ``index`` when ``depth`` is
+# GLOBAL, else in slot ``index`` of the frame ``depth`` functions out.
+Location = tuple[int, int]
+GLOBAL = -1
+
+
+def literal_value(node: Expr) -> Any:
+    if isinstance(node, IDStringLiteral):
+        return node.name
+    assert isinstance(node, Literal)
+    return node.val
+
+
+def next_statement(frame: Frame) -> Any:
+    return NEXT
+
+
+class Scope:
+    """Slots of the variables of the global scope or of one function."""
+
+    __slots__ = ("slots", "parent", "declared", "first")
+
+    def __init__(self, parent: Optional["Scope"], first: int):
+        self.slots: dict[str, int] = {}
+        self.parent = parent
+        # Names declared global or nonlocal here, and where they live.
+        self.declared: dict[str, Location] = {}
+        # Slot numbers in a frame start after the link to the outer frame.
+        self.first = first
+
+    def add(self, name: str) -> int:
+        slot = self.slots[name] = self.first + len(self.slots)
+        return slot
+
+
+class Compiler:
+    """Compiles a type-checked Program into nested Python closures once,
+    then runs those.
+
+    Every node becomes a closure that calls the closures of its children
+    directly, so running a program does no dispatch on node types.
+    Variables are resolved while compiling to an index into a list, the
+    globals or the frame of a call, so reading one costs no dict lookup.
+    Behaviour, 32-bit integers and run-time errors included, is that of
+    the tree-walking Interpreter.
+    """
+
+    def __init__(self, out: TextIO = sys.stdout, input: TextIO = sys.stdin):
+        self.out = out
+        self.input = input
+        self.globals: list[Any] = []
+        self.scope = Scope(None, 0)
+        self.object = ClassValue("object", None)
+        self.classes: dict[str, ClassValue] = {"object": self.object}
+
+    def run(self, program: Program, profile: Optional[cProfile.Profile] = None):
+        run_deep(lambda: self.compile(program)(), profile)
+
+    def compile(self, program: Program) -> Callable[[], None]:
+        """Compile ``program``; calling the result runs it."""
+        scope = self.scope
+        values = self.globals
+        functions = []
+        classes = []
+        for decl in program.declarations:
+            if type(decl) is ClassDefinition:
+                cls = ClassValue(decl.name, self.classes[decl.super_class])
+                for var_def in decl.var_defs:
+                    if type(var_def) is VariableDefinition:
+                        value = literal_value(var_def.literal)
+                        cls.attributes[var_def.var.name] = value
+                self.classes[decl.name] = cls
+                classes.append((decl, cls))
+            elif type(decl) is FunctionDefinition:
+                functions.append((scope.add(decl.name), decl))
+                values.append(None)
+            elif type(decl) is VariableDefinition:
+                scope.add(decl.var.name)
+                values.append(literal_value(decl.literal))
+
+        # Methods may create instances of any class, so they are compiled
+        # once all are known; superclasses come first in a program, so each
+        # class inherits methods that are complete.
+        for decl, cls in classes:
+            base = cls.super_class
+            assert base is not None
+            cls.methods = dict(base.methods)
+            for method in decl.method_defs:
+                if type(method) is FunctionDefinition:
+                    cls.methods[method.name] = self.function(method, scope)(None)
+        for slot, decl in functions:
+            values[slot] = self.function(decl, scope)(None)
+
+        body, _ = self.block(program.statements, scope)
+        return lambda: body(values)
+
+    # Variables
+
+    def resolve(self, name: str, scope: Scope) -> Optional[Location]:
+        depth = 0
+        while scope.parent is not None:
+            slot = scope.slots.get(name)
+            if slot is not None:
+                return depth, slot
+            location = scope.declared.get(name)
+            if location is not None:
+                outer, slot = location
+                return (GLOBAL if outer == GLOBAL else outer + depth), slot
+            scope = scope.parent
+            depth += 1
+        slot = scope.slots.get(name)
+        return None if slot is None else (GLOBAL, slot)
+
+    def load(self, location: Location) -> Code:
+        depth, slot = location
+        if depth == GLOBAL:
+            values = self.globals
+            return lambda frame: values[slot]
+        elif depth == 0:
+            return lambda frame: frame[slot]
+        elif depth == 1:
+            return lambda frame: frame[0][slot]
+
+        def load_outer(frame: Frame) -> Any:
+            for _ in range(depth):
+                frame = frame[0]
+            return frame[slot]
+
+        return load_outer
+
+    def store(self, location: Location, value: Code) -> Code:
+        depth, slot = location
+        if depth == GLOBAL:
+            values = self.globals
+
+            def store_global(frame: Frame) -> Any:
+                values[slot] = value(frame)
+                return NEXT
+
+            return store_global
+        elif depth == 0:
+
+            def store_local(frame: Frame) -> Any:
+                frame[slot] = value(frame)
+                return NEXT
+
+            return store_local
+
+        def store_outer(frame: Frame) -> Any:
+            result = value(frame)
+            for _ in range(depth):
+                frame = frame[0]
+            frame[slot] = result
+            return NEXT
+
+        return store_outer
+
+    # Functions
+
+    def function(
+        self, node: FunctionDefinition, parent: Scope
+    ) -> Callable[[Optional[Frame]], Callable]:
+        """Compile ``node``; the result makes the callable for a given frame
+        of the enclosing function."""
+        scope = Scope(parent, 1)
+        for param in node.params:
+            scope.add(param.name)
+        defaults = []
+        for decl in node.var_defs:
+            if type(decl) is VariableDefinition:
+                scope.add(decl.var.name)
+                defaults.append(literal_value(decl.literal))
+            elif type(decl) is GlobalDeclaration:
+                scope.declared[decl.name] = (GLOBAL, self.scope.slots[decl.name])
+            elif type(decl) is NoneLocalDeclaration:
+                location = self.resolve(decl.name, parent)
+                assert location is not None and location[0] != GLOBAL
+                scope.declared[decl.name] = (location[0] + 1, location[1])
+        nested_defs = [
+            func for func in node.func_defs if type(func) is FunctionDefinition
+        ]
+        for func in nested_defs:
+            scope.add(func.name)
+        # Nested functions come last in the frame and are made when it is.
+        nested = [self.function(func, scope) for func in nested_defs]
+        body, _ = self.block(node.statements, scope)
+
+        def make(outer: Optional[Frame]) -> Callable:
+            if not nested:
+
+                def call(*args: Any) -> Any:
+                    result = body([outer, *args, *defaults])
+                    return None if result is NEXT else result
+
+                return call
+
+            def call_with_nested(*args: Any) -> Any:
+                frame = [outer, *args, *defaults]
+                frame.extend(make_nested(frame) for make_nested in nested)
+                result = body(frame)
+                return None if result is NEXT else result
+
+            return call_with_nested
+
+        return make
+
+    # Statements
+
+    def block(self, statements: list[Stmt], scope: Scope) -> tuple[Code, bool]:
+        """Code for ``statements`` and whether it can return."""
+        rules = self.STATEMENTS
+        compiled = [rules[type(stmt)](self, stmt, scope) for stmt in statements]
+        codes = tuple(code for code, _ in compiled)
+        if any(returns for _, returns in compiled):
+
+            def run_returning(frame: Frame) -> Any:
+                for code in codes:
+                    result = code(frame)
+                    if result is not NEXT:
+                        return result
+                return NEXT
+
+            return run_returning, True
+        elif not codes:
+            return next_statement, False
+        elif len(codes) == 1:
+            return codes[0], False
+        elif len(codes) == 2:
+            first, second = codes
+
+            def run_two(frame: Frame) -> Any:
+                first(frame)
+                return second(frame)
+
+            return run_two, False
+
+        def run(frame: Frame) -> Any:
+            for code in codes:
+                code(frame)
+            return NEXT
+
+        return run, False
+
+    def expr_stmt(self, node: ExprStmt, scope: Scope) -> tuple[Code, bool]:
+        expr = self.expr(node.expr, scope)
+
+        def run(frame: Frame) -> Any:
+            expr(frame)
+            return NEXT
+
+        return run, False
+
+    def assign(self, node: AssignStmt, scope: Scope) -> tuple[Code, bool]:
+        value = self.expr(node.value, scope)
+        target = node.target
+        if type(target) is VariableNode:
+            location = self.resolve(target.name, scope)
+            assert location is not None
+            return self.store(location, value), False
+
+        pos = target.pos
+        if type(target) is IndexExpr:
+            container = self.expr(target.list_obj, scope)
+            index = self.expr(target.index, scope)
+
+            def store_item(frame: Frame) -> Any:
+                result = value(frame)
+                items = container(frame)
+                i = index(frame)
+                if items is None:
+                    raise RuntimeError("Operation on None", pos)
+                if not 0 <= i < len(items):
+                    raise RuntimeError("Index out of bounds", pos)
+                items[i] = result
+                return NEXT
+
+            return store_item, False
+
+        assert type(target) is MemberExpr
+        obj = self.expr(target.obj, scope)
+        name = target.member.name
+
+        def store_attribute(frame: Frame) -> Any:
+            result = value(frame)
+            instance = obj(frame)
+            if instance is None:
+                raise RuntimeError("Operation on None", pos)
+            instance.attributes[name] = result
+            return NEXT
+
+        return store_attribute, False
+
+    def if_stmt(self, node: IfStmt, scope: Scope) -> tuple[Code, bool]:
+        condition = self.expr(node.condition, scope)
+        then, then_returns = self.block(node.then_block, scope)
+        other, other_returns = self.block(node.else_block, scope)
+
+        def run(frame: Frame) -> Any:
+            return then(frame) if condition(frame) else other(frame)
+
+        return run, then_returns or other_returns
+
+    def while_stmt(self, node: WhileStmt, scope: Scope) -> tuple[Code, bool]:
+        condition = self.expr(node.condition, scope)
+        body, returns = self.block(node.body, scope)
+        if returns:
+
+            def run_returning(frame: Frame) -> Any:
+                while condition(frame):
+                    result = body(frame)
+                    if result is not NEXT:
+                        return result
+                return NEXT
+
+            return run_returning, True
+
+        def run(frame: Frame) -> Any:
+            while condition(frame):
+                body(frame)
+            return NEXT
+
+        return run, False
+
+    def for_stmt(self, node: ForStmt, scope: Scope) -> tuple[Code, bool]:
+        iterable = self.expr(node.iterable, scope)
+        location = self.resolve(node.identifier, scope)
+        assert location is not None
+        body, returns = self.block(node.body, scope)
+        pos = node.iterable.pos
+        depth, slot = location
+        # Loops bind their variable straight into its slot where they can.
+        if depth == GLOBAL:
+            values = self.globals
+
+            def run_global(frame: Frame) -> Any:
+                items = iterable(frame)
+                if items is None:
+                    raise RuntimeError("Operation on None", pos)
+                for values[slot] in items:
+                    result = body(frame)
+                    if result is not NEXT:
+                        return result
+                return NEXT
+
+            return run_global, returns
+        elif depth == 0:
+
+            def run_local(frame: Frame) -> Any:
+                items = iterable(frame)
+                if items is None:
+                    raise RuntimeError("Operation on None", pos)
+                for frame[slot] in items:
+                    result = body(frame)
+                    if result is not NEXT:
+                        return result
+                return NEXT
+
+            return run_local, returns
+
+        item: list[Any] = [None]
+        assign = self.store(location, lambda frame: item[0])
+
+        def run(frame: Frame) -> Any:
+            items = iterable(frame)
+            if items is None:
+                raise RuntimeError("Operation on None", pos)
+            for item[0] in items:
+                assign(frame)
+                result = body(frame)
+                if result is not NEXT:
+                    return result
+            return NEXT
+
+        return run, returns
+
+    def return_stmt(self, node: ReturnStmt, scope: Scope) -> tuple[Code, bool]:
+        if node.value is None:
+            return (lambda frame: None), True
+        return self.expr(node.value, scope), True
+
+    def pass_stmt(self, node: Stmt, scope: Scope) -> tuple[Code, bool]:
+        return next_statement, False
+
+    STATEMENTS: dict[type, Callable] = {
+        ExprStmt: expr_stmt,
+        AssignStmt: assign,
+        IfStmt: if_stmt,
+        WhileStmt: while_stmt,
+        ForStmt: for_stmt,
+        ReturnStmt: return_stmt,
+        PassStmt: pass_stmt,
+        ErrorNode: pass_stmt,
+    }
+
+    # Expressions
+
+    def expr(self, node: Expr, scope: Scope) -> Code:
+        return self.EXPRESSIONS[type(node)](self, node, scope)
+
+    def literal(self, node: Expr, scope: Scope) -> Code:
+        value = literal_value(node)
+        return lambda frame: value
+
+    def variable(self, node: VariableNode, scope: Scope) -> Code:
+        location = self.resolve(node.name, scope)
+        assert location is not None
+        return self.load(location)
+
+    def unary(self, node: UnaryExpr, scope: Scope) -> Code:
+        operand = self.expr(node.operand, scope)
+        if node.operator == "not":
+            return lambda frame: not operand(frame)
+
+        def negate(frame: Frame) -> Any:
+            value = -operand(frame)
+            return value if value <= INT_MAX else wrap(value)
+
+        return negate
+
+    def binary(self, node: BinaryExpr, scope: Scope) -> Code:
+        op = node.operator
+        left = self.expr(node.left, scope)
+        right = self.expr(node.right, scope)
+        pos = node.pos
+        if op == "and":
+            return lambda frame: left(frame) and right(frame)
+        elif op == "or":
+            return lambda frame: left(frame) or right(frame)
+        elif type(node.right) is IntegerLiteral and op in ("+", "-", "<", ">"):
+            # Loops count with these; the constant saves a call.
+            return self.binary_constant(op, left, node.right.val)
+        elif op == "+":
+
+            def add(frame: Frame) -> Any:
+                a = left(frame)
+                b = right(frame)
+                if type(a) is int:
+                    value = a + b
+                    return value if INT_MIN <= value <= INT_MAX else wrap(value)
+                if a is None or b is None:
+                    raise RuntimeError("Operation on None", pos)
+                return a + b
+
+            return add
+        elif op == "-":
+
+            def subtract(frame: Frame) -> Any:
+                value = left(frame) - right(frame)
+                return value if INT_MIN <= value <= INT_MAX else wrap(value)
+
+            return subtract
+        elif op == "*":
+
+            def multiply(frame: Frame) -> Any:
+                value = left(frame) * right(frame)
+                return value if INT_MIN <= value <= INT_MAX else wrap(value)
+
+            return multiply
+        elif op == "//":
+            return lambda frame: divide(left(frame), right(frame), pos)
+        elif op == "%":
+            return lambda frame: modulo(left(frame), right(frame), pos)
+        return self.COMPARISONS[op](left, right)
+
+    def binary_constant(self, op: str, left: Code, constant: int) -> Code:
+        if op == "<":
+            return lambda frame: left(frame) < constant
+        elif op == ">":
+            return lambda frame: left(frame) > constant
+        if op == "-":
+            constant = -constant
+
+        def add_constant(frame: Frame) -> Any:
+            value = left(frame) + constant
+            return value if INT_MIN <= value <= INT_MAX else wrap(value)
+
+        return add_constant
+
+    COMPARISONS: dict[str, Callable[[Code, Code], Code]] = {
+        "<": lambda left, right: lambda frame: left(frame) < right(frame),
+        "<=": lambda left, right: lambda frame: left(frame) <= right(frame),
+        ">": lambda left, right: lambda frame: left(frame) > right(frame),
+        ">=": lambda left, right: lambda frame: left(frame) >= right(frame),
+        "==": lambda left, right: lambda frame: left(frame) == right(frame),
+        "!=": lambda left, right: lambda frame: left(frame) != right(frame),
+        "is": lambda left, right: lambda frame: left(frame) is right(frame),
+    }
+
+    def if_expr(self, node: IfExpr, scope: Scope) -> Code:
+        condition = self.expr(node.cond, scope)
+        then = self.expr(node.node, scope)
+        other = self.expr(node.else_branch, scope)
+        return lambda frame: then(frame) if condition(frame) else other(frame)
+
+    def list_display(self, node: ListLiteral, scope: Scope) -> Code:
+        elements = [self.expr(element, scope) for element in node.elements]
+        return lambda frame: [element(frame) for element in elements]
+
+    def index_expr(self, node: IndexExpr, scope: Scope) -> Code:
+        container = self.expr(node.list_obj, scope)
+        index = self.expr(node.index, scope)
+        pos = node.pos
+
+        def load_item(frame: Frame) -> Any:
+            items = container(frame)
+            i = index(frame)
+            if items is None:
+                raise RuntimeError("Operation on None", pos)
+            if not 0 <= i < len(items):
+                raise RuntimeError("Index out of bounds", pos)
+            return items[i]
+
+        return load_item
+
+    def member(self, node: MemberExpr, scope: Scope) -> Code:
+        obj = self.expr(node.obj, scope)
+        name = node.member.name
+        pos = node.pos
+
+        def load_attribute(frame: Frame) -> Any:
+            instance = obj(frame)
+            if instance is None:
+                raise RuntimeError("Operation on None", pos)
+            return instance.attributes[name]
+
+        return load_attribute
+
+    def call_expr(self, node: CallExpr, scope: Scope) -> Code:
+        function = node.function
+        args = [self.expr(arg, scope) for arg in node.args]
+        pos = node.pos
+        if type(function) is MemberExpr:
+            return self.method_call(function, args, scope, node)
+
+        assert type(function) is VariableNode
+        name = function.name
+        location = self.resolve(name, scope)
+        if location is None and name in self.classes:
+            return self.instantiate(self.classes[name], args, pos)
+        elif location is None:
+            return self.builtin(name, args, pos)
+
+        callee = self.load(location)
+        if len(args) == 1:
+            (arg,) = args
+
+            def call_one(frame: Frame) -> Any:
+                value = arg(frame)
+                try:
+                    return callee(frame)(value)
+                except RecursionError:
+                    raise RuntimeError("Stack overflow", pos) from None
+
+            return call_one
+
+        def call(frame: Frame) -> Any:
+            values = [arg(frame) for arg in args]
+            try:
+                return callee(frame)(*values)
+            except RecursionError:
+                raise RuntimeError("Stack overflow", pos) from None
+
+        return call
+
+    def method_call(
+        self, function: MemberExpr, args: list[Code], scope: Scope, node: CallExpr
+    ) -> Code:
+        obj = self.expr(function.obj, scope)
+        name = function.member.name
+        pos = node.pos
+        obj_pos = function.pos
+
+        def call_method(frame: Frame) -> Any:
+            instance = obj(frame)
+            values = [arg(frame) for arg in args]
+            if instance is None:
+                raise RuntimeError("Operation on None", obj_pos)
+            try:
+                return instance.cls.methods[name](instance, *values)
+            except RecursionError:
+                raise RuntimeError("Stack overflow", pos) from None
+
+        return call_method
+
+    def instantiate(self, cls: ClassValue, args: list[Code], pos) -> Code:
+        def construct(frame: Frame) -> Any:
+            values = [arg(frame) for arg in args]
+            instance = Instance(cls)
+            init = cls.methods.get("__init__")
+            if init is not None:
+                try:
+                    init(instance, *values)
+                except RecursionError:
+                    raise RuntimeError("Stack overflow", pos) from None
+            return instance
+
+        return construct
+
+    def builtin(self, name: str, args: list[Code], pos) -> Code:
+        if name == "print":
+            (arg,) = args
+            out = self.out
+
+            def write(frame: Frame) -> None:
+                out.write(text(arg(frame), pos) + "\n")
+
+            return write
+        elif name == "len":
+            (arg,) = args
+            return lambda frame: length(arg(frame), pos)
+        elif name == "input":
+            stream = self.input
+
+            def read(frame: Frame) -> str:
+                line = stream.readline()
+                return line[:-1] if line.endswith("\n") else line
+
+            return read
+        value = {"int": 0, "bool": False, "str": ""}[name]
+        return lambda frame: value
+
+    EXPRESSIONS: dict[type, Callable] = {
+        IntegerLiteral: literal,
+        BoolLiteral: literal,
+        StringLiteral: literal,
+        NoneLiteral: literal,
+        IDStringLiteral: literal,
+        VariableNode: variable,
+        UnaryExpr: unary,
+        BinaryExpr: binary,
+        IfExpr: if_expr,
+        ListLiteral: list_display,
+        IndexExpr: index_expr,
+        MemberExpr: member,
+        CallExpr: call_expr,
+    }
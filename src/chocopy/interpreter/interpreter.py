@@ -0,0 +1,380 @@
+import cProfile
+import sys
+from typing import Any, Callable, Optional, TextIO
+
+from chocopy.common.errors import RuntimeError
+from chocopy.parser.node import (
+    AssignStmt,
+    BinaryExpr,
+    BoolLiteral,
+    CallExpr,
+    ClassDefinition,
+    ErrorNode,
+    ExprStmt,
+    ForStmt,
+    FunctionDefinition,
+    GlobalDeclaration,
+    IDStringLiteral,
+    IfExpr,
+    IfStmt,
+    IndexExpr,
+    IntegerLiteral,
+    ListLiteral,
+    Literal,
+    MemberExpr,
+    Node,
+    NoneLiteral,
+    NoneLocalDeclaration,
+    PassStmt,
+    Program,
+    ReturnStmt,
+    Stmt,
+    StringLiteral,
+    UnaryExpr,
+    VariableDefinition,
+    VariableNode,
+    WhileStmt,
+)
+from chocopy.interpreter.runtime import (
+    ClassValue,
+    Instance,
+    divide,
+    index,
+    length,
+    modulo,
+    run_deep,
+    store,
+    text,
+    wrap,
+)
+
+# What executing a statement gives when control goes on to the next one;
+# a return statement gives the value returned instead.
+NEXT = object()
+
+# Operators whose operands are both evaluated; ``and`` and ``or`` are not.
+OPERATORS: dict[str, Callable[[Any, Any, Node], Any]] = {
+    "+": lambda a, b, node: wrap(a + b) if type(a) is int else a + b,
+    "-": lambda a, b, node: wrap(a - b),
+    "*": lambda a, b, node: wrap(a * b),
+    "//": lambda a, b, node: divide(a, b, node.pos),
+    "%": lambda a, b, node: modulo(a, b, node.pos),
+    "<": lambda a, b, node: a < b,
+    "<=": lambda a, b, node: a <= b,
+    ">": lambda a, b, node: a > b,
+    ">=": lambda a, b, node: a >= b,
+    "==": lambda a, b, node: a == b,
+    "!=": lambda a, b, node: a != b,
+    "is": lambda a, b, node: a is b,
+}
+
+
+class Frame:
+    """The variables of the global scope or of one function call.
+
+    Names declared global or nonlocal are in ``outer``, with the frame that
+    holds them.
+    """
+
+    __slots__ = ("names", "parent", "outer")
+
+    def __init__(self, parent: Optional["Frame"]):
+        self.names: dict[str, Any] = {}
+        self.parent = parent
+        self.outer: dict[str, "Frame"] = {}
+
+    def lookup(self, name: str) -> Any:
+        frame: Optional[Frame] = self
+        while frame is not None:
+            names = frame.names
+            if name in names:
+                return names[name]
+            owner = frame.outer.get(name)
+            if owner is not None:
+                return owner.names[name]
+            frame = frame.parent
+        raise KeyError(name)
+
+    def assign(self, name: str, value: Any):
+        owner = self.outer.get(name)
+        (self if owner is None else owner).names[name] = value
+
+
+class Function:
+    """A function or method with the frame it was defined in."""
+
+    __slots__ = ("node", "closure")
+
+    def __init__(self, node: FunctionDefinition, closure: Frame):
+        self.node = node
+        self.closure = closure
+
+    def __repr__(self) -> str:
+        return f"<function {self.node.name}>"
+
+
+class Builtin:
+    __slots__ = ("name", "function")
+
+    def __init__(self, name: str, function: Callable[..., Any]):
+        self.name = name
+        self.function = function
+
+
+class Interpreter:
+    """Tree-walking evaluator of type-checked Programs.
+
+    Every node is evaluated by the method that EXPRESSIONS or STATEMENTS
+    maps its class to, so each step costs one dict lookup; variables live
+    in a dict per call, looked up through the frames of the enclosing
+    functions. Integers are 32-bit and wrap around on overflow; errors
+    that ChocoPy detects at run time raise RuntimeError. Programs run
+    through run_deep, so that calls can nest far deeper than Python's
+    default recursion limit would allow.
+    """
+
+    def __init__(self, out: TextIO = sys.stdout, input: TextIO = sys.stdin):
+        self.out = out
+        self.input = input
+        self.builtins = Frame(None)
+        self.globals = Frame(self.builtins)
+        self.object = ClassValue("object", None)
+        for name, function in (
+            ("print", self.print),
+            ("len", lambda value, node: length(value, node.pos)),
+            ("input", self.read),
+            ("int", lambda node: 0),
+            ("bool", lambda node: False),
+            ("str", lambda node: ""),
+        ):
+            self.builtins.names[name] = Builtin(name, function)
+        self.builtins.names["object"] = self.object
+
+    def print(self, value: Any, node: Node):
+        self.out.write(text(value, node.pos) + "\n")
+
+    def read(self, node: Node) -> str:
+        line = self.input.readline()
+        return line[:-1] if line.endswith("\n") else line
+
+    def run(self, program: Program, profile: Optional[cProfile.Profile] = None):
+        run_deep(lambda: self.execute_program(program), profile)
+
+    def execute_program(self, program: Program):
+        frame = self.globals
+        for decl in program.declarations:
+            if type(decl) is ClassDefinition:
+                frame.names[decl.name] = self.define_class(decl)
+            elif type(decl) is FunctionDefinition:
+                frame.names[decl.name] = Function(decl, frame)
+            elif type(decl) is VariableDefinition:
+                frame.names[decl.var.name] = self.evaluate(decl.literal, frame)
+        self.execute(program.statements, frame)
+
+    def define_class(self, node: ClassDefinition) -> ClassValue:
+        base = self.globals.lookup(node.super_class)
+        cls = ClassValue(node.name, base)
+        for var_def in node.var_defs:
+            if type(var_def) is VariableDefinition:
+                value = self.evaluate(var_def.literal, self.globals)
+                cls.attributes[var_def.var.name] = value
+        for method in node.method_defs:
+            if type(method) is FunctionDefinition:
+                cls.methods[method.name] = Function(method, self.globals)
+        return cls
+
+    # Calls
+
+    def call(self, callee: Any, args: list[Any], node: CallExpr) -> Any:
+        cls = type(callee)
+        if cls is Function:
+            return self.call_function(callee, args, node)
+        elif cls is ClassValue:
+            obj = Instance(callee)
+            init = callee.methods.get("__init__")
+            if init is not None:
+                self.call_function(init, [obj, *args], node)
+            return obj
+        return callee.function(*args, node)
+
+    def call_function(self, function: Function, args: list[Any], node: Node) -> Any:
+        definition = function.node
+        frame = Frame(function.closure)
+        names = frame.names
+        for param, arg in zip(definition.params, args):
+            names[param.name] = arg
+        for decl in definition.var_defs:
+            if type(decl) is VariableDefinition:
+                names[decl.var.name] = self.evaluate(decl.literal, frame)
+            elif type(decl) is GlobalDeclaration:
+                frame.outer[decl.name] = self.globals
+            elif type(decl) is NoneLocalDeclaration:
+                frame.outer[decl.name] = self.owner(decl.name, function.closure)
+        for nested in definition.func_defs:
+            if type(nested) is FunctionDefinition:
+                names[nested.name] = Function(nested, frame)
+
+        try:
+            result = self.execute(definition.statements, frame)
+        except RecursionError:
+            raise RuntimeError("Stack overflow", node.pos) from None
+        return None if result is NEXT else result
+
+    def owner(self, name: str, frame: Frame) -> Frame:
+        """Frame of the enclosing function that holds ``name``."""
+        while name not in frame.names:
+            owner = frame.outer.get(name)
+            if owner is not None:
+                return owner
+            assert frame.parent is not None
+            frame = frame.parent
+        return frame
+
+    # Statements
+
+    def execute(self, statements: list[Stmt], frame: Frame) -> Any:
+        """Run ``statements``; the value returned, or NEXT."""
+        rules = self.STATEMENTS
+        for stmt in statements:
+            result = rules[type(stmt)](self, stmt, frame)
+            if result is not NEXT:
+                return result
+        return NEXT
+
+    def execute_expr(self, node: ExprStmt, frame: Frame) -> Any:
+        self.evaluate(node.expr, frame)
+        return NEXT
+
+    def execute_assign(self, node: AssignStmt, frame: Frame) -> Any:
+        value = self.evaluate(node.value, frame)
+        target = node.target
+        if type(target) is VariableNode:
+            frame.assign(target.name, value)
+        elif type(target) is IndexExpr:
+            container = self.evaluate(target.list_obj, frame)
+            i = self.evaluate(target.index, frame)
+            store(container, i, value, target.pos)
+        else:
+            assert type(target) is MemberExpr
+            obj = self.evaluate(target.obj, frame)
+            if obj is None:
+                raise RuntimeError("Operation on None", target.pos)
+            obj.attributes[target.member.name] = value
+        return NEXT
+
+    def execute_if(self, node: IfStmt, frame: Frame) -> Any:
+        if self.evaluate(node.condition, frame):
+            return self.execute(node.then_block, frame)
+        return self.execute(node.else_block, frame)
+
+    def execute_while(self, node: WhileStmt, frame: Frame) -> Any:
+        while self.evaluate(node.condition, frame):
+            result = self.execute(node.body, frame)
+            if result is not NEXT:
+                return result
+        return NEXT
+
+    def execute_for(self, node: ForStmt, frame: Frame) -> Any:
+        iterable = self.evaluate(node.iterable, frame)
+        if iterable is None:
+            raise RuntimeError("Operation on None", node.iterable.pos)
+        for item in iterable:
+            frame.assign(node.identifier, item)
+            result = self.execute(node.body, frame)
+            if result is not NEXT:
+                return result
+        return NEXT
+
+    def execute_return(self, node: ReturnStmt, frame: Frame) -> Any:
+        return None if node.value is None else self.evaluate(node.value, frame)
+
+    def execute_pass(self, node: Stmt, frame: Frame) -> Any:
+        return NEXT
+
+    STATEMENTS: dict[type, Callable] = {
+        ExprStmt: execute_expr,
+        AssignStmt: execute_assign,
+        IfStmt: execute_if,
+        WhileStmt: execute_while,
+        ForStmt: execute_for,
+        ReturnStmt: execute_return,
+        PassStmt: execute_pass,
+        ErrorNode: execute_pass,
+    }
+
+    # Expressions
+
+    def evaluate(self, node: Node, frame: Frame) -> Any:
+        return self.EXPRESSIONS[type(node)](self, node, frame)
+
+    def literal(self, node: Literal, frame: Frame) -> Any:
+        return node.val
+
+    def id_string(self, node: IDStringLiteral, frame: Frame) -> str:
+        return node.name
+
+    def variable(self, node: VariableNode, frame: Frame) -> Any:
+        return frame.lookup(node.name)
+
+    def unary(self, node: UnaryExpr, frame: Frame) -> Any:
+        operand = self.evaluate(node.operand, frame)
+        return wrap(-operand) if node.operator == "-" else not operand
+
+    def binary(self, node: BinaryExpr, frame: Frame) -> Any:
+        op = node.operator
+        left = self.evaluate(node.left, frame)
+        if op == "and":
+            return left and self.evaluate(node.right, frame)
+        elif op == "or":
+            return left or self.evaluate(node.right, frame)
+        right = self.evaluate(node.right, frame)
+        if op == "+" and (left is None or right is None):
+            raise RuntimeError("Operation on None", node.pos)
+        return OPERATORS[op](left, right, node)
+
+    def if_expr(self, node: IfExpr, frame: Frame) -> Any:
+        if self.evaluate(node.cond, frame):
+            return self.evaluate(node.node, frame)
+        return self.evaluate(node.else_branch, frame)
+
+    def list_display(self, node: ListLiteral, frame: Frame) -> list:
+        return [self.evaluate(element, frame) for element in node.elements]
+
+    def index_expr(self, node: IndexExpr, frame: Frame) -> Any:
+        container = self.evaluate(node.list_obj, frame)
+        return index(container, self.evaluate(node.index, frame), node.pos)
+
+    def member(self, node: MemberExpr, frame: Frame) -> Any:
+        obj = self.evaluate(node.obj, frame)
+        if obj is None:
+            raise RuntimeError("Operation on None", node.pos)
+        return obj.attributes[node.member.name]
+
+    def call_expr(self, node: CallExpr, frame: Frame) -> Any:
+        function = node.function
+        if type(function) is MemberExpr:
+            obj = self.evaluate(function.obj, frame)
+            args = [self.evaluate(arg, frame) for arg in node.args]
+            if obj is None:
+                raise RuntimeError("Operation on None", function.pos)
+            method = obj.cls.methods[function.member.name]
+            return self.call_function(method, [obj, *args], node)
+        callee = self.evaluate(function, frame)
+        args = [self.evaluate(arg, frame) for arg in node.args]
+        return self.call(callee, args, node)
+
+    EXPRESSIONS: dict[type, Callable] = {
+        IntegerLiteral: literal,
+        BoolLiteral: literal,
+        StringLiteral: literal,
+        NoneLiteral: literal,
+        IDStringLiteral: id_string,
+        VariableNode: variable,
+        UnaryExpr: unary,
+        BinaryExpr: binary,
+        IfExpr: if_expr,
+        ListLiteral: list_display,
+        IndexExpr: index_expr,
+        MemberExpr: member,
+        CallExpr: call_expr,
+    }
@@ -0,0 +1,150 @@
+import cProfile
+import sys
+import threading
+from typing import Any, Callable, Optional
+
+from chocopy.common.errors import RuntimeError
+from chocopy.common.token import Position
+
+INT_MIN = -(2**31)
+INT_MAX = 2**31 - 1
+
+# A ChocoPy call nests some ten Python calls in either engine, so Python's
+# default recursion limit of 1000 would be ChocoPy's stack limit. Programs
+# run with these instead, which let calls nest about 10,000 deep before they
+# fail with "Stack overflow".
+RECURSION_LIMIT = 100_000
+STACK_SIZE = 512 << 20
+
+
+def wrap(value: int) -> int:
+    """``value`` as a 32-bit two's complement int, which is what ChocoPy
+    integer arithmetic overflows to."""
+    if INT_MIN <= value <= INT_MAX:
+        return value
+    return ((value - INT_MIN) & 0xFFFFFFFF) + INT_MIN
+
+
+def divide(left: int, right: int, pos: Position) -> int:
+    if right == 0:
+        raise RuntimeError("Division by zero", pos)
+    # Only INT_MIN // -1 leaves the range.
+    return wrap(left // right)
+
+
+def modulo(left: int, right: int, pos: Position) -> int:
+    if right == 0:
+        raise RuntimeError("Division by zero", pos)
+    return left % right
+
+
+def index(container: Any, i: int, pos: Position) -> Any:
+    """``container[i]`` for a list or str, with ChocoPy's errors."""
+    if container is None:
+        raise RuntimeError("Operation on None", pos)
+    if not 0 <= i < len(container):
+        raise RuntimeError("Index out of bounds", pos)
+    return container[i]
+
+
+def store(container: Optional[list], i: int, value: Any, pos: Position):
+    if container is None:
+        raise RuntimeError("Operation on None", pos)
+    if not 0 <= i < len(container):
+        raise RuntimeError("Index out of bounds", pos)
+    container[i] = value
+
+
+class ClassValue:
+    """A class at run time: the initial values of its attributes, inherited
+    ones first, and its methods by name, inherited or its own.
+
+    Methods are whatever the engine calls; the ClassValue does not need
+    to know.
+    """
+
+    __slots__ = ("name", "super_class", "attributes", "methods")
+
+    def __init__(self, name: str, super_class: Optional["ClassValue"]):
+        self.name = name
+        self.super_class = super_class
+        self.attributes: dict[str, Any] = (
+            {} if super_class is None else dict(super_class.attributes)
+        )
+        self.methods: dict[str, Any] = (
+            {} if super_class is None else dict(super_class.methods)
+        )
+
+    def __repr__(self) -> str:
+        return f"<class {self.name}>"
+
+
+class Instance:
+    __slots__ = ("cls", "attributes")
+
+    def __init__(self, cls: ClassValue):
+        self.cls = cls
+        self.attributes = dict(cls.attributes)
+
+    def __repr__(self) -> str:
+        return f"<{self.cls.name} object>"
+
+
+def text(value: Any, pos: Position) -> str:
+    """What print writes for ``value``: only ints, bools and strs print."""
+    if type(value) in (int, bool, str):
+        return str(value)
+    raise RuntimeError("Invalid argument", pos)
+
+
+def length(value: Any, pos: Position) -> int:
+    if type(value) in (list, str):
+        return len(value)
+    raise RuntimeError("Invalid argument", pos)
+
+
+def run_deep(
+    function: Callable[[], Any], profile: Optional[cProfile.Profile] = None
+) -> Any:
+    """Call ``function`` on a thread with a stack of STACK_SIZE bytes, and
+    with RECURSION_LIMIT as the recursion limit meanwhile.
+
+    Both settings are process-wide: until the call returns, other threads
+    that recurse get the same limit, and threads they start get the same
+    stack size. Both are restored afterwards.
+
+    A profile only sees the thread it is enabled on, so ``profile``, if
+    given, is taken to be enabled on the calling thread and moves to the
+    new thread for the call.
+    """
+    outcome: list = []
+
+    def target():
+        if profile is not None:
+            profile.enable()
+        try:
+            outcome.append((True, function()))
+        except BaseException as error:
+            outcome.append((False, error))
+        finally:
+            if profile is not None:
+                profile.disable()
+
+    limit = sys.getrecursionlimit()
+    size = threading.stack_size(STACK_SIZE)
+    thread = threading.Thread(target=target, daemon=True)
+    sys.setrecursionlimit(RECURSION_LIMIT)
+    if profile is not None:
+        profile.disable()
+    try:
+        thread.start()
+        thread.join()
+    finally:
+        if profile is not None:
+            profile.enable()
+        sys.setrecursionlimit(limit)
+        threading.stack_size(size)
+    ok, result = outcome[0]
+    if not ok:
+        raise result
+    return result
@@ -0,0 +1,329 @@
+import hashlib
+import marshal
+import sys
+from array import array
+from typing import Any, Callable, Iterable, Iterator
+
+import chocopy.parser.node as nodes
+from chocopy.common.token import Position, Token
+from chocopy.parser.node import IDStringLiteral, Literal, Node, VariableDefinition
+from chocopy.parser.visitor import child_nodes
+
+NODE_CLASSES: list[type[Node]] = [
+    cls
+    for cls in vars(nodes).values()
+    if isinstance(cls, type) and issubclass(cls, Node)
+]
+KINDS = {cls: code for code, cls in enumerate(NODE_CLASSES)}
+CLASSES_BY_NAME = {cls.__name__: cls for cls in NODE_CLASSES}
+FIELD_OFFSETS = {
+    cls: {name: offset for offset, name in enumerate(cls._fields)}
+    for cls in NODE_CLASSES
+}
+
+# Serialized arenas are only read back with the same node classes and
+# byte order.
+SIGNATURE = hashlib.sha256(
+    repr(
+        (1, sys.byteorder, [(cls.__name__, cls._fields) for cls in NODE_CLASSES])
+    ).encode()
+).hexdigest()[:16]
+
+# A field is stored as one int; its two low bits tell what the rest is.
+NODE = 0  # index of a child node
+VALUE = 1  # index into Arena.values
+LIST = 2  # start of a length-prefixed run of node indices in Arena.children
+
+
+class Arena:
+    """Struct-of-arrays AST.
+
+    Node ``i`` has the class ``NODE_CLASSES[kinds[i]]``, the packed position
+    ``positions[i]`` (line << 32 | column, like Node) and its fields, in
+    ``_fields`` order, at ``fields[first[i]:]``. Strings, literal values and
+    None are kept once each in ``values``; lists of nodes live in
+    ``children``. Nodes are appended after their children, so indices are
+    in postorder and whole-tree passes can run straight over the arrays.
+
+    An Arena is a tree builder for the Parser: it has a constructor for
+    every node class that appends the node and returns its index. Each is
+    built on first use, so arenas that are only loaded never build them.
+
+        arena = Arena()
+        program = arena.view(Parser(Scanner(source), ast=arena).parse())
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.positions = array("q")
+        self.first = array("i")
+        self.fields = array("i")
+        self.children = array("i")
+        self.values: list[Any] = [None]
+        self.value_index: dict[tuple[type, Any], int] = {(type(None), None): 0}
+
+    def __getattr__(self, name: str) -> Callable[..., int]:
+        cls = CLASSES_BY_NAME.get(name)
+        if cls is None:
+            raise AttributeError(name)
+        construct = self.constructor(cls)
+        setattr(self, name, construct)
+        return construct
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def constructor(self, cls: type[Node]) -> Callable[..., int]:
+        code = KINDS[cls]
+        add = self.add
+        encode = self.encode
+        value = self.value
+
+        construct: Callable[..., int]
+        if issubclass(cls, Literal):
+
+            def literal(token: Token) -> int:
+                return add(code, token.position, (value(token.literal) << 2 | VALUE,))
+
+            construct = literal
+
+        elif cls is IDStringLiteral:
+
+            def id_string(token: Token) -> int:
+                return add(code, token.position, (value(token.lexeme) << 2 | VALUE,))
+
+            construct = id_string
+
+        elif cls is VariableDefinition:
+
+            def var_def(var: int, literal: int) -> int:
+                return add(code, self.pos(var), (var << 2, literal << 2))
+
+            construct = var_def
+
+        else:
+            kinds, positions, first, fields = (
+                self.kinds,
+                self.positions,
+                self.first,
+                self.fields,
+            )
+
+            # The hot path of parsing into an arena, so add() is inlined.
+            def node(*args: Any) -> int:
+                index = len(kinds)
+                pos = args[-1]
+                kinds.append(code)
+                positions.append(pos.line << 32 | pos.column)
+                first.append(len(fields))
+                for arg in args[:-1]:
+                    fields.append(arg << 2 if type(arg) is int else encode(arg))
+                return index
+
+            construct = node
+
+        construct.__name__ = cls.__name__
+        return construct
+
+    def add(self, code: int, pos: Position, fields) -> int:
+        index = len(self.kinds)
+        self.kinds.append(code)
+        self.positions.append(pos.line << 32 | pos.column)
+        self.first.append(len(self.fields))
+        self.fields.extend(fields)
+        return index
+
+    def encode(self, value: Any) -> int:
+        if type(value) is int:
+            return value << 2
+        elif type(value) is list:
+            start = len(self.children)
+            self.children.append(len(value))
+            self.children.extend(value)
+            return start << 2 | LIST
+        return self.value(value) << 2 | VALUE
+
+    def value(self, value: Any) -> int:
+        # Keyed with the type so that True and 1 stay apart.
+        key = (type(value), value)
+        index = self.value_index.get(key)
+        if index is None:
+            index = self.value_index[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def kind(self, index: int) -> type[Node]:
+        return NODE_CLASSES[self.kinds[index]]
+
+    def pos(self, index: int) -> Position:
+        packed = self.positions[index]
+        return Position(packed >> 32, packed & 0xFFFFFFFF)
+
+    def field(self, index: int, name: str) -> int:
+        """Tagged field ``name`` of node ``index``."""
+        offset = FIELD_OFFSETS[self.kind(index)][name]
+        return self.fields[self.first[index] + offset]
+
+    def field_list(self, field: int) -> array:
+        start = field >> 2
+        return self.children[start + 1 : start + 1 + self.children[start]]
+
+    def child_indices(self, index: int) -> list[int]:
+        """Indices of the direct children of node ``index``, in field order."""
+        result = []
+        start = self.first[index]
+        for field in self.fields[start : start + len(self.kind(index)._fields)]:
+            tag = field & 3
+            if tag == NODE:
+                result.append(field >> 2)
+            elif tag == LIST:
+                result.extend(self.field_list(field))
+        return result
+
+    def walk(self, root: int) -> Iterator[int]:
+        """Indices of ``root`` and all nodes below it, in preorder."""
+        stack = [root]
+        while stack:
+            index = stack.pop()
+            yield index
+            stack.extend(reversed(self.child_indices(index)))
+
+    def view(self, index: int) -> "NodeView":
+        return NodeView(self, index)
+
+    def to_node(self, root: int) -> Node:
+        """Build the linked Node tree of ``root``."""
+        # Children have lower indices than their parents.
+        return self.build(sorted(self.walk(root)))[root]
+
+    def build(self, indices: Iterable[int]) -> list[Any]:
+        """Build Node objects for ``indices``, children before parents.
+
+        Returns a list indexed like the arena, None where nothing was built.
+        """
+        built: list[Any] = [None] * len(self.kinds)
+        kinds, positions, first = self.kinds, self.positions, self.first
+        fields, children, values = self.fields, self.children, self.values
+        for index in indices:
+            cls = NODE_CLASSES[kinds[index]]
+            node = cls.__new__(cls)
+            node._pos = positions[index]
+            start = first[index]
+            for name in cls._fields:
+                field = fields[start]
+                start += 1
+                tag = field & 3
+                if tag == NODE:
+                    value = built[field >> 2]
+                elif tag == VALUE:
+                    value = values[field >> 2]
+                else:
+                    at = (field >> 2) + 1
+                    value = [built[i] for i in children[at : at + children[at - 1]]]
+                setattr(node, name, value)
+            built[index] = node
+        return built
+
+    def add_tree(self, root: Node) -> int:
+        """Append the linked tree ``root`` and return its index."""
+        indices: dict[int, int] = {}
+        stack: list[tuple[Node, bool]] = [(root, False)]
+        while stack:
+            node, done = stack.pop()
+            if not done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(child_nodes(node)))
+                continue
+            encoded = []
+            for name in node._fields:
+                value = getattr(node, name)
+                if type(value) is list:
+                    encoded.append(self.encode([indices[id(v)] for v in value]))
+                elif isinstance(value, Node):
+                    encoded.append(indices[id(value)] << 2)
+                else:
+                    encoded.append(self.value(value) << 2 | VALUE)
+            indices[id(node)] = self.add(KINDS[type(node)], node.pos, encoded)
+        return indices[id(root)]
+
+    def to_bytes(self) -> bytes:
+        return marshal.dumps(
+            (
+                SIGNATURE,
+                self.values,
+                self.kinds.tobytes(),
+                self.positions.tobytes(),
+                self.first.tobytes(),
+                self.fields.tobytes(),
+                self.children.tobytes(),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Arena":
+        """Arena saved by to_bytes; ValueError if ``data`` is not one, or was
+        saved with different node classes or byte order."""
+        try:
+            signature, values, *arrays = marshal.loads(data)
+        except (EOFError, TypeError, ValueError) as error:
+            raise ValueError(f"not a serialized arena: {error}") from None
+        if signature != SIGNATURE:
+            raise ValueError("arena was serialized by another version")
+        arena = cls()
+        arena.values = values
+        arena.value_index = {(type(v), v): i for i, v in enumerate(values)}
+        for array_, raw in zip(
+            (arena.kinds, arena.positions, arena.first, arena.fields, arena.children),
+            arrays,
+        ):
+            array_.frombytes(raw)
+        return arena
+
+
+class NodeView:
+    """Read-only view of one Arena node.
+
+    Fields are read by the names of the node class: child nodes come back as
+    NodeViews, lists of nodes as lists of NodeViews and other values as is.
+    """
+
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: Arena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def kind(self) -> type[Node]:
+        return self.arena.kind(self.index)
+
+    @property
+    def pos(self) -> Position:
+        return self.arena.pos(self.index)
+
+    def __getattr__(self, name: str) -> Any:
+        arena = self.arena
+        offsets = FIELD_OFFSETS[arena.kind(self.index)]
+        if name not in offsets:
+            raise AttributeError(name)
+        field = arena.fields[arena.first[self.index] + offsets[name]]
+        tag = field & 3
+        if tag == NODE:
+            return NodeView(arena, field >> 2)
+        elif tag == VALUE:
+            return arena.values[field >> 2]
+        return [NodeView(arena, child) for child in arena.field_list(field)]
+
+    def children(self) -> list["NodeView"]:
+        return [NodeView(self.arena, i) for i in self.arena.child_indices(self.index)]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, NodeView):
+            return NotImplemented
+        return self.arena is other.arena and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.arena), self.index))
+
+    def __repr__(self) -> str:
+        return f"NodeView({self.kind.__name__}, {self.index})"
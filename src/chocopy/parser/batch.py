@@ -0,0 +1,109 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Iterable, Optional
+
+import chocopy.common.errors as errors
+from chocopy.common.errors import ChocoPyError
+from chocopy.common.token import Position
+from chocopy.parser.arena import Arena
+from chocopy.parser.node import Program
+from chocopy.parser.parser import Parser
+from chocopy.parser.serialize import dumps_arena, loads
+from chocopy.scanner.scanner import Scanner
+
+
+@dataclass(slots=True)
+class FileResult:
+    """Outcome of scanning and parsing one file in a worker.
+
+    The AST travels as serialize.dumps bytes and diagnostics as
+    (error class name, message, line, column) tuples, which are cheaper to
+    send between processes than Node trees and exceptions.
+    """
+
+    path: str
+    ast: Optional[bytes]
+    diagnostics: list[tuple[str, str, int, int]] = field(default_factory=list)
+    # Seconds spent scanning and parsing, and serializing the AST.
+    parse_time: float = 0.0
+    serialize_time: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.diagnostics
+
+    def program(self) -> Optional[Program]:
+        if self.ast is None:
+            return None
+        program = loads(self.ast)
+        assert isinstance(program, Program)
+        return program
+
+    def errors(self) -> list[ChocoPyError]:
+        # A file that could not be read has its OSError or
+        # UnicodeDecodeError here as a ChocoPyError at [0, 0].
+        return [
+            getattr(errors, kind, ChocoPyError)(message, Position(line, column))
+            for kind, message, line, column in self.diagnostics
+        ]
+
+
+def diagnostic(error: ChocoPyError) -> tuple[str, str, int, int]:
+    return (type(error).__name__, error.message, error.pos.line, error.pos.column)
+
+
+def parse_file(path: str, recover: bool = False) -> FileResult:
+    """Scan and parse ``path``; syntax errors, and a file that is missing or
+    not valid UTF-8, end up in the diagnostics."""
+    start = time.perf_counter()
+    # Nothing here needs Node objects, so the parser builds the arena that
+    # gets serialized straight away.
+    arena = Arena()
+    try:
+        with open(path, "rb") as f:
+            parser = Parser(Scanner.from_file(f), recover=recover, ast=arena)
+            parser.parse()
+    except ChocoPyError as error:
+        return FileResult(path, None, [diagnostic(error)], time.perf_counter() - start)
+    except (OSError, UnicodeDecodeError) as error:
+        # The source is decoded while it is scanned, so a decoding error
+        # can come out of the parser.
+        read_error = (type(error).__name__, str(error), 0, 0)
+        return FileResult(path, None, [read_error], time.perf_counter() - start)
+    parsed = time.perf_counter()
+    ast = dumps_arena(arena)
+    return FileResult(
+        path,
+        ast,
+        [diagnostic(error) for error in parser.diagnostics],
+        parsed - start,
+        time.perf_counter() - parsed,
+    )
+
+
+def parse_files(
+    paths: Iterable[str | os.PathLike],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    recover: bool = False,
+) -> list[FileResult]:
+    """Scan and parse ``paths`` in ``workers`` processes, one CPU each by
+    default, and return the results in the order of ``paths``.
+
+    Files are handed out ``chunk_size`` at a time: large enough to keep
+    the cost of sending work small, and by default small enough to give
+    every worker about four chunks so that uneven files even out.
+    """
+    paths = [os.fspath(path) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    work = partial(parse_file, recover=recover)
+    if workers == 1 or len(paths) < 2:
+        return [work(path) for path in paths]
+
+    if chunk_size is None:
+        chunk_size = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(min(workers, len(paths))) as pool:
+        return list(pool.map(work, paths, chunksize=chunk_size))
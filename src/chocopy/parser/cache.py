@@ -0,0 +1,53 @@
+import hashlib
+import os
+from pathlib import Path
+
+from chocopy.parser.node import Program
+from chocopy.parser.parser import Parser
+from chocopy.parser.serialize import dumps, loads
+from chocopy.scanner.scanner import Scanner
+
+
+class ParseCache:
+    """Parsed programs kept on disk, keyed by the SHA-256 of their source.
+
+        cache = ParseCache(".chocopy-cache")
+        program = cache.parse_file("main.py")
+
+    A source that does not parse raises as usual and is not cached. Entries
+    that cannot be read back, e.g. written by a version with other node
+    classes, are parsed again and replaced.
+    """
+
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, source: bytes) -> Path:
+        return self.directory / f"{hashlib.sha256(source).hexdigest()}.ast"
+
+    def parse(self, source: str | bytes) -> Program:
+        if isinstance(source, str):
+            source = source.encode()
+        path = self.path(source)
+        try:
+            cached = loads(path.read_bytes())
+        except Exception:
+            # Whatever is wrong with the entry, parsing again replaces it.
+            cached = None
+        if isinstance(cached, Program):
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        program = Parser(Scanner(source.decode())).parse()
+        # Write aside and rename so that readers never see half a file.
+        partial = path.with_suffix(f".{os.getpid()}.tmp")
+        partial.write_bytes(dumps(program))
+        os.replace(partial, path)
+        return program
+
+    def parse_file(self, path: str | os.PathLike) -> Program:
+        return self.parse(Path(path).read_bytes())
@@ -1,66 +1,142 @@
 from chocopy.common.token import Token, Position
 
+# The slot setters of Position, which NodePosition has to go around.
+set_line = vars(Position)["line"].__set__
+set_column = vars(Position)["column"].__set__
+
+
+class NodePosition(Position):
+    """Read-only Position of a node.
+
+    Node.pos unpacks a new one on every access, so a write to it could not
+    reach the node; it fails instead. Assign a new Position to ``pos``.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, line: int, column: int):
+        set_line(self, line)
+        set_column(self, column)
+
+    def __setattr__(self, name: str, value: object):
+        raise AttributeError(
+            f"cannot set {name} of a node position; assign a new Position to pos"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.line, self.column) == (other.line, other.column)
+
+    def __reduce__(self):
+        return NodePosition, (self.line, self.column)
+
 
 class Node:
+    # The position is packed into one int: line in the high bits, column in
+    # the low 32 bits.
+    __slots__ = ("_pos",)
+    # Names of the fields of a node class, in constructor order.
+    _fields: tuple[str, ...] = ()
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._fields = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in klass.__dict__.get("__slots__", ())
+            if name != "_pos"
+        )
+
     def __init__(self, pos: Position):
-        self.pos = pos
+        self._pos = pos.line << 32 | pos.column
+
+    @property
+    def pos(self) -> Position:
+        return NodePosition(self._pos >> 32, self._pos & 0xFFFFFFFF)
+
+    @pos.setter
+    def pos(self, pos: Position):
+        self._pos = pos.line << 32 | pos.column
 
 
 class Expr(Node):
+    __slots__ = ()
+
     def __init__(self, pos: Position):
         super().__init__(pos)
 
 
 class Literal(Expr):
+    __slots__ = ("val",)
+
     def __init__(self, token: Token):
         self.val = token.literal
         super().__init__(token.position)
 
 
 class NoneLiteral(Literal):
+    __slots__ = ()
+
     def __init__(self, token: Token):
         super().__init__(token)
 
 
 class BoolLiteral(Literal):
+    __slots__ = ()
+
     def __init__(self, token: Token):
         super().__init__(token)
 
 
 class IntegerLiteral(Literal):
+    __slots__ = ()
+
     def __init__(self, token: Token):
         super().__init__(token)
 
 
 class StringLiteral(Literal):
+    __slots__ = ()
+
     def __init__(self, token: Token):
         super().__init__(token)
 
 
 class IDStringLiteral(Expr):
+    __slots__ = ("name",)
+
     def __init__(self, token: Token):
         self.name = token.lexeme
         super().__init__(token.position)
 
 
 class TypeAnnotation(Node):
+    __slots__ = ()
+
     def __init__(self, pos: Position):
         super().__init__(pos)
 
 
 class ClassType(TypeAnnotation):
+    __slots__ = ("name",)
+
     def __init__(self, name: str, pos: Position):
         super().__init__(pos)
         self.name = name
 
 
 class ListType(TypeAnnotation):
+    __slots__ = ("element_type",)
+
     def __init__(self, el: TypeAnnotation, pos: Position):
         super().__init__(pos)
         self.element_type = el
 
 
 class TypedVar(Node):
+    __slots__ = ("name", "type")
+
     def __init__(self, name: str, type: TypeAnnotation, pos: Position):
         super().__init__(pos)
         self.name = name
@@ -68,6 +144,8 @@ class TypedVar(Node):
 
 
 class VariableDefinition(Node):
+    __slots__ = ("var", "literal")
+
     def __init__(
         self,
         var: TypedVar,
@@ -79,18 +157,24 @@ class VariableDefinition(Node):
 
 
 class GlobalDeclaration(Node):
+    __slots__ = ("name",)
+
     def __init__(self, name: str, pos: Position):
         super().__init__(pos)
         self.name = name
 
 
 class NoneLocalDeclaration(Node):
+    __slots__ = ("name",)
+
     def __init__(self, name: str, pos: Position):
         super().__init__(pos)
         self.name = name
 
 
 class UnaryExpr(Expr):
+    __slots__ = ("operator", "operand")
+
     def __init__(self, operator: str, operand: Expr, pos: Position):
         super().__init__(pos)
         self.operator = operator
@@ -98,6 +182,8 @@ class UnaryExpr(Expr):
 
 
 class BinaryExpr(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: str, right: Expr, pos: Position):
         super().__init__(pos)
         self.left = left
@@ -106,13 +192,17 @@ class BinaryExpr(Expr):
 
 
 class MemberExpr(Expr):
-    def __init__(self, obj: Expr, member: str, pos: Position):
+    __slots__ = ("obj", "member")
+
+    def __init__(self, obj: Expr, member: "VariableNode", pos: Position):
         super().__init__(pos)
         self.obj = obj
         self.member = member
 
 
 class IndexExpr(Expr):
+    __slots__ = ("list_obj", "index")
+
     def __init__(self, list_obj: Expr, index: Expr, pos: Position):
         super().__init__(pos)
         self.list_obj = list_obj
@@ -120,6 +210,8 @@ class IndexExpr(Expr):
 
 
 class CallExpr(Expr):
+    __slots__ = ("function", "args")
+
     def __init__(self, function: Expr, args: list[Expr], pos: Position):
         super().__init__(pos)
         self.function = function
@@ -127,18 +219,24 @@ class CallExpr(Expr):
 
 
 class ListLiteral(Expr):
+    __slots__ = ("elements",)
+
     def __init__(self, elements: list[Expr], pos: Position):
         super().__init__(pos)
         self.elements = elements
 
 
 class VariableNode(Expr):
+    __slots__ = ("name",)
+
     def __init__(self, name: str, pos: Position):
         super().__init__(pos)
         self.name = name
 
 
 class IfExpr(Expr):
+    __slots__ = ("node", "cond", "else_branch")
+
     def __init__(self, node: Expr, cond: Expr, else_branch: Expr, pos: Position):
         super().__init__(pos)
         self.node = node
@@ -147,16 +245,20 @@ class IfExpr(Expr):
 
 
 class Stmt(Node):
-    pass
+    __slots__ = ()
 
 
 class Block(Node):
+    __slots__ = ("statements",)
+
     def __init__(self, statements: list[Stmt], position: Position):
         super().__init__(position)
         self.statements = statements
 
 
 class IfStmt(Stmt):
+    __slots__ = ("condition", "then_block", "else_block")
+
     def __init__(
         self,
         condition: Expr,
@@ -164,13 +266,15 @@ class IfStmt(Stmt):
         else_block: list[Stmt],
         position: Position,
     ):
+        super().__init__(position)
         self.condition = condition
         self.then_block = then_block
         self.else_block = else_block
-        self.position = position
 
 
 class WhileStmt(Stmt):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition: Expr, body: list[Stmt], position: Position):
         super().__init__(position)
         self.condition = condition
@@ -178,6 +282,8 @@ class WhileStmt(Stmt):
 
 
 class ForStmt(Stmt):
+    __slots__ = ("identifier", "iterable", "body")
+
     def __init__(
         self, identifier: str, iterable: Expr, body: list[Stmt], position: Position
     ):
@@ -188,30 +294,47 @@ class ForStmt(Stmt):
 
 
 class AssignStmt(Stmt):
-    def __init__(self, target: Node, value: Expr, position: Position):
+    __slots__ = ("target", "value")
+
+    def __init__(self, target: Expr, value: Expr, position: Position):
         super().__init__(position)
         self.target = target
         self.value = value
 
 
 class ExprStmt(Stmt):
+    __slots__ = ("expr",)
+
     def __init__(self, expr: Expr, position: Position):
         super().__init__(position)
         self.expr = expr
 
 
 class ReturnStmt(Stmt):
+    __slots__ = ("value",)
+
     def __init__(self, value: Expr | None, position: Position):
         super().__init__(position)
         self.value = value
 
 
 class PassStmt(Stmt):
+    __slots__ = ()
+
     def __init__(self, position: Position):
         super().__init__(position)
 
 
 class FunctionDefinition(Node):
+    __slots__ = (
+        "name",
+        "params",
+        "return_type",
+        "var_defs",
+        "func_defs",
+        "statements",
+    )
+
     def __init__(
         self,
         name: str,
@@ -232,6 +355,8 @@ class FunctionDefinition(Node):
 
 
 class ClassDefinition(Node):
+    __slots__ = ("name", "super_class", "var_defs", "method_defs")
+
     def __init__(
         self,
         name: str,
@@ -248,9 +373,25 @@ class ClassDefinition(Node):
 
 
 class Program(Node):
+    __slots__ = ("declarations", "statements")
+
     def __init__(
         self, declarations: list[Node], statements: list[Stmt], position: Position
     ):
         super().__init__(position)
         self.declarations = declarations
         self.statements = statements
+
+
+class ErrorNode(Stmt):
+    __slots__ = ("message",)
+
+    def __init__(self, message: str, position: Position):
+        super().__init__(position)
+        self.message = message
+
+
+def kind(node: Node) -> type[Node]:
+    """Class of ``node``; Parser asks its tree builder this way so that other
+    builders can hand out nodes that are not Node objects."""
+    return type(node)
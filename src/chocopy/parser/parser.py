@@ -1,45 +1,175 @@
+import enum
+from typing import Any, Callable
+
 from chocopy.scanner.scanner import Scanner
+from chocopy.scanner.buffer import TokenBuffer
 from chocopy.common.token import Token, Position, TokenType
-from chocopy.common.errors import SyntaxError
+from chocopy.common.errors import ChocoPyError, LexicalError, SyntaxError
+import chocopy.parser.node as nodes
 from chocopy.parser.node import (
+    Node,
+    ErrorNode,
     Literal,
     IDStringLiteral,
     StringLiteral,
     IntegerLiteral,
     BoolLiteral,
     NoneLiteral,
-    ClassType,
-    ListType,
-    TypedVar,
-    VariableDefinition,
-    GlobalDeclaration,
-    NoneLocalDeclaration,
     VariableNode,
-    UnaryExpr,
-    BinaryExpr,
-    IfExpr,
     MemberExpr,
     IndexExpr,
-    CallExpr,
-    ListLiteral,
-    IfStmt,
-    WhileStmt,
-    ForStmt,
-    PassStmt,
-    AssignStmt,
-    ExprStmt,
-    ReturnStmt,
-    FunctionDefinition,
-    ClassDefinition,
     Program,
 )
 
+LITERAL_NODES = {
+    TokenType.NONE: NoneLiteral,
+    TokenType.TRUE: BoolLiteral,
+    TokenType.FALSE: BoolLiteral,
+    TokenType.INTEGER: IntegerLiteral,
+    TokenType.ID: IDStringLiteral,
+    TokenType.STRING: StringLiteral,
+}
+LITERALS = frozenset(LITERAL_NODES) - {TokenType.ID}
+ASSIGNABLE = frozenset({VariableNode, MemberExpr, IndexExpr})
+BLOCK_END = frozenset({TokenType.DEDENT, TokenType.EOF})
+STMT_END = BLOCK_END | {TokenType.NEW_LINE}
+UNARY = frozenset({TokenType.MINUS, TokenType.NOT})
+COMPOUND = frozenset({TokenType.IF, TokenType.WHILE, TokenType.FOR})
+CLAUSES = frozenset({TokenType.ELIF, TokenType.ELSE})
+
+OR_POWER = 1
+AND_POWER = 2
+COMPARISON_POWER = 3
+ARITHMETIC_POWER = 4
+TERM_POWER = 5
+UNARY_POWER = 6
+
+# How tightly each binary operator binds its operands. Unary minus and
+# "not" bind tighter than all of them.
+BINDING_POWER = {
+    TokenType.OR: OR_POWER,
+    TokenType.AND: AND_POWER,
+    TokenType.DOUBLE_EQUAL: COMPARISON_POWER,
+    TokenType.NOT_EQUAL: COMPARISON_POWER,
+    TokenType.LESS: COMPARISON_POWER,
+    TokenType.GREATER: COMPARISON_POWER,
+    TokenType.LESS_EQUAL: COMPARISON_POWER,
+    TokenType.GREATER_EQUAL: COMPARISON_POWER,
+    TokenType.IS: COMPARISON_POWER,
+    TokenType.PLUS: ARITHMETIC_POWER,
+    TokenType.MINUS: ARITHMETIC_POWER,
+    TokenType.MULTIPLY: TERM_POWER,
+    TokenType.DOUBLE_SLASH: TERM_POWER,
+    TokenType.PERCENT: TERM_POWER,
+}
+
+
+class Context(enum.Enum):
+    """Where the value of an ExprFrame goes once it is complete."""
+
+    TOP = "top"
+    PARENTHESES = "parentheses"
+    LIST = "list"
+    INDEX = "index"
+    CALL = "call"
+    IF_CONDITION = "if_condition"
+    IF_ELSE = "if_else"
+
+
+class ExprFrame:
+    """Expression under construction in Parser.parse_expression."""
+
+    __slots__ = ("context", "data", "min_power", "allow_if", "values", "operators")
+
+    def __init__(
+        self,
+        context: Context,
+        data: Any = None,
+        min_power: int = OR_POWER,
+        allow_if: bool = True,
+    ):
+        self.context = context
+        self.data = data
+        self.min_power = min_power
+        self.allow_if = allow_if
+        self.values: list = []
+        self.operators: list[tuple[int, Token]] = []
+
+
+class StmtFrame:
+    """Compound statement under construction in Parser.parse_nested.
+
+    ``token`` is the if, elif, while or for keyword, or None for a bare
+    block. ``statements`` collects the block being parsed; for an if it is
+    the then block first and the else block once ``then_block`` is set.
+    """
+
+    __slots__ = (
+        "token",
+        "condition",
+        "identifier",
+        "indent",
+        "then_block",
+        "statements",
+    )
+
+    def __init__(self, token: Token | None, condition: Any, identifier=None):
+        self.token = token
+        self.condition = condition
+        self.identifier = identifier
+        self.indent: Token | None = None
+        self.then_block: list | None = None
+        self.statements: list | None = None
+
+    def is_if(self) -> bool:
+        return self.token is not None and self.token.tokentyp in (
+            TokenType.IF,
+            TokenType.ELIF,
+        )
+
+    def build(self, ast: Any):
+        token = self.token
+        statements = self.statements
+        if token is None:
+            return statements
+        # A frame is built once its last block is closed.
+        assert statements is not None
+        if token.tokentyp == TokenType.WHILE:
+            return ast.WhileStmt(self.condition, statements, token.position)
+        elif token.tokentyp == TokenType.FOR:
+            assert self.identifier is not None
+            return ast.ForStmt(
+                self.identifier, self.condition, statements, token.position
+            )
+        assert self.then_block is not None
+        return ast.IfStmt(self.condition, self.then_block, statements, token.position)
+
 
 class Parser:
-    def __init__(self, sc: Scanner):
+    def __init__(
+        self, sc: Scanner | TokenBuffer, recover: bool = False, ast: Any = nodes
+    ):
+        """With ``recover`` the parser does not stop at the first error: it
+        records every error in ``diagnostics``, skips to the next statement
+        and puts an ErrorNode in its place.
+
+        ``ast`` builds the tree: anything with a constructor per node class
+        and a ``kind`` function, by default the node module itself. An
+        ``Arena`` builds a flat tree instead.
+        """
         self.sc = sc
-        self.current_token = self.sc.scan_token()
-        self.next_token = self.sc.scan_token()
+        self.recover = recover
+        self.ast = ast
+        self.literal_nodes = {
+            tokentyp: getattr(ast, cls.__name__)
+            for tokentyp, cls in LITERAL_NODES.items()
+        }
+        self.diagnostics: list[ChocoPyError] = []
+        # Token at which parsing resumed after the last recovery.
+        self.resumed_at: Token | None = None
+        self.scan_token = self.scan_recovering if recover else sc.scan_token
+        self.current_token = self.scan_token()
+        self.next_token = self.scan_token()
 
     def parse(self) -> Program:
         return self.parse_programm()
@@ -50,7 +180,7 @@ class Parser:
     def consume(self) -> Token:
         curr = self.current_token
         self.current_token = self.next_token
-        self.next_token = self.sc.scan_token()
+        self.next_token = self.scan_token()
         return curr
 
     def expected(self, type: TokenType):
@@ -65,6 +195,82 @@ class Parser:
     def error(self, msg: str, pos: Position):
         raise SyntaxError(msg, pos)
 
+    def scan_recovering(self) -> Token:
+        while True:
+            try:
+                return self.sc.scan_token()
+            except LexicalError as error:
+                # The scanner has moved past the offending character.
+                self.report(error)
+
+    def report(self, error: ChocoPyError):
+        diagnostics = self.diagnostics
+        if (
+            isinstance(error, SyntaxError)
+            and diagnostics
+            and diagnostics[-1].pos.line == error.pos.line
+        ):
+            # Most likely a consequence of the previous error.
+            return
+        diagnostics.append(error)
+
+    def recover_from(self, error: ChocoPyError) -> ErrorNode:
+        """Record ``error`` and skip to the start of the next statement.
+
+        Re-raises ``error`` unless the parser is in recovery mode.
+        """
+        if not self.recover:
+            raise error
+        self.report(error)
+
+        token = self.current_token
+        if token is self.resumed_at:
+            # Nothing was parsed since the last recovery.
+            if token.tokentyp == TokenType.EOF:
+                raise error
+            self.consume()
+        self.synchronize()
+        self.resumed_at = self.current_token
+        return self.ast.ErrorNode(error.message, error.pos)
+
+    def synchronize(self):
+        """Skip past the next NEW_LINE and the blocks that may follow it, or
+        up to the DEDENT or EOF that ends the enclosing block."""
+        depth = 0
+        while True:
+            tokentyp = self.current_token.tokentyp
+            if tokentyp == TokenType.EOF:
+                return
+            elif tokentyp == TokenType.DEDENT:
+                if depth == 0:
+                    return
+                self.consume()
+                depth -= 1
+                # elif and else clauses belong to the skipped statement.
+                if depth == 0 and self.current_token.tokentyp not in CLAUSES:
+                    return
+            elif tokentyp == TokenType.NEW_LINE:
+                self.consume()
+                if depth == 0 and not self.check(TokenType.INDENT):
+                    return
+            else:
+                if tokentyp == TokenType.INDENT:
+                    depth += 1
+                self.consume()
+
+    def attempt(self, parse: Callable[[], Node]) -> Node:
+        try:
+            return parse()
+        except ChocoPyError as error:
+            return self.recover_from(error)
+
+    def end_block(self):
+        while True:
+            try:
+                return self.expected(TokenType.DEDENT)
+            except SyntaxError as error:
+                self.recover_from(error)
+
     def check(self, type: TokenType):
         return self.peek().tokentyp == type
 
@@ -74,24 +280,27 @@ class Parser:
         stmts = []
 
         while self.peek().tokentyp == TokenType.CLASS:
-            declarations.append(self.parse_class_def())
+            declarations.append(self.attempt(self.parse_class_def))
 
         while (
             self.peek().tokentyp == TokenType.ID
             and self.next_token.tokentyp == TokenType.COLON
         ):
-            declarations.append(self.parse_var_def())
+            declarations.append(self.attempt(self.parse_var_def))
 
         while self.peek().tokentyp == TokenType.DEF:
-            declarations.append(self.parse_func_def())
+            declarations.append(self.attempt(self.parse_func_def))
 
         while self.peek().tokentyp != TokenType.EOF:
             if self.peek().tokentyp == TokenType.NEW_LINE:
                 self.consume()
                 continue
-            stmts.append(self.parse_stmt())
+            try:
+                stmts.append(self.parse_stmt())
+            except ChocoPyError as error:
+                stmts.append(self.recover_from(error))
 
-        return Program(declarations, stmts, pos)
+        return self.ast.Program(declarations, stmts, pos)
 
     def parse_class_def(self):
         class_token = self.consume()
@@ -105,7 +314,7 @@ class Parser:
 
         var_defs, method_defs = self.parse_class_body()
 
-        return ClassDefinition(
+        return self.ast.ClassDefinition(
             name.lexeme, super_name.lexeme, var_defs, method_defs, class_token.position
         )
 
@@ -124,11 +333,11 @@ class Parser:
                 self.peek().tokentyp == TokenType.ID
                 and self.next_token.tokentyp == TokenType.COLON
             ):
-                var_defs.append(self.parse_var_def())
+                var_defs.append(self.attempt(self.parse_var_def))
             while self.peek().tokentyp == TokenType.DEF:
-                method_defs.append(self.parse_func_def())
+                method_defs.append(self.attempt(self.parse_func_def))
 
-        self.expected(TokenType.DEDENT)
+        self.end_block()
         return var_defs, method_defs
 
     def parse_func_def(self):
@@ -147,7 +356,7 @@ class Parser:
         self.expected(TokenType.COLON)
         var_defs, func_defs, stmt_defs = self.parse_func_body()
 
-        return FunctionDefinition(
+        return self.ast.FunctionDefinition(
             id.lexeme,
             params,
             return_type,
@@ -171,24 +380,27 @@ class Parser:
                 token.tokentyp == TokenType.ID
                 and self.next_token.tokentyp == TokenType.COLON
             ):
-                var_defs.append(self.parse_var_def())
+                var_defs.append(self.attempt(self.parse_var_def))
             elif token.tokentyp == TokenType.GLOBAL:
-                var_defs.append(self.parse_global_decl())
+                var_defs.append(self.attempt(self.parse_global_decl))
             elif token.tokentyp == TokenType.NONLOCAL:
-                var_defs.append(self.parse_nonlocal_decl())
+                var_defs.append(self.attempt(self.parse_nonlocal_decl))
             else:
                 break
 
         while self.peek().tokentyp == TokenType.DEF:
-            func_defs.append(self.parse_func_def())
+            func_defs.append(self.attempt(self.parse_func_def))
 
-        while self.peek().tokentyp != TokenType.DEDENT:
+        while self.peek().tokentyp not in BLOCK_END:
             if self.peek().tokentyp == TokenType.NEW_LINE:
                 self.consume()
                 continue
-            stmt_defs.append(self.parse_stmt())
+            try:
+                stmt_defs.append(self.parse_stmt())
+            except ChocoPyError as error:
+                stmt_defs.append(self.recover_from(error))
 
-        self.expected(TokenType.DEDENT)
+        self.end_block()
         return var_defs, func_defs, stmt_defs
 
     def parse_typed_var(self):
@@ -198,7 +410,7 @@ class Parser:
             _ = self.expected(TokenType.COLON)
             type = self.parse_type()
 
-            return TypedVar(id.lexeme, type, id.position)
+            return self.ast.TypedVar(id.lexeme, type, id.position)
         else:
             self.error(
                 f"Expected variable identifier, found {token.tokentyp}", token.position
@@ -208,15 +420,15 @@ class Parser:
         token = self.peek()
         if token.tokentyp == TokenType.ID:
             self.consume()
-            return ClassType(token.lexeme, token.position)
+            return self.ast.ClassType(token.lexeme, token.position)
         elif token.tokentyp == TokenType.BRACE_LEFT:
             self.consume()
             el = self.parse_type()
             self.expected(TokenType.BRACE_RIGHT)
-            return ListType(el, token.position)
+            return self.ast.ListType(el, token.position)
         elif token.tokentyp == TokenType.STRING:
             self.consume()
-            return ClassType(token.lexeme, token.position)
+            return self.ast.ClassType(token.lexeme, token.position)
         else:
             self.error(
                 f"Expected variable type, found {token.tokentyp}", token.position
@@ -230,7 +442,7 @@ class Parser:
             if self.peek().tokentyp != TokenType.EOF:
                 self.expected(TokenType.NEW_LINE)
 
-            return GlobalDeclaration(id.lexeme, id.position)
+            return self.ast.GlobalDeclaration(id.lexeme, id.position)
         else:
             self.error(
                 f"Expected 'global' keyword, found {token.tokentyp}", token.position
@@ -244,7 +456,7 @@ class Parser:
             if self.peek().tokentyp != TokenType.EOF:
                 self.expected(TokenType.NEW_LINE)
 
-            return NoneLocalDeclaration(id.lexeme, id.position)
+            return self.ast.NoneLocalDeclaration(id.lexeme, id.position)
         else:
             self.error(
                 f"Expected 'nonlocal' keyword, found {token.tokentyp}", token.position
@@ -256,84 +468,138 @@ class Parser:
         literal = self.parse_literal()
         if self.peek().tokentyp != TokenType.EOF:
             self.expected(TokenType.NEW_LINE)
-        return VariableDefinition(var, literal)
+        return self.ast.VariableDefinition(var, literal)
 
     def parse_stmt(self):
-        token = self.peek()
-        if token.tokentyp == TokenType.IF:
-            return self.parse_if_stmt()
-        elif token.tokentyp == TokenType.WHILE:
-            return self.parse_while_stmt()
-        elif token.tokentyp == TokenType.FOR:
-            return self.parse_for_stmt()
-        else:
-            return self.parse_simple_stmt()
-
-    def parse_if_stmt(self):
-        if_token = self.consume()
-        cond = self.parse_expr()
-        self.expected(TokenType.COLON)
-        then_block = self.parse_block()
+        if self.peek().tokentyp in COMPOUND:
+            return self.parse_compound_stmt()
+        return self.parse_simple_stmt()
 
-        else_block = []
+    def parse_compound_stmt(self):
+        return self.parse_nested(self.open_compound_stmt())
 
-        if self.peek().tokentyp == TokenType.ELIF:
-            else_block.append(self.parse_if_stmt())
-        elif self.peek().tokentyp == TokenType.ELSE:
-            self.consume()
-            self.expected(TokenType.COLON)
-            else_block = self.parse_block()
+    def parse_block(self):
+        frame = StmtFrame(None, None)
+        self.open_block(frame)
+        return self.parse_nested(frame)
+
+    def open_compound_stmt(self) -> "StmtFrame":
+        """Parse the header of an if, elif, while or for statement and the
+        start of its block."""
+        token = self.consume()
+        identifier = None
+        if token.tokentyp == TokenType.FOR:
+            identifier = self.expected(TokenType.ID).lexeme
+            self.expected(TokenType.IN)
+        frame = StmtFrame(token, self.parse_expr(), identifier)
+        self.expected(TokenType.COLON)
+        self.open_block(frame)
+        return frame
 
-        return IfStmt(cond, then_block, else_block, if_token.position)
+    def open_block(self, frame: "StmtFrame"):
+        self.expected(TokenType.NEW_LINE)
+        frame.indent = self.expected(TokenType.INDENT)
+        frame.statements = []
 
-    def parse_while_stmt(self):
-        while_token = self.consume()
-        while_cond = self.parse_expr()
-        self.expected(TokenType.COLON)
-        return WhileStmt(while_cond, self.parse_block(), while_token.position)
+    def parse_nested(self, frame: "StmtFrame"):
+        """Parse the blocks of ``frame`` and all statements nested in them.
 
-    def parse_for_stmt(self):
-        for_token = self.consume()
-        id = self.expected(TokenType.ID)
-        self.expected(TokenType.IN)
-        iterable = self.parse_expr()
-        self.expected(TokenType.COLON)
-        body = self.parse_block()
-        return ForStmt(id.lexeme, iterable, body, for_token.position)
+        Compound statements are kept on an explicit stack of StmtFrames
+        instead of recursing through parse_block and parse_stmt, so nesting
+        depth is not limited by Python's recursion limit.
+        """
+        frames = [frame]
+        while True:
+            frame = frames[-1]
+            # Every frame on top of the stack has a block open.
+            statements = frame.statements
+            assert statements is not None and frame.indent is not None
+            try:
+                tokentyp = self.current_token.tokentyp
+                if tokentyp == TokenType.NEW_LINE:
+                    self.consume()
+                    continue
+                elif tokentyp in COMPOUND:
+                    frames.append(self.open_compound_stmt())
+                    continue
+                elif tokentyp != TokenType.DEDENT:
+                    statements.append(self.parse_simple_stmt())
+                    continue
+
+                if len(statements) == 0:
+                    self.error(f"Empty blocks are not allowed", frame.indent.position)
+                self.expected(TokenType.DEDENT)
+
+                if frame.then_block is None and frame.is_if():
+                    frame.then_block = frame.statements
+                    frame.statements = None
+                    if self.check(TokenType.ELIF):
+                        # The elif statement becomes the whole else block.
+                        frames.append(self.open_compound_stmt())
+                        continue
+                    elif self.check(TokenType.ELSE):
+                        self.consume()
+                        self.expected(TokenType.COLON)
+                        self.open_block(frame)
+                        continue
+                    frame.statements = []
+            except ChocoPyError as error:
+                error_node = self.recover_from(error)
+                frame = frames[-1]
+                if frame.statements is not None:
+                    frame.statements.append(error_node)
+                    continue
+                # The error came between two blocks of frame and ends it.
+                frame.statements = [error_node]
+
+            node = self.close_frame(frames)
+            if node is not None:
+                return node
+
+    def close_frame(self, frames: list["StmtFrame"]):
+        """Build the statement of the innermost frame and add it to the
+        enclosing one. Returns the result once the last frame is closed."""
+        node = frames.pop().build(self.ast)
+        while frames:
+            parent = frames[-1]
+            if parent.statements is not None:
+                parent.statements.append(node)
+                return None
+            # An elif statement completes the if it belongs to.
+            parent.statements = [node]
+            node = frames.pop().build(self.ast)
+        return node
 
     def parse_simple_stmt(self):
         token = self.peek()
         node = None
         if token.tokentyp == TokenType.PASS:
             self.consume()
-            node = PassStmt(token.position)
+            node = self.ast.PassStmt(token.position)
         elif token.tokentyp == TokenType.RETURN:
             return_token = self.consume()
             val = None
-            if self.peek().tokentyp not in [
-                TokenType.NEW_LINE,
-                TokenType.DEDENT,
-                TokenType.EOF,
-            ]:
+            if self.peek().tokentyp not in STMT_END:
                 val = self.parse_expr()
-            node = ReturnStmt(val, return_token.position)
+            node = self.ast.ReturnStmt(val, return_token.position)
         else:
             left = self.parse_expr()
             if self.peek().tokentyp == TokenType.EQUAL:
                 equal_token = self.consume()
-                if not isinstance(left, (VariableNode, MemberExpr, IndexExpr)):
+                kind = self.ast.kind(left)
+                if kind not in ASSIGNABLE:
                     self.error(
-                        f"cannot assign to {left.__class__.__name__} at x",
+                        f"cannot assign to {kind.__name__} at x",
                         equal_token.position,
                     )
                 right = self.parse_expr()
-                node = AssignStmt(left, right, equal_token.position)
+                node = self.ast.AssignStmt(left, right, equal_token.position)
             else:
-                node = ExprStmt(left, token.position)
+                node = self.ast.ExprStmt(left, token.position)
 
         if self.peek().tokentyp == TokenType.NEW_LINE:
             self.consume()
-        elif self.peek().tokentyp not in [TokenType.EOF, TokenType.DEDENT]:
+        elif self.peek().tokentyp not in BLOCK_END:
             self.error(
                 f"Exepcted newline after statement, found {self.peek().tokentyp}",
                 self.peek().position,
@@ -341,180 +607,192 @@ class Parser:
 
         return node
 
-    def parse_block(self):
-        self.expected(TokenType.NEW_LINE)
-        token = self.expected(TokenType.INDENT)
-        stmts = []
-        while self.peek().tokentyp != TokenType.DEDENT:
-            if self.peek().tokentyp == TokenType.NEW_LINE:
-                self.consume()
-                continue
-            stmts.append(self.parse_stmt())
-
-        if len(stmts) == 0:
-            self.error(f"Empty blocks are not allowed", token.position)
-
-        self.expected(TokenType.DEDENT)
-        return stmts
-
     def parse_literal(self) -> Literal:
         token = self.peek()
-        if token.tokentyp == TokenType.NONE:
-            self.consume()
-            return NoneLiteral(token)
-        elif token.tokentyp == TokenType.TRUE:
-            self.consume()
-            return BoolLiteral(token)
-        elif token.tokentyp == TokenType.FALSE:
-            self.consume()
-            return BoolLiteral(token)
-        elif token.tokentyp == TokenType.INTEGER:
-            self.consume()
-            return IntegerLiteral(token)
-        elif token.tokentyp == TokenType.ID:
-            self.consume()
-            return IDStringLiteral(token)
-        elif token.tokentyp == TokenType.STRING:
-            self.consume()
-            return StringLiteral(token)
-        else:
+        node_type = self.literal_nodes.get(token.tokentyp)
+        if node_type is None:
             self.error(
                 f"Expected special Literal type, found {token.tokentyp}", token.position
             )
+        self.consume()
+        return node_type(token)
 
     def parse_expr(self):
-        node = self.parse_or_expr()
-        if self.peek().tokentyp == TokenType.IF:
-            token = self.consume()
-            cond = self.parse_or_expr()
-            self.expected(TokenType.ELSE)
-            else_branch = self.parse_expr()
-            return IfExpr(node, cond, else_branch, token.position)
-        return node
+        return self.parse_expression(OR_POWER, True)
 
     def parse_primary(self):
-        node = None
         token = self.peek()
-        if token.tokentyp in [
-            TokenType.INTEGER,
-            TokenType.STRING,
-            TokenType.TRUE,
-            TokenType.FALSE,
-            TokenType.NONE,
-        ]:
-            node = self.parse_literal()
-        elif token.tokentyp == TokenType.ID:
-            self.consume()
-            node = VariableNode(token.lexeme, token.position)
-        elif token.tokentyp == TokenType.BRACKET_LEFT:
-            self.consume()
-            expr = self.parse_expr()
-            self.expected(TokenType.BRACKET_RIGHT)
-            node = expr
-        elif token.tokentyp == TokenType.BRACE_LEFT:
-            self.consume()
-            expressions = []
-            if not self.check(TokenType.BRACE_RIGHT):
-                expressions.append(self.parse_expr())
-            while self.check(TokenType.COMMA):
-                self.consume()
-                expressions.append(self.parse_expr())
-            self.expected(TokenType.BRACE_RIGHT)
-            node = ListLiteral(expressions, token.position)
-        else:
+        if token.tokentyp in UNARY:
             self.error(f"Expected cexpr found {token.tokentyp}", token.position)
+        return self.parse_expression(UNARY_POWER, False)
+
+    def parse_unary(self):
+        return self.parse_expression(UNARY_POWER, False)
+
+    def parse_binary(self, min_power: int):
+        return self.parse_expression(min_power, False)
+
+    def parse_term(self):
+        return self.parse_binary(TERM_POWER)
 
+    def parse_arithmetic(self):
+        return self.parse_binary(ARITHMETIC_POWER)
+
+    def parse_comparison(self):
+        return self.parse_binary(COMPARISON_POWER)
+
+    def parse_and_expr(self):
+        return self.parse_binary(AND_POWER)
+
+    def parse_or_expr(self):
+        return self.parse_binary(OR_POWER)
+
+    def parse_expression(self, min_power: int, allow_if: bool):
+        """Parse an expression whose operators bind at least ``min_power``.
+
+        Works with an explicit stack of ExprFrames instead of recursion, so
+        nesting depth is not limited by Python's recursion limit. Each frame
+        parses one operator chain by precedence climbing over BINDING_POWER,
+        keeping operands and pending operators on its own stacks. Unary
+        operators bind tighter than any binary operator and all binary
+        operators are left-associative. A sub-expression (parentheses, list
+        element, index, call argument, conditional branch) pushes a frame
+        whose Context says where its value goes.
+        """
+        ast = self.ast
+        frames = [ExprFrame(Context.TOP, None, min_power, allow_if)]
         while True:
-            curr_token = self.peek()
-            if curr_token.tokentyp == TokenType.DOT:
+            frame = frames[-1]
+
+            # Operand: prefix operators, then an atom.
+            token = self.current_token
+            while token.tokentyp in UNARY:
                 self.consume()
-                member = self.expected(TokenType.ID)
-                node = MemberExpr(
-                    node,
-                    VariableNode(member.lexeme, member.position),
-                    curr_token.position,
-                )
-            elif curr_token.tokentyp == TokenType.BRACE_LEFT:
+                frame.operators.append((UNARY_POWER, token))
+                token = self.current_token
+
+            tokentyp = token.tokentyp
+            if tokentyp in LITERALS:
+                node = self.parse_literal()
+            elif tokentyp == TokenType.ID:
                 self.consume()
-                expr = self.parse_expr()
-                self.expected(TokenType.BRACE_RIGHT)
-                node = IndexExpr(node, expr, curr_token.position)
-            elif curr_token.tokentyp == TokenType.BRACKET_LEFT:
+                node = ast.VariableNode(token.lexeme, token.position)
+            elif tokentyp == TokenType.BRACKET_LEFT:
                 self.consume()
-                args = []
-                if not self.check(TokenType.BRACKET_RIGHT):
-                    args.append(self.parse_expr())
-                while self.check(TokenType.COMMA):
-                    self.consume()
-                    args.append(self.parse_expr())
-                self.expected(TokenType.BRACKET_RIGHT)
-                node = CallExpr(node, args, curr_token.position)
+                frames.append(ExprFrame(Context.PARENTHESES))
+                continue
+            elif tokentyp == TokenType.BRACE_LEFT:
+                self.consume()
+                if not self.check(TokenType.BRACE_RIGHT):
+                    frames.append(ExprFrame(Context.LIST, (token, [])))
+                    continue
+                self.consume()
+                node = ast.ListLiteral([], token.position)
             else:
-                break
-
-        return node
+                self.error(f"Expected cexpr found {tokentyp}", token.position)
 
-    def parse_unary(self):
-        token = self.peek()
-        if token.tokentyp == TokenType.MINUS or token.tokentyp == TokenType.NOT:
-            operator = self.consume()
-            return UnaryExpr(operator.lexeme, self.parse_unary(), token.position)
-        else:
-            return self.parse_primary()
+            node = self.complete_operand(frames, node)
+            if node is not None:
+                return node
 
-    def parse_term(self):
-        left = self.parse_unary()
-        while self.peek().tokentyp in [
-            TokenType.MULTIPLY,
-            TokenType.DOUBLE_SLASH,
-            TokenType.PERCENT,
-        ]:
-            op = self.consume()
-            right = self.parse_unary()
-            left = BinaryExpr(left, op.lexeme, right, op.position)
-
-        return left
+    def complete_operand(self, frames: list["ExprFrame"], node):
+        """Continue parsing after the atom ``node``.
 
-    def parse_arithmetic(self):
-        left = self.parse_term()
-        while self.peek().tokentyp in [TokenType.PLUS, TokenType.MINUS]:
-            op = self.consume()
-            right = self.parse_term()
-            left = BinaryExpr(left, op.lexeme, right, op.position)
-
-        return left
+        Returns the value of the whole expression once the bottom frame is
+        complete, or None when another operand has to be parsed first.
+        """
+        ast = self.ast
+        while True:
+            frame = frames[-1]
+            token = self.current_token
+            tokentyp = token.tokentyp
 
-    def parse_comparison(self):
-        left = self.parse_arithmetic()
-        while self.peek().tokentyp in [
-            TokenType.DOUBLE_EQUAL,
-            TokenType.NOT_EQUAL,
-            TokenType.LESS,
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS_EQUAL,
-            TokenType.IS,
-        ]:
-            op = self.consume()
-            right = self.parse_arithmetic()
-            left = BinaryExpr(left, op.lexeme, right, op.position)
-
-        return left
+            # Postfix operators bind tightest.
+            if tokentyp == TokenType.DOT:
+                self.consume()
+                member = self.expected(TokenType.ID)
+                member = ast.VariableNode(member.lexeme, member.position)
+                node = ast.MemberExpr(node, member, token.position)
+                continue
+            elif tokentyp == TokenType.BRACE_LEFT:
+                self.consume()
+                frames.append(ExprFrame(Context.INDEX, (node, token)))
+                return None
+            elif tokentyp == TokenType.BRACKET_LEFT:
+                self.consume()
+                if not self.check(TokenType.BRACKET_RIGHT):
+                    frames.append(ExprFrame(Context.CALL, (node, token, [])))
+                    return None
+                self.consume()
+                node = ast.CallExpr(node, [], token.position)
+                continue
 
-    def parse_and_expr(self):
-        left = self.parse_comparison()
-        while self.peek().tokentyp == TokenType.AND:
-            op = self.consume()
-            right = self.parse_comparison()
-            left = BinaryExpr(left, op.lexeme, right, op.position)
+            values = frame.values
+            operators = frame.operators
+            while operators and operators[-1][0] == UNARY_POWER:
+                operator = operators.pop()[1]
+                node = ast.UnaryExpr(operator.lexeme, node, operator.position)
 
-        return left
+            power = BINDING_POWER.get(tokentyp, 0)
+            if power >= frame.min_power:
+                self.consume()
+                while operators and operators[-1][0] >= power:
+                    operator = operators.pop()[1]
+                    node = ast.BinaryExpr(
+                        values.pop(), operator.lexeme, node, operator.position
+                    )
+                values.append(node)
+                operators.append((power, token))
+                return None
+
+            while operators:
+                operator = operators.pop()[1]
+                node = ast.BinaryExpr(
+                    values.pop(), operator.lexeme, node, operator.position
+                )
 
-    def parse_or_expr(self):
-        left = self.parse_and_expr()
-        while self.peek().tokentyp == TokenType.OR:
-            op = self.consume()
-            right = self.parse_and_expr()
-            left = BinaryExpr(left, op.lexeme, right, op.position)
+            if frame.allow_if and tokentyp == TokenType.IF:
+                self.consume()
+                frames.append(
+                    ExprFrame(Context.IF_CONDITION, (node, token), allow_if=False)
+                )
+                return None
+
+            # The frame is complete; hand its value to the enclosing one.
+            while True:
+                frame = frames.pop()
+                context = frame.context
+                if context == Context.TOP:
+                    return node
+                elif context == Context.IF_CONDITION:
+                    self.expected(TokenType.ELSE)
+                    then, token = frame.data
+                    frames.append(ExprFrame(Context.IF_ELSE, (then, node, token)))
+                    return None
+                elif context == Context.IF_ELSE:
+                    then, condition, token = frame.data
+                    node = ast.IfExpr(then, condition, node, token.position)
+                    # The conditional completes the frame that saw the "if".
+                    continue
+                break
 
-        return left
+            if context == Context.PARENTHESES:
+                self.expected(TokenType.BRACKET_RIGHT)
+            elif context == Context.INDEX:
+                self.expected(TokenType.BRACE_RIGHT)
+                obj, token = frame.data
+                node = ast.IndexExpr(obj, node, token.position)
+            else:
+                elements = frame.data[-1]
+                elements.append(node)
+                if self.check(TokenType.COMMA):
+                    self.consume()
+                    frames.append(ExprFrame(context, frame.data))
+                    return None
+                if context == Context.LIST:
+                    self.expected(TokenType.BRACE_RIGHT)
+                    node = ast.ListLiteral(elements, frame.data[0].position)
+                else:
+                    self.expected(TokenType.BRACKET_RIGHT)
+                    function, token, _ = frame.data
+                    node = ast.CallExpr(function, elements, token.position)
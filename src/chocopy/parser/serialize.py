@@ -0,0 +1,212 @@
+import hashlib
+import marshal
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from typing import Any
+
+from chocopy.parser.arena import KINDS, LIST, NODE, NODE_CLASSES, VALUE, Arena
+from chocopy.parser.node import Node
+from chocopy.parser.visitor import field_getter
+
+# Entries are only read back with the same node classes and byte order.
+SIGNATURE = hashlib.sha256(
+    repr(
+        (2, sys.byteorder, [(cls.__name__, cls._fields) for cls in NODE_CLASSES])
+    ).encode()
+).hexdigest()[:16]
+
+
+# Per node class: its kind and a function that returns its field values.
+ENCODERS = {cls: (KINDS[cls], field_getter(cls)) for cls in NODE_CLASSES}
+# Per kind: the class, and its field names from the last to the first.
+DECODERS = [(cls, cls._fields[::-1]) for cls in NODE_CLASSES]
+
+# The narrowest array type codes, signed and unsigned.
+SIGNED = ("b", "h", "i", "q")
+UNSIGNED = ("B", "H", "I", "Q")
+
+
+def narrow(values: list[int], codes: tuple[str, ...]) -> tuple[str, bytes]:
+    """``values`` as the bytes of the narrowest array that holds them."""
+    low = min(values, default=0)
+    high = max(values, default=0)
+    for code in codes:
+        bits = array(code).itemsize * 8
+        if code.islower():
+            fits = -(1 << bits - 1) <= low and high < 1 << bits - 1
+        else:
+            fits = high < 1 << bits
+        if fits:
+            return code, array(code, values).tobytes()
+    raise ValueError("value out of range")
+
+
+def pack(values: list, kinds: list, lines: list, columns: list, fields: list) -> bytes:
+    """Entry of the nodes walked in preorder, last child first, with the
+    fields of each node from the last to the first; the lists are reversed
+    in place into postorder with fields in order."""
+    for items in (kinds, lines, columns, fields):
+        items.reverse()
+    # Lines grow slowly through a tree, so their differences stay small.
+    deltas = [b - a for a, b in zip([0, *lines], lines)]
+    return zlib.compress(
+        marshal.dumps(
+            (
+                SIGNATURE,
+                values,
+                bytes(kinds),
+                narrow(deltas, SIGNED),
+                narrow(columns, UNSIGNED),
+                narrow(fields, UNSIGNED),
+            )
+        ),
+        # The fastest level already gets most of the gain on the arrays.
+        1,
+    )
+
+
+def dumps(node: Node) -> bytes:
+    """Binary form of the tree ``node``, positions included.
+
+    Nodes are stored in postorder as a kind, a line, a column and one int
+    per field: ``NODE`` for a child, the length of a list of children, or
+    the index of a value, tagged like Arena fields. Children are not
+    numbered: reading the nodes back in order, the children of a node are
+    the last ones read that have no parent yet.
+    """
+    values: list[Any] = []
+    value_index: dict[tuple[type, Any], int] = {}
+    kinds: list[int] = []
+    lines: list[int] = []
+    columns: list[int] = []
+    fields: list[int] = []
+    encoders = ENCODERS
+    stack = [node]
+    pop = stack.pop
+    push = stack.append
+    extend = stack.extend
+    while stack:
+        node = pop()
+        kind, getter = encoders[type(node)]
+        kinds.append(kind)
+        pos = node._pos
+        lines.append(pos >> 32)
+        columns.append(pos & 0xFFFFFFFF)
+        codes = []
+        for value in getter(node):
+            cls = type(value)
+            if cls is list:
+                codes.append(len(value) << 2 | LIST)
+                extend(value)
+            elif cls in encoders:
+                codes.append(NODE)
+                push(value)
+            else:
+                # Keyed with the type so that True and 1 stay apart.
+                key = (cls, value)
+                index = value_index.get(key)
+                if index is None:
+                    index = value_index[key] = len(values)
+                    values.append(value)
+                codes.append(index << 2 | VALUE)
+        codes.reverse()
+        fields.extend(codes)
+    return pack(values, kinds, lines, columns, fields)
+
+
+def dumps_arena(arena: Arena) -> bytes:
+    """Binary form of the tree whose root is the last node of ``arena``, as
+    in arenas the Parser builds; loads reads it back as Node objects."""
+    kinds: list[int] = []
+    lines: list[int] = []
+    columns: list[int] = []
+    fields: list[int] = []
+    arena_kinds, positions, first = arena.kinds, arena.positions, arena.first
+    arena_fields, children = arena.fields, arena.children
+    counts = [len(cls._fields) for cls in NODE_CLASSES]
+    stack = [len(arena_kinds) - 1] if len(arena_kinds) else []
+    pop = stack.pop
+    push = stack.append
+    extend = stack.extend
+    while stack:
+        index = pop()
+        kind = arena_kinds[index]
+        kinds.append(kind)
+        pos = positions[index]
+        lines.append(pos >> 32)
+        columns.append(pos & 0xFFFFFFFF)
+        start = first[index]
+        codes = []
+        for field in arena_fields[start : start + counts[kind]]:
+            tag = field & 3
+            if tag == NODE:
+                codes.append(NODE)
+                push(field >> 2)
+            elif tag == LIST:
+                at = (field >> 2) + 1
+                length = children[at - 1]
+                codes.append(length << 2 | LIST)
+                extend(children[at : at + length])
+            else:
+                # Arena.values is the value table, so the field stays as is.
+                codes.append(field)
+        codes.reverse()
+        fields.extend(codes)
+    return pack(arena.values, kinds, lines, columns, fields)
+
+
+def loads(data: bytes) -> Node:
+    """Tree saved by dumps; ValueError if ``data`` cannot be read back."""
+    try:
+        signature, values, kinds, lines, columns, fields = marshal.loads(
+            zlib.decompress(data)
+        )
+    except (zlib.error, EOFError, TypeError, ValueError) as error:
+        raise ValueError(f"not a serialized tree: {error}") from None
+    if signature != SIGNATURE:
+        raise ValueError("tree was serialized by another version")
+    try:
+        return build(values, kinds, lines, columns, fields)
+    except (IndexError, KeyError, TypeError, ValueError, AttributeError) as error:
+        raise ValueError(f"not a serialized tree: {error!r}") from None
+
+
+def build(values: list, kinds: bytes, lines, columns, fields) -> Node:
+    """Root of the nodes of a dumps entry, built in postorder on a stack."""
+    lines = accumulate(array(lines[0], lines[1]))
+    columns = array(columns[0], columns[1])
+    fields = array(fields[0], fields[1]).tolist()
+    decoders = DECODERS
+    new = object.__new__
+    stack: list = []
+    pop = stack.pop
+    push = stack.append
+    end = 0
+    for kind, line, column in zip(kinds, lines, columns, strict=True):
+        cls, names = decoders[kind]
+        node = new(cls)
+        node._pos = line << 32 | column
+        end += len(names)
+        i = end
+        # The last field holds the children read last.
+        for name in names:
+            i -= 1
+            code = fields[i]
+            tag = code & 3
+            if tag == NODE:
+                value = pop()
+            elif tag == VALUE:
+                value = values[code >> 2]
+            else:
+                at = len(stack) - (code >> 2)
+                if at < 0:
+                    raise IndexError("list of missing children")
+                value = stack[at:]
+                del stack[at:]
+            setattr(node, name, value)
+        push(node)
+    if len(stack) != 1 or end != len(fields):
+        raise ValueError("not a single tree")
+    return stack[0]
@@ -0,0 +1,184 @@
+from operator import attrgetter
+from typing import Any, Callable, Iterator
+
+from chocopy.parser.node import Node
+
+
+def child_nodes(node: Node) -> list[Node]:
+    """Direct children of ``node``, in field order."""
+    children = []
+    for name in node._fields:
+        value = getattr(node, name)
+        # Lists in the tree only ever hold nodes.
+        if type(value) is list:
+            children.extend(value)
+        elif isinstance(value, Node):
+            children.append(value)
+    return children
+
+
+def field_getter(cls: type[Node]) -> Callable[[Node], tuple]:
+    """Function that returns the field values of a ``cls`` node as a tuple,
+    faster than getattr per field."""
+    fields = cls._fields
+    if len(fields) == 1:
+        name = fields[0]
+        return lambda node: (getattr(node, name),)
+    return attrgetter(*fields) if fields else lambda node: ()
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """``node`` and every node below it, in preorder, without recursion."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        children = child_nodes(node)
+        children.reverse()
+        stack.extend(children)
+
+
+def node_classes() -> list[type[Node]]:
+    classes = []
+    stack = [Node]
+    while stack:
+        cls = stack.pop()
+        classes.append(cls)
+        stack.extend(cls.__subclasses__())
+    return classes
+
+
+def dispatch_table(cls: type, prefix: str, default: Callable) -> dict[type, Callable]:
+    """Map every node class to the ``prefix``-method of ``cls`` for it, or
+    for its nearest base class that has one, or to ``default``."""
+    return {
+        node_class: resolve(cls, prefix, node_class, None) or default
+        for node_class in node_classes()
+    }
+
+
+def resolve(
+    cls: type, prefix: str, node_class: type, default: Callable | None
+) -> Callable | None:
+    for base in node_class.__mro__:
+        method = getattr(cls, prefix + base.__name__, None)
+        if method is not None:
+            return method
+    return default
+
+
+class NodeVisitor:
+    """Recursive pass over a Node tree.
+
+    visit(node) calls ``visit_<Class>(node)`` for the class of ``node`` or the
+    nearest base class with such a method, and returns its result. Without
+    one it calls generic_visit, which visits the children. Methods are looked
+    up once per visitor class and kept in a table keyed by node class, so a
+    visit costs one dict lookup whatever the number of methods.
+
+    Recursion follows the depth of the tree; use NodeWalker where that can
+    be deeper than the recursion limit.
+    """
+
+    _dispatch: dict[type, Callable]
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._dispatch = dispatch_table(cls, "visit_", cls.generic_visit)
+
+    def visit(self, node: Node) -> Any:
+        method = self._dispatch.get(type(node)) or self.resolve(type(node))
+        return method(self, node)
+
+    def resolve(self, node_class: type) -> Callable:
+        cls = type(self)
+        method = resolve(cls, "visit_", node_class, None) or cls.generic_visit
+        self._dispatch[node_class] = method
+        return method
+
+    def generic_visit(self, node: Node) -> Any:
+        # visit() inlined: this runs once for most nodes of the tree.
+        dispatch = self._dispatch
+        for child in child_nodes(node):
+            (dispatch.get(type(child)) or self.resolve(type(child)))(self, child)
+
+
+NodeVisitor._dispatch = dispatch_table(NodeVisitor, "visit_", NodeVisitor.generic_visit)
+
+
+class NodeTransformer(NodeVisitor):
+    """NodeVisitor that rebuilds the tree from what its methods return.
+
+    generic_visit replaces every child with the result of visiting it. In a
+    list, None drops the child and a list splices its items in place.
+    """
+
+    def generic_visit(self, node: Node) -> Any:
+        for name in node._fields:
+            value = getattr(node, name)
+            if type(value) is list:
+                items = []
+                for item in value:
+                    item = self.visit(item)
+                    if type(item) is list:
+                        items.extend(item)
+                    elif item is not None:
+                        items.append(item)
+                value[:] = items
+            elif isinstance(value, Node):
+                setattr(node, name, self.visit(value))
+        return node
+
+
+class NodeWalker:
+    """Non-recursive pass over a Node tree of any depth.
+
+    walk(root) calls ``enter_<Class>(node)`` before the children of a node
+    and ``leave_<Class>(node)`` after them, resolved like NodeVisitor methods;
+    either may be missing. The children are skipped when enter returns
+    False.
+    """
+
+    # (enter, leave) for every node class.
+    _handlers: dict[type, tuple[Callable | None, Callable | None]]
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._handlers = handler_table(cls)
+
+    def walk(self, root: Node):
+        handlers = self._handlers
+        # Nodes still to enter, and (node, leave) pairs once entered.
+        stack: list[Any] = [root]
+        while stack:
+            node = stack.pop()
+            if type(node) is tuple:
+                node, leave = node
+                leave(self, node)
+                continue
+            cls = type(node)
+            pair = handlers.get(cls)
+            if pair is None:
+                pair = handlers[cls] = handlers_for(type(self), cls)
+            enter, leave = pair
+            if enter is not None and enter(self, node) is False:
+                continue
+            if leave is not None:
+                stack.append((node, leave))
+            children = child_nodes(node)
+            children.reverse()
+            stack.extend(children)
+
+
+def handlers_for(cls: type, node_class: type) -> tuple:
+    return (
+        resolve(cls, "enter_", node_class, None),
+        resolve(cls, "leave_", node_class, None),
+    )
+
+
+def handler_table(cls: type) -> dict[type, tuple]:
+    return {node_class: handlers_for(cls, node_class) for node_class in node_classes()}
+
+
+NodeWalker._handlers = handler_table(NodeWalker)
@@ -0,0 +1,105 @@
+from array import array
+from typing import Any, Optional
+
+from chocopy.common.errors import LexicalError
+from chocopy.common.token import Position, Token, TokenType
+from chocopy.scanner.scanner import Scanner, unescape
+
+TOKEN_TYPES = list(TokenType)
+ORDINALS = {tokentyp: i for i, tokentyp in enumerate(TOKEN_TYPES)}
+
+
+class TokenBuffer:
+    """Columnar token stream of a whole source.
+
+    Every token is stored as one entry in parallel arrays (type ordinal,
+    start and end offset, line, column). Lexemes and literals are sliced
+    from the source on demand, so no per-token objects are kept. The buffer
+    is also a token source for the Parser: ``scan_token`` walks the stream
+    like ``Scanner.scan_token`` and keeps returning EOF at the end.
+
+    Lexical errors do not stop tokenizing. Each one is kept in ``errors``
+    with the index of the token that follows it, and ``scan_token`` raises
+    it when it gets there, as a Scanner would. A parser therefore reports
+    the earlier of a syntax error and a lexical one, and a recovering
+    parser carries on after a bad token.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        fast: bool = True,
+        names: Optional[dict[str, str]] = None,
+    ):
+        self.source = source
+        self.names = {} if names is None else names
+        self.types = array("B")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.lines = array("i")
+        self.columns = array("i")
+        self.errors: list[tuple[int, LexicalError]] = []
+        self.cursor = 0
+        # Errors already raised by scan_token.
+        self.raised = 0
+        self.tokenize(Scanner(source, fast=fast, names=self.names))
+
+    def tokenize(self, sc: Scanner):
+        while True:
+            try:
+                token = sc.scan_token()
+            except LexicalError as error:
+                # The scanner has moved past the offending character.
+                self.errors.append((len(self.types), error))
+                continue
+            tokentyp = token.tokentyp
+            start, end = sc.span(token)
+
+            self.types.append(ORDINALS[tokentyp])
+            self.starts.append(start)
+            self.ends.append(end)
+            self.lines.append(token.position.line)
+            self.columns.append(token.position.column)
+
+            if tokentyp == TokenType.EOF:
+                break
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def tokentyp(self, i: int) -> TokenType:
+        return TOKEN_TYPES[self.types[i]]
+
+    def lexeme(self, i: int) -> str:
+        lexeme = self.source[self.starts[i] : self.ends[i]]
+        return self.names.get(lexeme, lexeme)
+
+    def position(self, i: int) -> Position:
+        return Position(self.lines[i], self.columns[i])
+
+    def literal(self, i: int) -> Any:
+        tokentyp = TOKEN_TYPES[self.types[i]]
+        if tokentyp == TokenType.INTEGER:
+            return int(self.lexeme(i))
+        elif tokentyp == TokenType.STRING:
+            return unescape(self.source[self.starts[i] + 1 : self.ends[i] - 1])
+        elif tokentyp == TokenType.TRUE:
+            return True
+        elif tokentyp == TokenType.FALSE:
+            return False
+        return None
+
+    def token(self, i: int) -> Token:
+        return Token(
+            self.tokentyp(i), self.lexeme(i), self.position(i), self.literal(i)
+        )
+
+    def scan_token(self) -> Token:
+        i = self.cursor
+        errors = self.errors
+        if self.raised < len(errors) and errors[self.raised][0] <= i:
+            self.raised += 1
+            raise errors[self.raised - 1][1]
+        if i < len(self.types) - 1:
+            self.cursor = i + 1
+        return self.token(i)
@@ -0,0 +1,235 @@
+from typing import Any, Optional
+
+from chocopy.common.errors import LexicalError
+from chocopy.common.token import Position, Token, TokenType
+from chocopy.scanner.scanner import Scanner
+
+# A token without its line: type, lexeme, literal, column counted from 0
+# and start offset from the start of the line. INDENT and DEDENT have the
+# column of the NEW_LINE before them but start on the next line.
+Entry = tuple[TokenType, str, Any, int, int]
+# Lines handed to the Scanner at a time.
+CHUNK_LINES = 32
+
+
+class IncrementalScanner:
+    """Token stream of an editor buffer, kept up to date across edits.
+
+    Everything is kept per line and relative to the line: its text, the
+    tokens whose position is on it, its lexical errors and, if it ends in a
+    NEW_LINE token, the indent stack in effect when that was scanned.
+    ``edit`` restarts scanning at the last NEW_LINE before the edit with
+    the indent stack recorded there, feeding the Scanner only the lines it
+    reads, and stops as soon as it produces a NEW_LINE behind the edit
+    that the old stream has at the same place in the unchanged text, in the
+    same column and with the same indent stack. INDENT and DEDENT tokens
+    carry the position of the NEW_LINE before them, so the column has to
+    match as well. Only the lines in between are replaced; nothing kept for
+    the lines after them depends on their line number or offset, so they
+    are reused untouched and an edit costs time in the lines around it,
+    not in the size of the buffer.
+
+    A lexical error does not reject an edit, as a buffer is invalid much of
+    the time it is being typed: scanning goes on past the bad character,
+    as in a recovering parser, and the error is kept in ``diagnostics``.
+    ``source``, ``tokens``, ``offsets`` and ``diagnostics`` of the whole
+    buffer are built when they are read.
+    """
+
+    def __init__(self, source: str, fast: bool = True):
+        self.fast = fast
+        self.names: dict[str, str] = {}
+        self.lines = source.split("\n")
+        self.entries: list[list[Entry]] = []
+        # Per line, the index in its entries of the NEW_LINE that ends it
+        # and the indent stack in effect when that was scanned.
+        self.newlines: list[Optional[tuple[int, tuple[int, ...]]]] = []
+        # Per line, its lexical errors by message and column counted from 0.
+        self.errors: list[list[tuple[str, int]]] = []
+        # Number of tokens the last edit had to scan again.
+        self.relexed = 0
+        self.scan(-1)
+
+    @property
+    def source(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def tokens(self) -> list[Token]:
+        return [
+            Token(tokentyp, lexeme, Position(i + 1, column + (i == 0)), literal)
+            for i, entries in enumerate(self.entries)
+            for tokentyp, lexeme, literal, column, _ in entries
+        ]
+
+    @property
+    def offsets(self) -> list[int]:
+        """Start offset of every token in ``source``."""
+        offsets = []
+        start = 0
+        for line, entries in zip(self.lines, self.entries):
+            offsets.extend(start + entry[4] for entry in entries)
+            start += len(line) + 1
+        return offsets
+
+    @property
+    def diagnostics(self) -> list[LexicalError]:
+        return [
+            LexicalError(message, Position(i + 1, column + (i == 0)))
+            for i, errors in enumerate(self.errors)
+            for message, column in errors
+        ]
+
+    def edit(self, start: tuple[int, int], end: tuple[int, int], text: str):
+        """Replace the text from ``start`` up to ``end`` with ``text``.
+
+        Both are (line, character) pairs, as editors send them: lines count
+        from 1 and characters from 0 on every line, unlike Position.column.
+        """
+        (first, first_char), (last, last_char) = start, end
+        lines = self.lines
+        rest = lines[last - 1][last_char:]
+        parts = (lines[first - 1][:first_char] + text + rest).split("\n")
+        lines[first - 1 : last] = parts
+
+        restart = first - 2
+        while restart >= 0 and self.newlines[restart] is None:
+            restart -= 1
+        # Where the text behind the edit starts now and started before.
+        behind = (first + len(parts) - 2, len(parts[-1]) - len(rest))
+        self.scan(restart, behind, (last - 1, last_char))
+
+    def scan(
+        self,
+        restart: int,
+        behind: Optional[tuple[int, int]] = None,
+        was: tuple[int, int] = (0, 0),
+    ):
+        """Scan again from the NEW_LINE that ends line ``restart``, or from
+        the start if it is -1, up to EOF or up to a NEW_LINE at or after the
+        (line, character) ``behind`` that matches the old one at ``was``.
+
+        Lines are counted from 0 here.
+        """
+        lines = self.lines
+        sc = Scanner("", fast=self.fast, names=self.names)
+        if restart < 0:
+            first = 0
+            entries: list[list[Entry]] = []
+            errors: list[list[tuple[str, int]]] = []
+            newlines: list[Optional[tuple[int, tuple[int, ...]]]] = []
+            # Offset of each line handed to the scanner from its first.
+            starts: list[int] = []
+            offset = 0
+        else:
+            first = restart
+            newline = self.newlines[restart]
+            assert newline is not None
+            index, state = newline
+            column = self.entries[restart][index][3]
+            sc.source = lines[restart] + "\n"
+            sc.start = sc.current = column
+            sc.line = restart + 1
+            sc.column = column + (restart == 0)
+            sc.indent_stack = list(state)
+            entries = [self.entries[restart][:index]]
+            errors = [[e for e in self.errors[restart] if e[1] < column]]
+            newlines = [None]
+            starts = [0]
+            offset = len(sc.source)
+
+        def read_chunk() -> bytes:
+            nonlocal offset
+            i = first + len(starts)
+            chunk = lines[i : i + CHUNK_LINES]
+            for line in chunk:
+                starts.append(offset)
+                offset += len(line) + 1
+            text = "\n".join(chunk)
+            if i + len(chunk) < len(lines):
+                text += "\n"
+            return text.encode()
+
+        def grow(i: int):
+            while len(entries) <= i:
+                entries.append([])
+                errors.append([])
+                newlines.append(None)
+
+        sc.read_chunk = read_chunk
+        state = tuple(sc.indent_stack)
+        scanned = 0
+        # One past the last old line that the scanned lines replace.
+        end = len(self.entries)
+        while True:
+            # The indent stack a NEW_LINE was scanned with, even if it comes
+            # out of the queue after an error in the indentation behind it.
+            if not sc.token_queue:
+                state = tuple(sc.indent_stack)
+            try:
+                token = sc.scan_token()
+            except LexicalError as error:
+                # The scanner has moved past the offending character.
+                pos = error.pos
+                grow(pos.line - 1 - first)
+                column = pos.column - (pos.line == 1)
+                errors[pos.line - 1 - first].append((error.message, column))
+                continue
+            scanned += 1
+            tokentyp = token.tokentyp
+            line = token.position.line - 1
+            i = line - first
+            grow(i)
+            column = token.position.column - (line == 0)
+            start = sc.span(token)[0] - starts[i]
+            entries[i].append((tokentyp, token.lexeme, token.literal, column, start))
+
+            if tokentyp == TokenType.NEW_LINE:
+                newlines[i] = (len(entries[i]) - 1, state)
+
+            if tokentyp == TokenType.EOF:
+                grow(len(lines) - 1 - first)
+                break
+            if (
+                behind is not None
+                and tokentyp == TokenType.NEW_LINE
+                and (line, column) >= behind
+            ):
+                match = self.matching_newline(line, column, behind, was, state)
+                if match is not None:
+                    old, index = match
+                    # Its INDENT and DEDENT tokens come along.
+                    entries[i].extend(self.entries[old][index + 1 :])
+                    end = old + 1
+                    break
+
+        sc.close()
+        self.relexed = scanned
+        self.entries[first:end] = entries
+        self.errors[first:end] = errors
+        self.newlines[first:end] = newlines
+
+    def matching_newline(
+        self,
+        line: int,
+        column: int,
+        behind: tuple[int, int],
+        was: tuple[int, int],
+        state: tuple[int, ...],
+    ) -> Optional[tuple[int, int]]:
+        """Line of the old stream, and index in it, of the NEW_LINE that
+        the one just scanned on ``line`` at or after ``behind`` matches;
+        ``state`` is the indent stack it was scanned with."""
+        if line > behind[0]:
+            old = line - behind[0] + was[0]
+        elif behind[1] == was[1]:
+            old = was[0]
+        else:
+            return None
+        newline = self.newlines[old]
+        if newline is None or newline[1] != state:
+            return None
+        index = newline[0]
+        if self.entries[old][index][3] != column:
+            return None
+        return old, index
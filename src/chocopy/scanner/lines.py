@@ -0,0 +1,57 @@
+from array import array
+from bisect import bisect_right
+
+from chocopy.common.token import Position
+
+
+class LineIndex:
+    """Start offsets of all lines of a source, built with one newline scan.
+
+    ``locate`` maps an offset to the (line, column) pair the Scanner would
+    have tracked for it: columns count from 1 on the first line and from 0
+    after a newline.
+    """
+
+    def __init__(self, source: str):
+        self.starts = array("i", [0])
+        find = source.find
+        i = find("\n")
+        while i != -1:
+            self.starts.append(i + 1)
+            i = find("\n", i + 1)
+
+    def locate(self, offset: int) -> tuple[int, int]:
+        line = bisect_right(self.starts, offset)
+        column = offset - self.starts[line - 1]
+        if line == 1:
+            column += 1
+        return line, column
+
+    def position(self, offset: int) -> Position:
+        return Position(*self.locate(offset))
+
+
+class LazyPosition(Position):
+    """Position that stores an offset and resolves line and column once,
+    when either is first read.
+
+    Until then the ``line`` and ``column`` slots are unset, so reading one
+    falls through to ``__getattr__``; after that it is a plain slot read.
+    """
+
+    __slots__ = ("index", "offset")
+
+    def __init__(self, index: LineIndex, offset: int):
+        self.index = index
+        self.offset = offset
+
+    def __getattr__(self, name: str) -> int:
+        if name not in ("line", "column"):
+            raise AttributeError(name)
+        self.line, self.column = self.index.locate(self.offset)
+        return getattr(self, name)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return (self.line, self.column) == (other.line, other.column)
@@ -1,21 +1,220 @@
+import codecs
+import mmap
+import os
+import re
+from collections import deque
+
 from chocopy.common.errors import LexicalError
 from chocopy.common.token import OPERATORS, KEYWORDS, Position, Token, TokenType
-from typing import Optional
+from chocopy.scanner.lines import LazyPosition, LineIndex
+from typing import BinaryIO, Callable, Iterator, Optional
+
+# Patterns for the fast engine. They only accept input the character-wise
+# engine handles without an error; everything else (non-ASCII text, bad
+# numbers, unknown operators, broken strings) falls back to that engine so
+# tokens and error positions stay identical.
+FAST_TOKENS = r"""
+    (?P<id>[A-Za-z_][A-Za-z0-9_]*)(?!\w)
+    | (?P<int>0|[1-9][0-9]*)(?![0-9.]|[^\x00-\x7f])
+    | (?P<op>{operators})
+    | (?P<str>"(?:[^"\\\n]|\\[nt\\"])*")
+    | (?P<nl>\n)
+""".format(operators="|".join(map(re.escape, sorted(OPERATORS, key=len, reverse=True))))
+FAST_TOKEN = re.compile(
+    r"[\ \t\r]*(?:\#[^\n]*(?![^\n]))?(?:" + FAST_TOKENS + ")", re.VERBOSE
+)
+# skip_whitespace stops at column 1, so tokens there must not skip blanks.
+FAST_BARE_TOKEN = re.compile(FAST_TOKENS, re.VERBOSE)
+FAST_LAYOUT = re.compile(r"(?:[ ]*(?:#[^\n]*)?\n)*([ ]*)(?:#[^\n]*)?")
+FAST_ESCAPE = re.compile(r"\\(.)")
+ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+
+def operator_table(
+    operators: dict[str, TokenType],
+) -> dict[str, tuple[Optional[TokenType], dict[str, tuple[TokenType, str]]]]:
+    """Group operators by first character.
+
+    Each entry holds the token type of the lone character (None if it is
+    not an operator by itself) and the two-character operators it starts,
+    keyed by their second character.
+    """
+    table = {}
+    for lexeme, tokentyp in operators.items():
+        single, pairs = table.get(lexeme[0], (None, {}))
+        if len(lexeme) == 1:
+            single = tokentyp
+        else:
+            pairs[lexeme[1]] = (tokentyp, lexeme)
+        table[lexeme[0]] = (single, pairs)
+    return table
+
+
+OPERATOR_TABLE = operator_table(OPERATORS)
+
+
+def unescape(body: str) -> str:
+    """Decode the escape sequences of an already validated string body."""
+    if "\\" not in body:
+        return body
+    return FAST_ESCAPE.sub(lambda e: ESCAPES[e.group(1)], body)
+
+
+def tokenize(
+    source: str, fast: bool = False, names: Optional[dict[str, str]] = None
+) -> Iterator[Token]:
+    """Yield the tokens of ``source`` lazily, ending with the EOF token."""
+    yield from Scanner(source, fast=fast, names=names)
+
+
+def tokenize_all(
+    source: str, fast: bool = False, names: Optional[dict[str, str]] = None
+) -> list[Token]:
+    """Return all tokens of ``source``, ending with the EOF token."""
+    return list(Scanner(source, fast=fast, names=names))
 
 
 class Scanner:
-    def __init__(self, source: str):
+    def __init__(
+        self,
+        source: str,
+        fast: bool = False,
+        lazy_positions: bool = False,
+        names: Optional[dict[str, str]] = None,
+    ):
         self.source = source
+        # Intern table for identifier and keyword lexemes. Pass the same
+        # dict to every Scanner of a compilation to share it across files.
+        self.names = {} if names is None else names
+        self.fast = fast or lazy_positions
+        # With lazy positions the fast engine only tracks offsets and the
+        # start of the current line; tokens resolve line and column on access.
+        self.lines = LineIndex(source) if lazy_positions else None
+        self.line_base = -1
         self.start = 0
         self.current = 0
         self.line = 1
         self.column = 1
         self.indent_stack = [0]
-        self.token_queue = []
+        self.token_queue: deque[Token] = deque()
+        # Set by from_file: source is then a window of complete lines that
+        # fill() slides forward, and base is the offset of its first char.
+        self.read_chunk: Optional[Callable[[], bytes]] = None
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.pending: list[str] = []
+        self.closers: list[BinaryIO | mmap.mmap] = []
+        self.base = 0
+        self.exhausted = False
+        # Offset of the newline of the last NEW_LINE token; the layout after
+        # it is dropped from the window as it is skipped.
+        self.newline = 0
+
+    @classmethod
+    def from_file(
+        cls,
+        file: str | os.PathLike | BinaryIO,
+        encoding: str = "utf-8",
+        chunk_size: int = 1 << 16,
+        fast: bool = False,
+        names: Optional[dict[str, str]] = None,
+    ) -> "Scanner":
+        """Scan a file path or binary file object without decoding it whole.
+
+        Paths are memory-mapped. The source is decoded chunk by chunk and
+        only the lines that are currently scanned are held as text.
+        """
+        sc = cls("", fast=fast, names=names)
+        sc.decoder = codecs.getincrementaldecoder(encoding)()
+
+        if isinstance(file, (str, os.PathLike)):
+            f = open(file, "rb")
+            sc.closers.append(f)
+            if os.fstat(f.fileno()).st_size > 0:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                sc.closers.insert(0, data)
+                sc.read_chunk = lambda: data.read(chunk_size)
+            else:
+                sc.read_chunk = lambda: f.read(chunk_size)
+        else:
+            sc.read_chunk = lambda: file.read(chunk_size)
+        return sc
+
+    def __iter__(self) -> "Scanner":
+        return self
+
+    def __next__(self) -> Token:
+        if self.exhausted:
+            raise StopIteration
+        token = self.scan_token()
+        if token.tokentyp == TokenType.EOF:
+            self.exhausted = True
+        return token
+
+    def __length_hint__(self) -> int:
+        # Lets list() pre-size its result; tokens average about 3 chars.
+        return (len(self.source) - self.current) // 3 + len(self.token_queue) + 1
+
+    def span(self, token: Token) -> tuple[int, int]:
+        """Start and end offset of the token scan_token just returned.
+
+        INDENT, DEDENT and EOF are empty and sit where scanning resumes.
+        """
+        tokentyp = token.tokentyp
+        if tokentyp in (TokenType.INDENT, TokenType.DEDENT, TokenType.EOF):
+            start = end = self.current
+        elif tokentyp == TokenType.NEW_LINE:
+            return self.newline, self.newline + 1
+        else:
+            start = self.start
+            end = self.current
+        return self.base + start, self.base + end
+
+    def fill(self) -> bool:
+        """Append the next complete lines of a file source to the window.
+
+        Text before the current token is dropped. Returns False once the
+        file is exhausted.
+        """
+        if self.read_chunk is None:
+            return False
+
+        text = ""
+        while not text:
+            chunk = self.read_chunk()
+            if not chunk:
+                text = "".join(self.pending) + self.decoder.decode(b"", final=True)
+                self.pending = []
+                self.close()
+                break
+
+            decoded = self.decoder.decode(chunk)
+            cut = decoded.rfind("\n") + 1
+            if cut:
+                text = "".join(self.pending) + decoded[:cut]
+                self.pending = [decoded[cut:]]
+            else:
+                self.pending.append(decoded)
+
+        self.base += self.start
+        self.source = self.source[self.start :] + text
+        self.current -= self.start
+        self.start = 0
+        return bool(text)
+
+    def close(self):
+        self.read_chunk = None
+        for closer in self.closers:
+            closer.close()
+        self.closers.clear()
 
     def scan_token(self) -> Token:
         if self.token_queue:
-            return self.token_queue.pop(0)
+            return self.token_queue.popleft()
+
+        if self.fast:
+            token = self.match_token()
+            if token is not None:
+                return token
 
         self.skip_whitespace()
 
@@ -27,7 +226,7 @@ class Scanner:
                 )
 
             if self.token_queue:
-                return self.token_queue.pop(0)
+                return self.token_queue.popleft()
             return Token(TokenType.EOF, "", Position(self.line, self.column))
 
         self.start = self.current
@@ -39,7 +238,7 @@ class Scanner:
             return self.identifier(pos)
         elif c.isdigit():
             return self.number(c, pos)
-        elif c in "+-*/><=!()[],:.-%":
+        elif c in OPERATOR_TABLE:
             return self.operator(c, pos)
         elif c == '"':
             return self.string(pos)
@@ -53,6 +252,7 @@ class Scanner:
             self.advance()
 
         lexeme = self.source[self.start : self.current]
+        lexeme = self.names.setdefault(lexeme, lexeme)
         tokentyp = KEYWORDS.get(lexeme, TokenType.ID)
 
         literal = None
@@ -84,32 +284,16 @@ class Scanner:
         return Token(TokenType.INTEGER, lexeme, pos, literal)
 
     def operator(self, c: str, pos: Position) -> Token:
-        if c == "/":
-            if self.match("/"):
-                return Token(TokenType.DOUBLE_SLASH, "//", pos)
-            self.error("Found unknown Operator", pos)
-        elif c == "!":
-            if self.match("="):
-                return Token(TokenType.NOT_EQUAL, "!=", pos)
+        single, pairs = OPERATOR_TABLE[c]
+        if pairs:
+            pair = pairs.get(self.peek())
+            if pair is not None:
+                self.advance()
+                return Token(pair[0], pair[1], pos)
+
+        if single is None:
             self.error("Found unknown Operator", pos)
-        elif c == "-":
-            if self.match(">"):
-                return Token(TokenType.ARROW, "->", pos)
-            return Token(TokenType.MINUS, "-", pos)
-        elif c == "<":
-            if self.match("="):
-                return Token(TokenType.LESS_EQUAL, "<=", pos)
-            return Token(TokenType.LESS, "<", pos)
-        elif c == ">":
-            if self.match("="):
-                return Token(TokenType.GREATER_EQUAL, ">=", pos)
-            return Token(TokenType.GREATER, ">", pos)
-        elif c == "=":
-            if self.match("="):
-                return Token(TokenType.DOUBLE_EQUAL, "==", pos)
-            return Token(TokenType.EQUAL, "=", pos)
-        else:
-            return Token(OPERATORS[c], c, pos)
+        return Token(single, c, pos)
 
     def string(self, pos: Position) -> Token:
         result = []
@@ -147,22 +331,68 @@ class Scanner:
 
         return Token(TokenType.STRING, lexeme, pos, literal)
 
-    def process_indentation(self, pos: Position) -> Token:
-        self.token_queue.append(Token(TokenType.NEW_LINE, "\n", pos))
-        while True:
-            count = 0
-            while self.peek() == " ":
-                self.advance()
-                count += 1
+    def match_token(self) -> Optional[Token]:
+        lines = self.lines
+        if lines is None:
+            column = self.column
+        else:
+            column = self.current - self.line_base
 
-            if self.peek() == "#":
-                while self.peek() != "\n" and not self.is_EOF():
-                    self.advance()
+        if self.current >= len(self.source) and not self.fill():
+            m = None
+        elif column > 1:
+            m = FAST_TOKEN.match(self.source, self.current)
+        else:
+            m = FAST_BARE_TOKEN.match(self.source, self.current)
+        if m is None:
+            if lines is not None:
+                self.line, self.column = lines.locate(self.current)
+            return None
+
+        kind = m.lastgroup
+        assert kind is not None
+        start, end = m.span(kind)
+        lexeme = m.group(kind)
+        if lines is None:
+            column += start - self.current
+            pos = Position(self.line, column)
+            self.column = column + end - start
+        else:
+            pos = LazyPosition(lines, start)
+        self.start = start
+        self.current = end
 
-            if self.peek() == "\n":
-                self.advance()
-                continue
-            break
+        if kind == "nl":
+            self.line += 1
+            self.column = 0
+            return self.process_indentation(pos)
+
+        if kind == "id":
+            lexeme = self.names.setdefault(lexeme, lexeme)
+            tokentyp = KEYWORDS.get(lexeme, TokenType.ID)
+            literal = None
+            if tokentyp == TokenType.TRUE:
+                literal = True
+            elif tokentyp == TokenType.FALSE:
+                literal = False
+            return Token(tokentyp, lexeme, pos, literal)
+        elif kind == "int":
+            literal = int(lexeme)
+            if literal > (2**31 - 1):
+                self.error(f"Number {lexeme} is too big", pos)
+            return Token(TokenType.INTEGER, lexeme, pos, literal)
+        elif kind == "op":
+            return Token(OPERATORS[lexeme], lexeme, pos)
+        else:
+            return Token(TokenType.STRING, lexeme, pos, unescape(lexeme[1:-1]))
+
+    def process_indentation(self, pos: Position) -> Token:
+        self.token_queue.append(Token(TokenType.NEW_LINE, "\n", pos))
+        self.newline = self.base + self.start
+        if self.fast:
+            count = self.skip_layout()
+        else:
+            count = self.skip_blank_lines()
 
         if count > self.indent_stack[-1]:
             if count % 4 != 0:
@@ -178,7 +408,49 @@ class Scanner:
         if self.indent_stack[-1] != count:
             self.error("Inconsistent dedent level", pos)
 
-        return self.token_queue.pop(0)
+        return self.token_queue.popleft()
+
+    def skip_layout(self) -> int:
+        while True:
+            # Nothing before the layout is needed again, so fill() can drop
+            # it: runs of blank and comment lines do not pile up.
+            self.start = self.current
+            m = FAST_LAYOUT.match(self.source, self.current)
+            # Every group of the pattern may be empty, so it always matches.
+            assert m is not None
+            end = m.end()
+            last_newline = self.source.rfind("\n", self.current, end)
+            if self.lines is not None:
+                if last_newline == -1:
+                    last_newline = self.current - 1
+                self.line_base = last_newline + 1
+            elif last_newline == -1:
+                self.column += end - self.current
+            else:
+                self.line += self.source.count("\n", self.current, end)
+                self.column = end - last_newline - 1
+            self.current = end
+
+            # A file window ends after a newline, so layout may go on.
+            if end < len(self.source) or not self.fill():
+                return len(m.group(1))
+
+    def skip_blank_lines(self) -> int:
+        while True:
+            self.start = self.current
+            count = 0
+            while self.peek() == " ":
+                self.advance()
+                count += 1
+
+            if self.peek() == "#":
+                while self.peek() != "\n" and not self.is_EOF():
+                    self.advance()
+
+            if self.peek() == "\n":
+                self.advance()
+                continue
+            return count
 
     def match(self, expected: str) -> bool:
         if self.peek() == expected:
@@ -208,7 +480,7 @@ class Scanner:
                 break
 
     def is_EOF(self) -> bool:
-        return self.current >= len(self.source)
+        return self.current >= len(self.source) and not self.fill()
 
     def peek(self) -> str:
         if self.is_EOF():
@@ -0,0 +1,635 @@
+from typing import Callable, Optional
+
+from chocopy.common.errors import SemanticError
+from chocopy.common.token import Position
+from chocopy.parser.node import (
+    AssignStmt,
+    BinaryExpr,
+    BoolLiteral,
+    CallExpr,
+    ClassDefinition,
+    ClassType,
+    ErrorNode,
+    Expr,
+    ExprStmt,
+    ForStmt,
+    FunctionDefinition,
+    GlobalDeclaration,
+    IDStringLiteral,
+    IfExpr,
+    IfStmt,
+    IndexExpr,
+    IntegerLiteral,
+    ListLiteral,
+    ListType,
+    MemberExpr,
+    Node,
+    NoneLiteral,
+    NoneLocalDeclaration,
+    PassStmt,
+    Program,
+    ReturnStmt,
+    Stmt,
+    StringLiteral,
+    TypeAnnotation,
+    UnaryExpr,
+    VariableDefinition,
+    VariableNode,
+    WhileStmt,
+)
+from chocopy.semantic.scope import Scope
+from chocopy.semantic.types import (
+    BOOL,
+    EMPTY,
+    INT,
+    NONE,
+    OBJECT,
+    SPECIAL,
+    STR,
+    ClassInfo,
+    ClassValueType,
+    FuncType,
+    Hierarchy,
+    ListValueType,
+    ValueType,
+)
+
+ARITHMETIC = frozenset({"-", "*", "//", "%"})
+ORDERING = frozenset({"<", "<=", ">", ">="})
+EQUALITY = frozenset({"==", "!="})
+LOGICAL = frozenset({"and", "or"})
+
+BUILTIN_FUNCTIONS = {
+    "print": FuncType([OBJECT], NONE),
+    "len": FuncType([OBJECT], INT),
+    "input": FuncType([], STR),
+}
+
+
+def operands(node: Expr) -> list[Expr]:
+    """Subexpressions whose types the type of ``node`` depends on."""
+    if type(node) is BinaryExpr:
+        return [node.left, node.right]
+    elif type(node) is UnaryExpr:
+        return [node.operand]
+    elif type(node) is CallExpr:
+        function = node.function
+        if type(function) is MemberExpr:
+            return [function.obj, *node.args]
+        return node.args
+    elif type(node) is MemberExpr:
+        return [node.obj]
+    elif type(node) is IndexExpr:
+        return [node.list_obj, node.index]
+    elif type(node) is ListLiteral:
+        return node.elements
+    elif type(node) is IfExpr:
+        return [node.node, node.cond, node.else_branch]
+    return []
+
+
+def constant(value_type: ValueType) -> Callable:
+    """Typing rule for a literal of ``value_type``."""
+    return lambda self, node, scope: value_type
+
+
+def always_returns(statements: list[Stmt]) -> bool:
+    """Whether every path through ``statements`` ends in a return."""
+    # An if returns when both of its blocks do; collect them outside in and
+    # decide them inside out.
+    branches = []
+    blocks = [statements]
+    while blocks:
+        for stmt in blocks.pop():
+            if type(stmt) is IfStmt:
+                branches.append(stmt)
+                blocks.append(stmt.then_block)
+                blocks.append(stmt.else_block)
+
+    returning: set[IfStmt] = set()
+
+    def block_returns(block: list[Stmt]) -> bool:
+        return any(type(s) is ReturnStmt or s in returning for s in block)
+
+    for stmt in reversed(branches):
+        if block_returns(stmt.then_block) and block_returns(stmt.else_block):
+            returning.add(stmt)
+    return block_returns(statements)
+
+
+class Checker:
+    """Declaration and type checking of a Program.
+
+    By default the first SemanticError is raised. With ``recover`` every
+    error is recorded in ``diagnostics`` and checking goes on with a
+    stand-in type, usually ``object``. The type of every checked
+    expression is kept in ``types``.
+    """
+
+    def __init__(self, recover: bool = False):
+        self.recover = recover
+        self.diagnostics: list[SemanticError] = []
+        self.types: dict[Node, ValueType] = {}
+        self.hierarchy = Hierarchy()
+        self.globals = Scope()
+        for name, info in self.hierarchy.classes.items():
+            self.globals.declare(name, info)
+        for name, signature in BUILTIN_FUNCTIONS.items():
+            self.globals.declare(name, signature)
+
+    def error(self, message: str, pos: Position):
+        error = SemanticError(message, pos)
+        if not self.recover:
+            raise error
+        self.diagnostics.append(error)
+
+    def check(self, program: Program):
+        classes = []
+        functions = []
+        for decl in program.declarations:
+            if type(decl) is ClassDefinition:
+                info = self.declare_class(decl)
+                if info is not None:
+                    classes.append((decl, info))
+            elif type(decl) is VariableDefinition:
+                self.declare_variable(decl, self.globals)
+            elif type(decl) is FunctionDefinition:
+                signature = self.declare_function(decl, self.globals)
+                if signature is not None:
+                    functions.append((decl, signature))
+
+        # Method bodies may use the members of classes declared after them.
+        methods = []
+        for decl, info in classes:
+            methods.extend(self.declare_members(decl, info))
+        for method, signature in methods:
+            self.check_function(method, signature, self.globals)
+        for decl, signature in functions:
+            self.check_function(decl, signature, self.globals)
+        self.check_block(program.statements, self.globals)
+
+    # Declarations
+
+    def value_type(self, annotation: TypeAnnotation) -> ValueType:
+        if type(annotation) is ListType:
+            return ListValueType(self.value_type(annotation.element_type))
+        assert type(annotation) is ClassType
+        # Class names may be written as strings.
+        name = annotation.name.strip('"')
+        if name not in self.hierarchy.classes:
+            self.error(
+                f"Invalid type annotation; there is no class named: {name}",
+                annotation.pos,
+            )
+            return OBJECT
+        return ClassValueType(name)
+
+    def signature(self, node: FunctionDefinition) -> FuncType:
+        return FuncType(
+            [self.value_type(param.type) for param in node.params],
+            self.value_type(node.return_type),
+        )
+
+    def declare(self, scope: Scope, name: str, symbol, pos: Position) -> bool:
+        if scope is not self.globals and name in self.hierarchy.classes:
+            self.error(f"Cannot shadow class name: {name}", pos)
+            return False
+        if not scope.declare(name, symbol):
+            self.error(
+                f"Duplicate declaration of identifier in same scope: {name}", pos
+            )
+            return False
+        return True
+
+    def declare_variable(
+        self, node: VariableDefinition, scope: Scope
+    ) -> Optional[ValueType]:
+        var = node.var
+        declared = self.value_type(var.type)
+        self.check_literal(node.literal, declared)
+        if self.declare(scope, var.name, declared, var.pos):
+            return declared
+        return None
+
+    def check_literal(self, literal: Expr, declared: ValueType):
+        value = self.expr_type(literal, self.globals)
+        if not self.hierarchy.is_assignable(value, declared):
+            self.error(f"Expected type `{declared}`; got type `{value}`", literal.pos)
+
+    def declare_function(
+        self, node: FunctionDefinition, scope: Scope
+    ) -> Optional[FuncType]:
+        signature = self.signature(node)
+        if self.declare(scope, node.name, signature, node.pos):
+            return signature
+        return None
+
+    def declare_class(self, node: ClassDefinition) -> Optional[ClassInfo]:
+        classes = self.hierarchy.classes
+        base = classes.get(node.super_class)
+        if base is None:
+            if node.super_class in self.globals.names:
+                self.error(f"Super-class must be a class: {node.super_class}", node.pos)
+            else:
+                self.error(f"Super-class not defined: {node.super_class}", node.pos)
+            base = classes["object"]
+        elif base.type in SPECIAL:
+            self.error(f"Cannot extend special class: {base.name}", node.pos)
+            base = classes["object"]
+
+        info = ClassInfo(node.name, base)
+        if not self.declare(self.globals, node.name, info, node.pos):
+            return None
+        self.hierarchy.add(info)
+        return info
+
+    def declare_members(
+        self, node: ClassDefinition, info: ClassInfo
+    ) -> list[tuple[FunctionDefinition, FuncType]]:
+        """Fill in the attributes and methods of ``info``; returns the methods
+        to check."""
+        # The base class comes earlier in the program and is complete.
+        base = info.super_class
+        assert base is not None
+        info.attributes = dict(base.attributes)
+        info.methods = dict(base.methods)
+        own: set[str] = set()
+        methods = []
+
+        for var_def in node.var_defs:
+            if type(var_def) is not VariableDefinition:
+                continue
+            name = var_def.var.name
+            declared = self.value_type(var_def.var.type)
+            self.check_literal(var_def.literal, declared)
+            inherited = name in info.attributes or name in info.methods
+            if self.redeclared(name, own, inherited, var_def.var.pos):
+                continue
+            info.attributes[name] = declared
+            own.add(name)
+
+        for method in node.method_defs:
+            if type(method) is not FunctionDefinition:
+                continue
+            name = method.name
+            signature = self.signature(method)
+            params = method.params
+            if (
+                not params
+                or params[0].name != "self"
+                or (signature.params[0] != info.type)
+            ):
+                self.error(
+                    "First parameter of the following method must be of the "
+                    f"enclosing class: {name}",
+                    method.pos,
+                )
+            if self.redeclared(name, own, name in info.attributes, method.pos):
+                continue
+            inherited = info.methods.get(name)
+            if inherited is not None and (
+                inherited.params[1:] != signature.params[1:]
+                or inherited.returns != signature.returns
+            ):
+                self.error(
+                    f"Method overridden with different type signature: {name}",
+                    method.pos,
+                )
+            info.methods[name] = signature
+            own.add(name)
+            methods.append((method, signature))
+        return methods
+
+    def redeclared(self, name: str, own: set[str], inherited: bool, pos) -> bool:
+        if name in own:
+            self.error(
+                f"Duplicate declaration of identifier in same scope: {name}", pos
+            )
+            return True
+        elif inherited:
+            self.error(f"Cannot re-define attribute: {name}", pos)
+            return True
+        return False
+
+    def check_function(
+        self, node: FunctionDefinition, signature: FuncType, parent: Scope
+    ):
+        scope = Scope(parent, signature.returns)
+        for param, param_type in zip(node.params, signature.params):
+            self.declare(scope, param.name, param_type, param.pos)
+
+        for decl in node.var_defs:
+            if type(decl) is VariableDefinition:
+                self.declare_variable(decl, scope)
+            elif type(decl) is GlobalDeclaration:
+                symbol = self.globals.names.get(decl.name)
+                if isinstance(symbol, (ClassValueType, ListValueType)):
+                    self.declare(scope, decl.name, symbol, decl.pos)
+                else:
+                    self.error(f"Not a global variable: {decl.name}", decl.pos)
+            elif type(decl) is NoneLocalDeclaration:
+                symbol = self.nonlocal_variable(decl.name, parent)
+                if symbol is not None:
+                    self.declare(scope, decl.name, symbol, decl.pos)
+                else:
+                    self.error(f"Not a nonlocal variable: {decl.name}", decl.pos)
+
+        nested = []
+        for func in node.func_defs:
+            if type(func) is FunctionDefinition:
+                nested_signature = self.declare_function(func, scope)
+                if nested_signature is not None:
+                    nested.append((func, nested_signature))
+        for func, nested_signature in nested:
+            self.check_function(func, nested_signature, scope)
+
+        self.check_block(node.statements, scope)
+        if signature.returns in SPECIAL and not always_returns(node.statements):
+            self.error(
+                "All paths in this function/method must have a return statement: "
+                f"{node.name}",
+                node.pos,
+            )
+
+    def nonlocal_variable(self, name: str, scope: Scope) -> Optional[ValueType]:
+        while scope is not self.globals:
+            symbol = scope.names.get(name)
+            if isinstance(symbol, (ClassValueType, ListValueType)):
+                return symbol
+            assert scope.parent is not None
+            scope = scope.parent
+        return None
+
+    # Statements
+
+    def check_block(self, statements: list[Stmt], scope: Scope):
+        # A worklist instead of recursion: blocks nest as deep as they like.
+        stack = list(reversed(statements))
+        while stack:
+            stmt = stack.pop()
+            self.STATEMENTS[type(stmt)](self, stmt, scope, stack)
+
+    def check_expr_stmt(self, node: ExprStmt, scope: Scope, stack: list):
+        self.expr_type(node.expr, scope)
+
+    def check_assign(self, node: AssignStmt, scope: Scope, stack: list):
+        value = self.expr_type(node.value, scope)
+        target = self.target_type(node.target, scope)
+        if target is not None:
+            self.check_assignable(value, target, node.value.pos)
+
+    def target_type(self, target: Expr, scope: Scope) -> Optional[ValueType]:
+        if type(target) is VariableNode:
+            return self.local_variable(target.name, scope, target.pos)
+        declared = self.expr_type(target, scope)
+        if type(target) is IndexExpr and self.types[target.list_obj] == STR:
+            self.error("`str` is not a list type", target.pos)
+            return None
+        return declared
+
+    def local_variable(self, name: str, scope: Scope, pos) -> Optional[ValueType]:
+        symbol = scope.names.get(name)
+        if isinstance(symbol, (ClassValueType, ListValueType)):
+            return symbol
+        elif isinstance(scope.lookup(name), (ClassValueType, ListValueType)):
+            self.error(
+                "Cannot assign to variable that is not explicitly declared in this "
+                f"scope: {name}",
+                pos,
+            )
+        else:
+            self.error(f"Not a variable: {name}", pos)
+        return None
+
+    def check_assignable(self, value: ValueType, target: ValueType, pos):
+        if not self.hierarchy.is_assignable(value, target):
+            self.error(f"Expected type `{target}`; got type `{value}`", pos)
+
+    def check_return(self, node: ReturnStmt, scope: Scope, stack: list):
+        if scope.returns is None:
+            self.error("Return statement cannot appear at the top level", node.pos)
+            return
+        if node.value is None:
+            if not self.hierarchy.is_assignable(NONE, scope.returns):
+                self.error(f"Expected type `{scope.returns}`; got `None`", node.pos)
+            return
+        value = self.expr_type(node.value, scope)
+        self.check_assignable(value, scope.returns, node.value.pos)
+
+    def check_condition(self, condition: Expr, scope: Scope):
+        condition_type = self.expr_type(condition, scope)
+        if condition_type != BOOL:
+            self.error(
+                f"Condition expression cannot be of type `{condition_type}`",
+                condition.pos,
+            )
+
+    def check_if(self, node: IfStmt, scope: Scope, stack: list):
+        self.check_condition(node.condition, scope)
+        stack.extend(reversed(node.else_block))
+        stack.extend(reversed(node.then_block))
+
+    def check_while(self, node: WhileStmt, scope: Scope, stack: list):
+        self.check_condition(node.condition, scope)
+        stack.extend(reversed(node.body))
+
+    def check_for(self, node: ForStmt, scope: Scope, stack: list):
+        iterable = self.expr_type(node.iterable, scope)
+        if iterable == STR:
+            element: ValueType = STR
+        elif type(iterable) is ListValueType:
+            element = iterable.element
+        else:
+            self.error(
+                f"Cannot iterate over value of type `{iterable}`", node.iterable.pos
+            )
+            element = OBJECT
+        target = self.local_variable(node.identifier, scope, node.pos)
+        if target is not None:
+            self.check_assignable(element, target, node.pos)
+        stack.extend(reversed(node.body))
+
+    def check_nothing(self, node: Stmt, scope: Scope, stack: list):
+        pass
+
+    STATEMENTS: dict[type, Callable] = {
+        ExprStmt: check_expr_stmt,
+        AssignStmt: check_assign,
+        ReturnStmt: check_return,
+        IfStmt: check_if,
+        WhileStmt: check_while,
+        ForStmt: check_for,
+        PassStmt: check_nothing,
+        ErrorNode: check_nothing,
+    }
+
+    # Expressions
+
+    def expr_type(self, expr: Expr, scope: Scope) -> ValueType:
+        """Type of ``expr``, after typing every subexpression in postorder."""
+        types = self.types
+        rules = self.EXPRESSIONS
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        while stack:
+            node, ready = stack.pop()
+            if ready:
+                types[node] = rules[type(node)](self, node, scope)
+            else:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in reversed(operands(node)))
+        return types[expr]
+
+    def variable_type(self, node: VariableNode, scope: Scope) -> ValueType:
+        symbol = scope.lookup(node.name)
+        if isinstance(symbol, (ClassValueType, ListValueType)):
+            return symbol
+        self.error(f"Not a variable: {node.name}", node.pos)
+        return OBJECT
+
+    def unary_type(self, node: UnaryExpr, scope: Scope) -> ValueType:
+        operand = self.types[node.operand]
+        expected = INT if node.operator == "-" else BOOL
+        if operand != expected:
+            self.error(
+                f"Cannot apply operator `{node.operator}` on type `{operand}`",
+                node.pos,
+            )
+        return expected
+
+    def binary_type(self, node: BinaryExpr, scope: Scope) -> ValueType:
+        op = node.operator
+        left = self.types[node.left]
+        right = self.types[node.right]
+        if op in ARITHMETIC:
+            if left == INT and right == INT:
+                return INT
+            result = INT
+        elif op == "+":
+            if left == right and left in (INT, STR):
+                return left
+            if type(left) is ListValueType and type(right) is ListValueType:
+                return ListValueType(self.hierarchy.join(left.element, right.element))
+            result = INT if INT in (left, right) else OBJECT
+        elif op in ORDERING:
+            if left == INT and right == INT:
+                return BOOL
+            result = BOOL
+        elif op in EQUALITY:
+            if left == right and left in SPECIAL:
+                return BOOL
+            result = BOOL
+        elif op in LOGICAL:
+            if left == BOOL and right == BOOL:
+                return BOOL
+            result = BOOL
+        else:  # is
+            if left not in SPECIAL and right not in SPECIAL:
+                return BOOL
+            result = BOOL
+        self.error(
+            f"Cannot apply operator `{op}` on types `{left}` and `{right}`", node.pos
+        )
+        return result
+
+    def if_type(self, node: IfExpr, scope: Scope) -> ValueType:
+        condition = self.types[node.cond]
+        if condition != BOOL:
+            self.error(
+                f"Condition expression cannot be of type `{condition}`", node.cond.pos
+            )
+        return self.hierarchy.join(self.types[node.node], self.types[node.else_branch])
+
+    def list_type(self, node: ListLiteral, scope: Scope) -> ValueType:
+        if not node.elements:
+            return EMPTY
+        types = self.types
+        element = types[node.elements[0]]
+        for item in node.elements[1:]:
+            element = self.hierarchy.join(element, types[item])
+        return ListValueType(element)
+
+    def index_type(self, node: IndexExpr, scope: Scope) -> ValueType:
+        container = self.types[node.list_obj]
+        index = self.types[node.index]
+        if index != INT:
+            self.error(f"Index is of non-integer type `{index}`", node.index.pos)
+        if container == STR:
+            return STR
+        elif type(container) is ListValueType:
+            return container.element
+        self.error(f"Cannot index into type `{container}`", node.pos)
+        return OBJECT
+
+    def class_of(self, value_type: ValueType) -> Optional[ClassInfo]:
+        if type(value_type) is ClassValueType:
+            return self.hierarchy.classes.get(value_type.name)
+        return None
+
+    def member_type(self, node: MemberExpr, scope: Scope) -> ValueType:
+        obj = self.types[node.obj]
+        name = node.member.name
+        info = self.class_of(obj)
+        attribute = None if info is None else info.attributes.get(name)
+        if attribute is None:
+            self.error(
+                f"There is no attribute named `{name}` in class `{obj}`", node.pos
+            )
+            return OBJECT
+        return attribute
+
+    def call_type(self, node: CallExpr, scope: Scope) -> ValueType:
+        function = node.function
+        if type(function) is MemberExpr:
+            obj = self.types[function.obj]
+            name = function.member.name
+            info = self.class_of(obj)
+            method = None if info is None else info.methods.get(name)
+            if method is None:
+                self.error(
+                    f"There is no method named `{name}` in class `{obj}`", node.pos
+                )
+                return OBJECT
+            self.check_arguments(node, method.params[1:], 1)
+            return method.returns
+
+        symbol = None
+        if type(function) is VariableNode:
+            symbol = scope.lookup(function.name)
+        if type(symbol) is FuncType:
+            self.check_arguments(node, symbol.params, 0)
+            return symbol.returns
+        elif type(symbol) is ClassInfo:
+            self.check_arguments(node, symbol.methods["__init__"].params[1:], 1)
+            return symbol.type
+        name = function.name if type(function) is VariableNode else "expression"
+        self.error(f"Not a function or class: {name}", function.pos)
+        return OBJECT
+
+    def check_arguments(self, node: CallExpr, params: list[ValueType], first: int):
+        args = node.args
+        if len(args) != len(params):
+            self.error(f"Expected {len(params)} arguments; got {len(args)}", node.pos)
+            return
+        for i, (arg, param) in enumerate(zip(args, params), first):
+            value = self.types[arg]
+            if not self.hierarchy.is_assignable(value, param):
+                self.error(
+                    f"Expected type `{param}`; got type `{value}` in parameter {i}",
+                    arg.pos,
+                )
+
+    EXPRESSIONS: dict[type, Callable] = {
+        IntegerLiteral: constant(INT),
+        BoolLiteral: constant(BOOL),
+        StringLiteral: constant(STR),
+        IDStringLiteral: constant(STR),
+        NoneLiteral: constant(NONE),
+        VariableNode: variable_type,
+        UnaryExpr: unary_type,
+        BinaryExpr: binary_type,
+        IfExpr: if_type,
+        ListLiteral: list_type,
+        IndexExpr: index_type,
+        MemberExpr: member_type,
+        CallExpr: call_type,
+    }
@@ -0,0 +1,361 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from chocopy.common.errors import SemanticError
+from chocopy.common.token import Position
+from chocopy.parser.node import (
+    ClassDefinition,
+    FunctionDefinition,
+    Program,
+    VariableDefinition,
+)
+from chocopy.parser.visitor import field_getter, node_classes
+from chocopy.semantic.checker import Checker
+from chocopy.semantic.scope import Symbol
+from chocopy.semantic.types import ClassInfo
+
+# Fields that hold identifiers, whether they declare them or use them.
+NAME_FIELDS = frozenset({"name", "super_class", "identifier"})
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z_0-9]*")
+
+Declaration = Union[ClassDefinition, FunctionDefinition, VariableDefinition]
+# A declaration by name and by how many declarations of that name come
+# before it; (None, 0) stands for the top-level statements.
+Key = tuple[Optional[str], int]
+
+
+# Per node class: its name, a function that returns its field values and
+# the indices among them of the fields that hold identifiers.
+SHAPES = {
+    cls: (
+        cls.__name__,
+        field_getter(cls),
+        [i for i, name in enumerate(cls._fields) if name in NAME_FIELDS],
+    )
+    for cls in node_classes()
+}
+
+
+def summarize(roots: list, line: Optional[int] = None) -> tuple[bytes, frozenset[str]]:
+    """Fingerprint of ``roots`` and the identifiers that appear in them.
+
+    Positions are only fingerprinted relative to ``line``, if given: they
+    change whenever code above grows or shrinks, which changes neither what
+    the code means nor where its errors are relative to it.
+    """
+    parts: list = []
+    names: set[str] = set()
+    base = None if line is None else line << 32
+    shapes = SHAPES
+    append = parts.append
+    stack = list(reversed(roots))
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        item = pop()
+        cls = type(item)
+        if cls is list:
+            append(len(item))
+            extend(reversed(item))
+            continue
+        shape = shapes.get(cls)
+        if shape is None:
+            append(item)
+            continue
+        name, getter, named = shape
+        append(name)
+        if base is not None:
+            append(item._pos - base)
+        values = getter(item)
+        for i in named:
+            value = values[i]
+            if type(value) is str:
+                # Class names in annotations may be written as strings.
+                names.add(value.strip('"'))
+        extend(reversed(values))
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+    return digest, frozenset(names)
+
+
+def summarize_text(text: str) -> tuple[bytes, frozenset[str]]:
+    """Fingerprint of ``text`` and every word in it that could be an
+    identifier, which is cheaper than walking its nodes."""
+    digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    return digest, frozenset(IDENTIFIER.findall(text))
+
+
+def texts(program: Program, source: str) -> list[str]:
+    """Source of each declaration of ``program`` and then of its statements,
+    from the line each starts on up to the next, less blank lines at the
+    end."""
+    lines = source.split("\n")
+    starts = [decl.pos.line for decl in program.declarations]
+    statements = program.statements
+    starts.append(statements[0].pos.line if statements else len(lines) + 1)
+    starts.append(len(lines) + 1)
+    return [
+        "\n".join(lines[a - 1 : b - 1]).rstrip() for a, b in zip(starts, starts[1:])
+    ]
+
+
+def interface(decl: Declaration) -> tuple[bytes, frozenset[str]]:
+    """Fingerprint of what other declarations can see of ``decl`` and the
+    names it depends on: signatures, annotations and the superclass."""
+    if isinstance(decl, FunctionDefinition):
+        return summarize([decl.params, decl.return_type])
+    elif isinstance(decl, ClassDefinition):
+        digest, names = summarize(
+            [
+                decl.super_class,
+                [var.var for var in decl.var_defs if type(var) is VariableDefinition],
+                [
+                    [method.name, method.params, method.return_type]
+                    for method in decl.method_defs
+                    if type(method) is FunctionDefinition
+                ],
+            ]
+        )
+        return digest, names | {decl.super_class}
+    return summarize([decl.var])
+
+
+@dataclass(slots=True)
+class Unit:
+    """What is kept of one top-level declaration, or of the top-level
+    statements, from one check to the next."""
+
+    name: Optional[str]
+    line: int
+    interface: bytes
+    body: bytes
+    # Identifiers anywhere in it, and in its interface only.
+    uses: frozenset[str]
+    depends: frozenset[str]
+    # The names it depends on that are declared above it: a superclass or
+    # a class in an annotation has to be, so moving one past it changes
+    # what it declares as much as editing it.
+    above: frozenset[str]
+    # What it declared in the global scope, if it could be declared.
+    symbol: Optional[Symbol] = None
+    # Its errors as (message, lines below ``line``, column from 0), so that
+    # they can be moved along with the declaration.
+    errors: list[tuple[str, int, int]] = field(default_factory=list)
+
+    def keep(self, error: SemanticError) -> tuple[str, int, int]:
+        # Columns count from 1 on the first line of a file and from 0 after.
+        pos = error.pos
+        return (error.message, pos.line - self.line, pos.column - (pos.line == 1))
+
+    def restore(self, error: tuple[str, int, int]) -> SemanticError:
+        message, lines, column = error
+        line = self.line + lines
+        return SemanticError(message, Position(line, column + (line == 1)))
+
+
+@dataclass(slots=True)
+class Report:
+    """Outcome of one IncrementalChecker.check."""
+
+    diagnostics: list[SemanticError]
+    # Declarations that were checked, in program order, and the number of
+    # the others, whose symbols and errors from the last check were reused.
+    checked: list[str]
+    skipped: int
+    statements_checked: bool
+
+
+class UnitChecker(Checker):
+    """A Checker that keeps the errors of each declaration apart, in
+    whichever list ``sink`` is when they are found."""
+
+    def __init__(self):
+        super().__init__(recover=True)
+        self.sink: list[SemanticError] = self.diagnostics
+
+    def error(self, message: str, pos: Position):
+        self.sink.append(SemanticError(message, pos))
+
+
+class IncrementalChecker:
+    """Checks one version of a program after another, checking again only
+    the top-level declarations that an edit can affect.
+
+    Every top-level class, function and variable is fingerprinted whole and
+    by its interface, and remembers the identifiers it uses. A declaration
+    is checked again when its fingerprint changes, or when it uses a name
+    whose interface changed; the interface of a declaration changes with
+    those of the names in its own interface, as a class changes with its
+    superclass, and when one of those names moves from below it to above it
+    or back, as a class has to come after its superclass. The others are
+    declared with the ClassInfo, signature or type they got last time, and
+    their errors are reused.
+
+    Diagnostics are collected as with ``Checker(recover=True)`` and
+    reported in source order. ``types`` of the last checker only covers
+    the declarations that were checked.
+    """
+
+    def __init__(self):
+        self.units: dict[Key, Unit] = {}
+        # The checker of the last check.
+        self.checker: Optional[UnitChecker] = None
+
+    def check(self, program: Program, source: Optional[str] = None) -> Report:
+        """Check ``program``, which was parsed from ``source`` if given.
+
+        Declarations are then fingerprinted by their text, from the line
+        they start on up to the next declaration, rather than by walking
+        their nodes, which costs about as much as checking them.
+        """
+        statements = program.statements
+        line = statements[0].pos.line if statements else 1
+        if source is None:
+            summaries = [
+                summarize([decl], decl.pos.line) for decl in program.declarations
+            ]
+            summaries.append(summarize([statements], line))
+        else:
+            summaries = [summarize_text(text) for text in texts(program, source)]
+
+        old = self.units
+        declarations: list[tuple[tuple[str, int], Declaration]] = []
+        units: dict[Key, Unit] = {}
+        seen: dict[str, int] = {}
+        for decl, (body, uses) in zip(program.declarations, summaries):
+            if isinstance(decl, (ClassDefinition, FunctionDefinition)):
+                name = decl.name
+            elif isinstance(decl, VariableDefinition):
+                name = decl.var.name
+            else:
+                continue
+            previous = old.get((name, seen.get(name, -1) + 1))
+            if previous is not None and previous.body == body:
+                # The interface is part of the body.
+                signature, depends = previous.interface, previous.depends
+            else:
+                signature, depends = interface(decl)
+            above = frozenset(seen.keys() & depends)
+            seen[name] = seen.get(name, -1) + 1
+            key = (name, seen[name])
+            declarations.append((key, decl))
+            units[key] = Unit(
+                name, decl.pos.line, signature, body, uses, depends, above
+            )
+        body, uses = summaries[-1]
+        units[None, 0] = Unit(None, line, b"", body, uses, frozenset(), frozenset())
+        dirty = self.affected(units)
+        for key, unit in units.items():
+            if key not in dirty:
+                unit.symbol = old[key].symbol
+                unit.errors = old[key].errors
+
+        checker = UnitChecker()
+        hierarchy = checker.hierarchy
+        sinks: dict[Key, list[SemanticError]] = {key: [] for key in dirty}
+        classes = []
+        functions = []
+        for key, decl in declarations:
+            unit = units[key]
+            if key not in dirty:
+                symbol = unit.symbol
+                if symbol is not None:
+                    checker.globals.declare(key[0], symbol)
+                if type(symbol) is ClassInfo:
+                    # The superclass is unchanged but may have been checked
+                    # again, into a new ClassInfo.
+                    base = symbol.super_class
+                    assert base is not None
+                    symbol.super_class = hierarchy.classes[base.name]
+                    hierarchy.add(symbol)
+                continue
+
+            checker.sink = sinks[key]
+            if type(decl) is ClassDefinition:
+                unit.symbol = checker.declare_class(decl)
+                if unit.symbol is not None:
+                    classes.append((key, decl, unit.symbol))
+            elif type(decl) is VariableDefinition:
+                unit.symbol = checker.declare_variable(decl, checker.globals)
+            elif type(decl) is FunctionDefinition:
+                unit.symbol = checker.declare_function(decl, checker.globals)
+                if unit.symbol is not None:
+                    functions.append((key, decl, unit.symbol))
+
+        # As in Checker.check, every class is complete before any method
+        # body is checked, whether its ClassInfo is new or reused.
+        methods = []
+        for key, decl, info in classes:
+            checker.sink = sinks[key]
+            methods.extend(
+                (key, method, signature)
+                for method, signature in checker.declare_members(decl, info)
+            )
+        for key, method, signature in methods:
+            checker.sink = sinks[key]
+            checker.check_function(method, signature, checker.globals)
+        for key, decl, signature in functions:
+            checker.sink = sinks[key]
+            checker.check_function(decl, signature, checker.globals)
+        if (None, 0) in dirty:
+            checker.sink = sinks[None, 0]
+            checker.check_block(statements, checker.globals)
+
+        for key, errors in sinks.items():
+            units[key].errors = [units[key].keep(error) for error in errors]
+        self.units = units
+        self.checker = checker
+
+        diagnostics = []
+        for unit in units.values():
+            diagnostics.extend(unit.restore(error) for error in unit.errors)
+        diagnostics.sort(key=lambda error: (error.pos.line, error.pos.column))
+        checked = [key[0] for key, _ in declarations if key in dirty]
+        return Report(
+            diagnostics,
+            checked,
+            len(declarations) - len(checked),
+            (None, 0) in dirty,
+        )
+
+    def affected(self, units: dict[Key, Unit]) -> set[Key]:
+        """Keys of the declarations in ``units`` to check again."""
+        old = self.units
+        changed = {
+            unit.name
+            for key, unit in units.items()
+            if unit.name is not None
+            and (
+                key not in old
+                or old[key].interface != unit.interface
+                or old[key].above != unit.above
+            )
+        }
+        changed.update(
+            unit.name
+            for key, unit in old.items()
+            if unit.name is not None and key not in units
+        )
+
+        # Only declarations have an interface to depend on others with.
+        dependents: dict[str, list[str]] = {}
+        for unit in units.values():
+            if unit.name is not None:
+                for name in unit.depends:
+                    dependents.setdefault(name, []).append(unit.name)
+        work = list(changed)
+        while work:
+            for name in dependents.get(work.pop(), ()):
+                if name not in changed:
+                    changed.add(name)
+                    work.append(name)
+
+        return {
+            key
+            for key, unit in units.items()
+            if key not in old
+            or old[key].body != unit.body
+            or unit.name in changed
+            or not changed.isdisjoint(unit.uses)
+        }
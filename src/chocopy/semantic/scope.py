@@ -0,0 +1,48 @@
+from typing import Optional, Union
+
+from chocopy.semantic.types import ClassInfo, FuncType, ValueType
+
+# A variable is bound to its type, a function to its signature and a class
+# to its ClassInfo.
+Symbol = Union[ValueType, FuncType, ClassInfo]
+
+
+class Scope:
+    """Names declared in the global scope or in one function, chained to
+    the scope around it.
+
+    Every scope keeps its names in a dict, so finding a name costs one
+    lookup per enclosing scope whatever the number of declarations.
+    """
+
+    __slots__ = ("names", "parent", "returns")
+
+    def __init__(
+        self, parent: Optional["Scope"] = None, returns: Optional[ValueType] = None
+    ):
+        self.names: dict[str, Symbol] = {}
+        self.parent = parent
+        # Return type of the function, None in the global scope.
+        self.returns = returns
+
+    def declare(self, name: str, symbol: Symbol) -> bool:
+        """Bind ``name`` here; False if this scope already declares it."""
+        if name in self.names:
+            return False
+        self.names[name] = symbol
+        return True
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        scope = self
+        while scope is not None:
+            symbol = scope.names.get(name)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
+        return None
+
+    def globals(self) -> "Scope":
+        scope = self
+        while scope.parent is not None:
+            scope = scope.parent
+        return scope
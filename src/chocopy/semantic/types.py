@@ -0,0 +1,187 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Union
+
+
+@dataclass(frozen=True, slots=True)
+class ClassValueType:
+    name: str
+
+    def __str__(self) -> str:
+        return self.name
+
+
+@dataclass(frozen=True, slots=True)
+class ListValueType:
+    element: "ValueType"
+
+    def __str__(self) -> str:
+        return f"[{self.element}]"
+
+
+ValueType = Union[ClassValueType, ListValueType]
+
+OBJECT = ClassValueType("object")
+INT = ClassValueType("int")
+BOOL = ClassValueType("bool")
+STR = ClassValueType("str")
+# Types of None and of [], which have no class of their own.
+NONE = ClassValueType("<None>")
+EMPTY = ClassValueType("<Empty>")
+# Classes that cannot be extended and whose values are never None.
+SPECIAL = frozenset({INT, BOOL, STR})
+
+
+@dataclass(slots=True)
+class FuncType:
+    params: list[ValueType]
+    returns: ValueType
+
+    def __str__(self) -> str:
+        return f"({', '.join(map(str, self.params))}) -> {self.returns}"
+
+
+@dataclass(slots=True, eq=False)
+class ClassInfo:
+    """A class with everything it declares or inherits, by name."""
+
+    name: str
+    super_class: Optional["ClassInfo"]
+    attributes: dict[str, ValueType] = field(default_factory=dict)
+    methods: dict[str, FuncType] = field(default_factory=dict)
+
+    @property
+    def type(self) -> ClassValueType:
+        return ClassValueType(self.name)
+
+
+# Entries kept in the join memo of a Hierarchy. A program joins few distinct
+# pairs of types, but generated ones can have thousands of classes.
+JOIN_CACHE_SIZE = 4096
+
+
+class Hierarchy:
+    """The classes of a program and the subtype, assignability and join
+    relations between types.
+
+    Queries do not walk superclass chains, which would make checking a
+    program with deep hierarchies quadratic. The first query after classes
+    are added numbers them in depth-first preorder instead: the subclasses
+    of a class are numbered from its own number up to ``end``, so a subtype
+    test compares two integers. Every class also keeps its ancestors at
+    distances 1, 2, 4, 8 and so on, with which a join finds the closest
+    common superclass in a logarithmic number of steps. Joins are memoized
+    in an LRU table of ``JOIN_CACHE_SIZE`` entries that ``add`` clears.
+    """
+
+    def __init__(self):
+        obj = ClassInfo("object", None)
+        # Functions always declare a return type here, so constructors that
+        # override this one are written ``-> object``.
+        obj.methods["__init__"] = FuncType([OBJECT], OBJECT)
+        self.classes: dict[str, ClassInfo] = {"object": obj}
+        # Preorder number of each class and one past that of its last
+        # subclass, and its ancestors 2**k levels up for k = 0, 1, ...
+        self.start: dict[str, int] = {}
+        self.end: dict[str, int] = {}
+        self.jumps: dict[str, list[str]] = {}
+        self.indexed = False
+        self.join = lru_cache(maxsize=JOIN_CACHE_SIZE)(self.compute_join)
+        for special in SPECIAL:
+            self.add(ClassInfo(special.name, obj, methods=dict(obj.methods)))
+
+    def add(self, info: ClassInfo):
+        self.classes[info.name] = info
+        self.indexed = False
+        self.join.cache_clear()
+
+    def build_index(self):
+        classes = self.classes
+        subclasses: dict[str, list[ClassInfo]] = {name: [] for name in classes}
+        roots = []
+        for info in classes.values():
+            base = info.super_class
+            if base is None or classes.get(base.name) is not base:
+                roots.append(info)
+            else:
+                subclasses[base.name].append(info)
+
+        start: dict[str, int] = {}
+        end: dict[str, int] = {}
+        jumps: dict[str, list[str]] = {}
+        number = 0
+        # (class, whether its subclasses are numbered); no recursion, so
+        # chains of any depth are fine.
+        stack = [(info, False) for info in reversed(roots)]
+        while stack:
+            info, done = stack.pop()
+            name = info.name
+            if done:
+                end[name] = number
+                continue
+            start[name] = number
+            number += 1
+            up = []
+            if info.super_class is not None and info.super_class.name in jumps:
+                up.append(info.super_class.name)
+                # The ancestor 2**(k+1) levels up is 2**k levels above the
+                # one 2**k levels up.
+                while len(jumps[up[-1]]) >= len(up):
+                    up.append(jumps[up[-1]][len(up) - 1])
+            jumps[name] = up
+            stack.append((info, True))
+            stack.extend((sub, False) for sub in reversed(subclasses[name]))
+
+        self.start, self.end, self.jumps = start, end, jumps
+        self.indexed = True
+
+    def is_subtype(self, sub: ValueType, sup: ValueType) -> bool:
+        if sub == sup or sup == OBJECT:
+            return True
+        if type(sub) is not ClassValueType or type(sup) is not ClassValueType:
+            return False
+        if not self.indexed:
+            self.build_index()
+        number = self.start.get(sub.name)
+        first = self.start.get(sup.name)
+        if number is None or first is None:
+            return False
+        return first <= number < self.end[sup.name]
+
+    def is_assignable(self, value: ValueType, target: ValueType) -> bool:
+        if self.is_subtype(value, target):
+            return True
+        elif value == NONE:
+            return target not in SPECIAL
+        elif value == EMPTY:
+            return type(target) is ListValueType
+        elif type(value) is ListValueType and type(target) is ListValueType:
+            return value.element == NONE and self.is_assignable(NONE, target.element)
+        return False
+
+    def compute_join(self, a: ValueType, b: ValueType) -> ValueType:
+        """Least type that both ``a`` and ``b`` are assignable to; call it
+        through the memoized ``join``."""
+        if self.is_assignable(a, b):
+            return b
+        elif self.is_assignable(b, a):
+            return a
+        elif type(a) is ClassValueType and type(b) is ClassValueType:
+            start = self.start
+            if a.name in start and b.name in start:
+                return self.common_superclass(a.name, b.name)
+        return OBJECT
+
+    def common_superclass(self, a: str, b: str) -> ClassValueType:
+        """Closest class above ``a`` that ``b`` is a subclass of, when
+        neither is a subclass of the other."""
+        start, end, jumps = self.start, self.end, self.jumps
+        number = start[b]
+        # Climb as far as possible while staying below the common
+        # superclass, halving the step each time; it is then one level up.
+        for k in reversed(range(len(jumps[a]))):
+            up = jumps[a]
+            if k < len(up) and not start[up[k]] <= number < end[up[k]]:
+                a = up[k]
+        up = jumps[a]
+        return ClassValueType(up[0]) if up else OBJECT
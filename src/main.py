@@ -3,4 +3,8 @@ def add(a, b):
 
 
 if __name__ == "__main__":
-    print("hallo welt")
+    import sys
+
+    from chocopy.cli import main
+
+    sys.exit(main())
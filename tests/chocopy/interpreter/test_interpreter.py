@@ -0,0 +1,257 @@
+import io
+import sys
+
+import pytest
+from chocopy.common.errors import RuntimeError
+from chocopy.interpreter.compiler import Compiler
+from chocopy.interpreter.interpreter import Interpreter
+from chocopy.interpreter.runtime import INT_MAX, INT_MIN, wrap
+from chocopy.parser.node import Expr, Literal, Stmt
+from chocopy.parser.parser import Parser
+from chocopy.parser.visitor import node_classes
+from chocopy.scanner.scanner import Scanner
+from chocopy.semantic.checker import Checker
+
+PROGRAM = """class Animal(object):
+    name: str = "animal"
+    legs: int = 4
+    def __init__(self: "Animal") -> object:
+        self.name = "generic"
+    def speak(self: "Animal") -> str:
+        return self.name + " makes a sound"
+    def describe(self: "Animal") -> str:
+        return self.speak() + " on legs"
+
+class Bird(Animal):
+    wings: bool = True
+    def __init__(self: "Bird") -> object:
+        self.legs = 2
+    def speak(self: "Bird") -> str:
+        return "tweet"
+
+count: int = 0
+pets: [Animal] = None
+pet: Animal = None
+letter: str = ""
+
+def counter(start: int) -> int:
+    value: int = 0
+    def bump(by: int) -> object:
+        nonlocal value
+        global count
+        value = value + by
+        count = count + 1
+    value = start
+    bump(2)
+    bump(3)
+    return value
+
+def find(items: [int], wanted: int) -> int:
+    index: int = 0
+    item: int = 0
+    for item in items:
+        if item == wanted:
+            return index
+        index = index + 1
+    return -1
+
+pets = [Animal(), Bird()]
+for pet in pets:
+    print(pet.describe())
+    print(pet.legs)
+print(pets[0].name)
+print(counter(10))
+print(count)
+print(find([4, 5, 6] + [7], 7))
+print(find([], 1))
+for letter in "ok":
+    print(letter)
+if count > 2:
+    print("many")
+elif count > 1:
+    print("two")
+else:
+    print("few")
+print(len("four") if count > 1 else 0)
+print(input() + "!")
+"""
+
+
+SCOPES = """count: int = 0
+
+def outer(start: int) -> int:
+    total: int = 0
+    def middle(step: int) -> int:
+        def inner(times: int) -> object:
+            nonlocal total
+            global count
+            ab: int = 0
+            for total in [total, total + step]:
+                count = count + 1
+            while ab < times:
+                total = total + step
+                ab = ab + 1
+        inner(3)
+        inner(1)
+        return total
+    total = start
+    return middle(2) + middle(5)
+
+def fib(n: int) -> int:
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+print(outer(1))
+print(count)
+print(fib(15))
+"""
+
+
+@pytest.fixture(params=[Interpreter, Compiler])
+def engine(request):
+    return request.param
+
+
+def run(source: str, engine: type, stdin: str = "") -> str:
+    program = Parser(Scanner(source)).parse()
+    Checker().check(program)
+    out = io.StringIO()
+    engine(out, io.StringIO(stdin)).run(program)
+    return out.getvalue()
+
+
+def test_program(engine: type):
+    assert run(PROGRAM, engine, "typed\n").splitlines() == [
+        "generic makes a sound on legs",
+        "4",
+        "tweet on legs",
+        "2",
+        "generic",
+        "15",
+        "2",
+        "3",
+        "-1",
+        "o",
+        "k",
+        "two",
+        "4",
+        "typed!",
+    ]
+
+
+def test_scopes(engine: type):
+    assert run(SCOPES, engine) == "56\n8\n610\n"
+
+
+def test_wrap():
+    assert wrap(INT_MAX + 1) == INT_MIN
+    assert wrap(INT_MIN - 1) == INT_MAX
+    assert wrap(2**32 + 5) == 5
+    assert wrap(-5) == -5
+
+
+@pytest.mark.parametrize(
+    "expr, value",
+    [
+        ("2147483647 + 1", "-2147483648"),
+        ("-2147483647 - 2", "2147483647"),
+        ("65536 * 65536", "0"),
+        ("65536 * 32768", "-2147483648"),
+        ("-(-2147483647 - 1)", "-2147483648"),
+        ("(-2147483647 - 1) // -1", "-2147483648"),
+        ("-7 // 2", "-4"),
+        ("-7 % 2", "1"),
+        ("7 % -2", "-1"),
+        ("True and False or True", "True"),
+        ('"ab" == "ab"', "True"),
+        ('"abc"[1]', "b"),
+        ("len([1, 2] + [3])", "3"),
+    ],
+)
+def test_expressions(engine: type, expr: str, value: str):
+    assert run(f"print({expr})\n", engine) == value + "\n"
+
+
+def test_short_circuit(engine: type):
+    source = (
+        "xs: [int] = None\n"
+        "print(not (xs is None) and xs[0] > 0)\n"
+        "print(xs is None or xs[0] > 0)\n"
+    )
+    assert run(source, engine) == "False\nTrue\n"
+
+
+def test_objects_are_shared(engine: type):
+    source = (
+        "class Box(object):\n"
+        "    item: int = 0\n"
+        "ab: Box = None\n"
+        "cd: Box = None\n"
+        "ab = Box()\n"
+        "cd = ab\n"
+        "cd.item = 5\n"
+        "print(ab.item)\n"
+        "print(ab is cd)\n"
+        "print(ab is Box())\n"
+    )
+    assert run(source, engine) == "5\nTrue\nFalse\n"
+
+
+@pytest.mark.parametrize(
+    "source, message",
+    [
+        ("print(1 // 0)\n", "[1, 9]: Division by zero"),
+        ("print(1 % 0)\n", "[1, 9]: Division by zero"),
+        ("print([1, 2][2])\n", "[1, 13]: Index out of bounds"),
+        ('print("ab"[-1])\n', "[1, 11]: Index out of bounds"),
+        ("xs: [int] = None\nxs[0] = 1\n", "[2, 2]: Operation on None"),
+        ("xs: [int] = None\nprint(xs[0])\n", "[2, 8]: Operation on None"),
+        ("xs: [int] = None\nprint(len(xs + [1]))\n", "[2, 13]: Operation on None"),
+        (
+            "xs: [int] = None\nab: int = 0\nfor ab in xs:\n    pass\n",
+            "[3, 10]: Operation on None",
+        ),
+        ("print(None)\n", "[1, 6]: Invalid argument"),
+        ("xs: [int] = None\nprint(len(xs))\n", "[2, 9]: Invalid argument"),
+        ("ob: object = None\nprint(ob.__init__())\n", "[2, 8]: Operation on None"),
+    ],
+)
+def test_runtime_errors(engine: type, source: str, message: str):
+    with pytest.raises(RuntimeError) as error:
+        run(source, engine)
+    assert str(error.value) == message
+
+
+def test_stack_overflow(engine: type):
+    source = "def down(ab: int) -> int:\n    return down(ab + 1)\n\nprint(down(0))\n"
+    with pytest.raises(RuntimeError, match="Stack overflow"):
+        run(source, engine)
+
+
+def test_deep_recursion(engine: type):
+    # Well past what Python's default recursion limit allows a ChocoPy call.
+    source = (
+        "def depth(ab: int) -> int:\n"
+        "    if ab == 0:\n"
+        "        return 0\n"
+        "    return depth(ab - 1) + 1\n"
+        "\n"
+        "print(depth(900))\n"
+    )
+    limit = sys.getrecursionlimit()
+    assert run(source, engine) == "900\n"
+    assert sys.getrecursionlimit() == limit
+
+
+@pytest.mark.parametrize("engine", [Interpreter, Compiler])
+def test_dispatch_covers_statements_and_expressions(engine: type):
+    def concrete(base: type) -> set[type]:
+        return {
+            cls
+            for cls in node_classes()
+            if issubclass(cls, base) and cls not in (base, Literal)
+        }
+
+    assert concrete(Stmt) <= set(engine.STATEMENTS)
+    assert concrete(Expr) <= set(engine.EXPRESSIONS)
@@ -0,0 +1,130 @@
+import pytest
+from chocopy.common.errors import SyntaxError
+from chocopy.common.token import Position
+from chocopy.parser.arena import Arena
+from chocopy.parser.node import (
+    AssignStmt,
+    BinaryExpr,
+    BoolLiteral,
+    ErrorNode,
+    IfStmt,
+    IntegerLiteral,
+    Node,
+    PassStmt,
+    Program,
+    WhileStmt,
+)
+from chocopy.parser.parser import Parser
+from chocopy.scanner.scanner import Scanner
+
+SOURCE = """class Ab(object):
+    xy: int = 1
+    def get(self: "Ab") -> int:
+        return self.xy
+
+ab: int = 1
+ok: bool = True
+def sq(n: int) -> int:
+    return n * n
+
+for xs in [1, 2, 3]:
+    ab = ab + sq(xs) if ok else -ab
+if ab > 1 and not ok:
+    print("big")
+elif ab:
+    pass
+else:
+    Ab().get()
+"""
+
+
+def dump(value):
+    if isinstance(value, list):
+        return [dump(item) for item in value]
+    if isinstance(value, Node):
+        fields = [dump(getattr(value, name)) for name in value._fields]
+        return (type(value).__name__, value.pos, *fields)
+    return (type(value).__name__, value)
+
+
+def parse(source: str, **kwargs):
+    arena = Arena()
+    root = Parser(Scanner(source), ast=arena, **kwargs).parse()
+    return arena, root
+
+
+def test_arena_tree_matches_object_tree():
+    arena, root = parse(SOURCE)
+
+    assert dump(arena.to_node(root)) == dump(Parser(Scanner(SOURCE)).parse())
+
+
+def test_children_come_before_parents():
+    arena, root = parse(SOURCE)
+
+    assert root == len(arena) - 1
+    for index in arena.walk(root):
+        assert all(child < index for child in arena.child_indices(index))
+    assert sum(1 for _ in arena.walk(root)) == len(arena)
+
+
+def test_views():
+    arena, root = parse("ab = 1 + 2\nwhile True:\n    pass\n")
+    program = arena.view(root)
+
+    assert program.kind is Program
+    assign, loop = program.statements
+    assert assign.kind is AssignStmt
+    assert assign.target.name == "ab"
+    value = assign.value
+    assert value.kind is BinaryExpr
+    assert value.pos == Position(1, 8)
+    assert value.operator == "+"
+    assert [child.kind for child in value.children()] == [IntegerLiteral] * 2
+    assert value.right.val == 2
+
+    assert loop.kind is WhileStmt
+    assert loop.condition.kind is BoolLiteral
+    assert loop.condition.val is True
+    assert [stmt.kind for stmt in loop.body] == [PassStmt]
+
+    with pytest.raises(AttributeError):
+        value.body
+
+
+def test_values_are_shared():
+    arena, root = parse("ab = 1\nab = 1\nab = True\n")
+
+    assert [(type(v), v) for v in arena.values] == [
+        (type(None), None),
+        (str, "ab"),
+        (int, 1),
+        (bool, True),
+    ]
+
+
+def test_deeply_nested_blocks():
+    depth = 2000
+    source = "".join("    " * level + "if ab:\n" for level in range(depth))
+    arena, root = parse(source + "    " * depth + "pass\n")
+
+    node = arena.to_node(root).statements[0]
+    for _ in range(depth - 1):
+        assert isinstance(node, IfStmt)
+        node = node.then_block[0]
+    assert isinstance(node.then_block[0], PassStmt)
+
+
+def test_assignment_target_check():
+    with pytest.raises(SyntaxError):
+        parse("ab + 1 = 2\n")
+
+
+def test_recovering_parser():
+    parser = Parser(Scanner("ab = = 1\nprint(ab)\n"), recover=True, ast=Arena())
+    program = parser.ast.view(parser.parse())
+
+    assert len(parser.diagnostics) == 1
+    error, call = program.statements
+    assert error.kind is ErrorNode
+    assert call.expr.function.name == "print"
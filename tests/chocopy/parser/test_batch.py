@@ -0,0 +1,77 @@
+from chocopy.common.errors import ChocoPyError, LexicalError, SyntaxError
+from chocopy.common.token import Position
+from chocopy.parser.batch import parse_files
+from chocopy.parser.node import AssignStmt, ErrorNode, ExprStmt
+
+SOURCES = {
+    "good.choco": "ab = 1\nprint(ab)\n",
+    "syntax.choco": "ab = = 1\nprint(ab)\n",
+    "lexical.choco": "ab = 1 $ 2\n",
+}
+
+
+def write(tmp_path, count: int = 1):
+    paths = []
+    for i in range(count):
+        for name, source in SOURCES.items():
+            path = tmp_path / f"{i}-{name}"
+            path.write_text(source)
+            paths.append(path)
+    return paths
+
+
+def test_results_follow_input_order(tmp_path):
+    paths = write(tmp_path, 4)
+    results = parse_files(paths, workers=2, chunk_size=2)
+
+    assert [r.path for r in results] == [str(p) for p in paths]
+    assert [r.ok for r in results] == [True, False, False] * 4
+
+
+def test_results(tmp_path):
+    good, syntax, lexical = parse_files(write(tmp_path), workers=1)
+
+    assert [type(s) for s in good.program().statements] == [AssignStmt, ExprStmt]
+    assert good.parse_time > 0 and good.serialize_time > 0
+
+    assert syntax.program() is None
+    (error,) = syntax.errors()
+    assert isinstance(error, SyntaxError)
+    assert error.pos == Position(1, 6)
+
+    assert [type(e) for e in lexical.errors()] == [LexicalError]
+
+
+def test_recover(tmp_path):
+    results = parse_files(write(tmp_path, 2), workers=2, recover=True)
+
+    syntax = results[1]
+    assert len(syntax.diagnostics) == 1
+    statements = syntax.program().statements
+    assert [type(s) for s in statements] == [ErrorNode, ExprStmt]
+
+
+def test_workers_agree(tmp_path):
+    paths = write(tmp_path, 3)
+    serial = parse_files(paths, workers=1, recover=True)
+    parallel = parse_files(paths, workers=3, recover=True)
+
+    assert [(r.ast, r.diagnostics) for r in parallel] == [
+        (r.ast, r.diagnostics) for r in serial
+    ]
+
+
+def test_unreadable_files(tmp_path):
+    paths = write(tmp_path)
+    missing = tmp_path / "missing.choco"
+    binary = tmp_path / "binary.choco"
+    binary.write_bytes(b"ab = 1\nprint(ab)\n\xff\n")
+    results = parse_files([missing, binary, *paths], workers=2, chunk_size=1)
+
+    assert [r.ok for r in results] == [False, False, True, False, False]
+    assert [kind for kind, *_ in results[0].diagnostics] == ["FileNotFoundError"]
+    assert [kind for kind, *_ in results[1].diagnostics] == ["UnicodeDecodeError"]
+    (error,) = results[1].errors()
+    assert isinstance(error, ChocoPyError)
+    assert "can't decode byte 0xff" in error.message
+    assert results[1].program() is None
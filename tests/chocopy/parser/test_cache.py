@@ -0,0 +1,64 @@
+import marshal
+import zlib
+
+import pytest
+from chocopy.common.errors import SyntaxError
+from chocopy.parser.cache import ParseCache
+from chocopy.parser.serialize import SIGNATURE, dumps
+
+SOURCE = "def f(ab: int) -> int:\n    return ab * 2\n\nprint(f(21))\n"
+
+
+def test_hit_after_miss(tmp_path):
+    cache = ParseCache(tmp_path)
+    first = cache.parse(SOURCE)
+    second = ParseCache(tmp_path).parse(SOURCE.encode())
+
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert second is not first
+    assert dumps(second) == dumps(first)
+
+
+def test_key_is_the_source(tmp_path):
+    cache = ParseCache(tmp_path)
+    cache.parse(SOURCE)
+    cache.parse(SOURCE + "print(1)\n")
+    cache.parse(SOURCE)
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        b"junk",
+        zlib.compress(marshal.dumps((SIGNATURE, [], b"\xff", ("b", b"\0")))),
+        zlib.compress(marshal.dumps(None)),
+    ],
+)
+def test_unreadable_entry_is_replaced(tmp_path, entry):
+    cache = ParseCache(tmp_path)
+    cache.path(SOURCE.encode()).write_bytes(entry)
+
+    assert cache.parse(SOURCE).statements
+    assert cache.misses == 1
+    cache.parse(SOURCE)
+    assert cache.hits == 1
+
+
+def test_errors_are_not_cached(tmp_path):
+    cache = ParseCache(tmp_path)
+
+    with pytest.raises(SyntaxError):
+        cache.parse("ab = = 1\n")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_file(tmp_path):
+    path = tmp_path / "main.py"
+    path.write_text(SOURCE)
+    cache = ParseCache(tmp_path / "cache")
+
+    assert dumps(cache.parse_file(path)) == dumps(cache.parse(SOURCE))
+    assert cache.hits == 1
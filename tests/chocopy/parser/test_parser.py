@@ -1,7 +1,7 @@
 import pytest
 from chocopy.scanner.scanner import Scanner
 from chocopy.parser.parser import Parser
-from chocopy.common.token import TokenType
+from chocopy.common.token import Position, TokenType
 from chocopy.common.errors import SyntaxError
 from chocopy.parser.node import (
     NoneLiteral,
@@ -20,6 +20,8 @@ from chocopy.parser.node import (
     VariableNode,
     IfExpr,
     BinaryExpr,
+    UnaryExpr,
+    PassStmt,
     Program,
     ClassDefinition,
     FunctionDefinition,
@@ -455,3 +457,123 @@ def test_empty_class_with_pass():
     assert len(ast.declarations) == 1
     assert isinstance(ast.declarations[0], ClassDefinition)
     assert len(ast.declarations[0].var_defs) == 0
+
+
+def test_names_share_one_string_object():
+    code = """def total(count: int) -> int:
+    return count + count
+total(1)
+"""
+    ast = Parser(Scanner(code)).parse()
+    func = ast.declarations[0]
+    ret = func.statements[0]
+
+    assert func.params[0].name is ret.value.left.name
+    assert ret.value.left.name is ret.value.right.name
+    assert func.name is ast.statements[0].expr.function.name
+
+
+def shape(node) -> str:
+    if isinstance(node, BinaryExpr):
+        return f"({shape(node.left)} {node.operator} {shape(node.right)})"
+    elif isinstance(node, UnaryExpr):
+        return f"({node.operator} {shape(node.operand)})"
+    elif isinstance(node, VariableNode):
+        return node.name
+    return str(node.val)
+
+
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        ("a - b - c", "((a - b) - c)"),
+        ("a // b * c % d", "(((a // b) * c) % d)"),
+        ("a + b * c - d", "((a + (b * c)) - d)"),
+        ("a < b == c", "((a < b) == c)"),
+        ("a + b < c * d", "((a + b) < (c * d))"),
+        ("a or b and c or d", "((a or (b and c)) or d)"),
+        ("not a and b", "((not a) and b)"),
+        ("not a == b", "((not a) == b)"),
+        ("- - a * b", "((- (- a)) * b)"),
+        ("a is None or b", "((a is None) or b)"),
+        ("(a or b) * c", "((a or b) * c)"),
+    ],
+)
+def test_operator_precedence(create_parser, source, expected):
+    assert shape(create_parser(source).parse_expr()) == expected
+
+
+DEPTH = 5000
+
+
+@pytest.mark.parametrize(
+    "source,attribute",
+    [
+        ("not " * DEPTH + "ab", "operand"),
+        ("- " * DEPTH + "ab", "operand"),
+        ("(" * DEPTH + "ab" + ")" * DEPTH, None),
+        ("[" * DEPTH + "ab" + "]" * DEPTH, "elements"),
+        ("ab" + "[ab" * DEPTH + "]" * DEPTH, "index"),
+        ("f(" * DEPTH + "ab" + ")" * DEPTH, "args"),
+        ("ab if ab else " * DEPTH + "ab", "else_branch"),
+    ],
+)
+def test_deeply_nested_expression(create_parser, source, attribute):
+    node = create_parser(source).parse_expr()
+
+    depth = 0
+    while attribute is not None and not isinstance(node, VariableNode):
+        node = getattr(node, attribute)
+        if isinstance(node, list):
+            node = node[0]
+        depth += 1
+
+    assert isinstance(node, VariableNode)
+    assert depth in (0, DEPTH)
+
+
+def test_deeply_nested_blocks():
+    depth = 400
+    lines = []
+    for level in range(depth):
+        keyword = ["if True:", "while True:", "for ab in xs:"][level % 3]
+        lines.append("    " * level + keyword)
+    lines.append("    " * depth + "pass")
+    program = Parser(Scanner("\n".join(lines) + "\n")).parse()
+
+    node = program.statements[0]
+    for _ in range(depth):
+        body = node.then_block if hasattr(node, "then_block") else node.body
+        assert len(body) == 1
+        node = body[0]
+    assert isinstance(node, PassStmt)
+
+
+def test_elif_chain_without_recursion():
+    source = "if ab:\n    pass\n" + "elif ab:\n    pass\n" * 2000
+    node = Parser(Scanner(source)).parse().statements[0]
+
+    count = 0
+    while node.else_block:
+        node = node.else_block[0]
+        count += 1
+    assert count == 2000
+
+
+def test_nodes_are_slotted():
+    source = "if ab:\n    xs[0] = f(ab) + 1\nelse:\n    pass\n"
+    program = Parser(Scanner(source)).parse()
+    node = program.statements[0]
+
+    assert not hasattr(program, "__dict__")
+    assert not hasattr(node, "__dict__")
+    assert not hasattr(node.then_block[0].value, "__dict__")
+    assert node.pos == Position(1, 1)
+    assert node.then_block[0].value.pos == Position(2, 18)
+
+    node.pos = Position(70000, 5)
+    assert node.pos == Position(70000, 5)
+    # The position read back is a copy, so it cannot be changed in place.
+    with pytest.raises(AttributeError):
+        node.pos.line = 3
+    assert node.pos == Position(70000, 5)
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+from chocopy.common.errors import ChocoPyError, LexicalError, SyntaxError
+from chocopy.parser.node import (
+    AssignStmt,
+    ClassDefinition,
+    ErrorNode,
+    ExprStmt,
+    FunctionDefinition,
+    IfStmt,
+    ReturnStmt,
+    WhileStmt,
+)
+from chocopy.parser.parser import Parser
+from chocopy.scanner.scanner import Scanner
+
+SOURCE = """class A(object):
+    x: int = 1 +
+    def f(self: "A") -> int:
+        return self.x $ 1
+
+def g(n: int) -> int:
+    if n >:
+        return 1
+    elif n:
+        pass
+    else:
+        return 2
+    return n
+
+ab = 1
+ab = = 2
+while ab:
+    ab = ab - 1
+    print(ab))
+print("ok")
+"""
+
+
+def parse(source: str):
+    parser = Parser(Scanner(source), recover=True)
+    return parser.parse(), parser.diagnostics
+
+
+def test_reports_all_errors_in_one_pass():
+    program, diagnostics = parse(SOURCE)
+
+    assert [(type(d), d.pos.line) for d in diagnostics] == [
+        (SyntaxError, 2),
+        (LexicalError, 4),
+        (SyntaxError, 7),
+        (SyntaxError, 16),
+        (SyntaxError, 19),
+    ]
+
+    a, g = program.declarations
+    assert isinstance(a, ClassDefinition)
+    assert isinstance(a.var_defs[0], ErrorNode)
+    assert isinstance(a.method_defs[0], FunctionDefinition)
+
+    assert isinstance(g, FunctionDefinition)
+    assert [type(s) for s in g.statements] == [ErrorNode, ReturnStmt]
+
+    assign, error, loop, last = program.statements
+    assert isinstance(assign, AssignStmt)
+    assert isinstance(error, ErrorNode)
+    assert error.message == "Expected cexpr found TokenType.EQUAL"
+    assert isinstance(loop, WhileStmt)
+    assert [type(s) for s in loop.body] == [AssignStmt, ErrorNode]
+    assert isinstance(last, ExprStmt)
+
+
+def test_default_mode_raises_first_error():
+    with pytest.raises(SyntaxError) as info:
+        Parser(Scanner(SOURCE)).parse()
+
+    assert info.value.pos.line == 2
+
+
+def test_valid_source_has_no_diagnostics():
+    source = "if ab:\n    pass\nelse:\n    print(ab)\n"
+    program, diagnostics = parse(source)
+
+    assert diagnostics == []
+    assert isinstance(program.statements[0], IfStmt)
+
+
+def test_error_between_clauses_closes_statement():
+    source = "if ab:\n    pass\nelse ab:\n    pass\nprint(ab)\n"
+    program, diagnostics = parse(source)
+
+    assert len(diagnostics) == 1
+    node, after = program.statements
+    assert isinstance(node.else_block[0], ErrorNode)
+    assert isinstance(after, ExprStmt)
+
+
+def test_first_diagnostic_is_the_default_error():
+    rng = random.Random(14)
+    junk = ["$", '"', "\n", "    ", ":", "if", "else", "(", "=", "1", "def"]
+    for _ in range(300):
+        source = SOURCE.replace("+", "").replace("$", "").replace(">:", ">1:")
+        for _ in range(rng.randint(1, 3)):
+            i = rng.randrange(len(source))
+            source = source[:i] + rng.choice(junk) + source[i + rng.randrange(3) :]
+
+        try:
+            Parser(Scanner(source)).parse()
+            continue
+        except ChocoPyError as error:
+            expected = str(error)
+
+        _, diagnostics = parse(source)
+        assert str(diagnostics[0]) == expected
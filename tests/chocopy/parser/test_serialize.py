@@ -0,0 +1,113 @@
+import marshal
+import zlib
+
+import pytest
+from chocopy.parser.arena import Arena
+from chocopy.parser.node import Node
+from chocopy.parser.parser import Parser
+from chocopy.parser.serialize import SIGNATURE, dumps, dumps_arena, loads
+from chocopy.scanner.scanner import Scanner
+
+SOURCE = """class Ab(object):
+    xy: int = 1
+    name: str = "a\\tb"
+    def get(self: "Ab") -> [int]:
+        global gl
+        return [self.xy]
+
+gl: bool = False
+nothing: object = None
+def f(ab: int) -> object:
+    def g() -> int:
+        nonlocal ab
+        return ab
+    for xs in [1, 2]:
+        ab = -ab if not gl else ab // 2
+    return
+
+while gl and f(1) is None:
+    pass
+"""
+
+
+def dump(value):
+    if isinstance(value, list):
+        return [dump(item) for item in value]
+    if isinstance(value, Node):
+        fields = [dump(getattr(value, name)) for name in value._fields]
+        return (type(value).__name__, value.pos, *fields)
+    return (type(value).__name__, value)
+
+
+def parse(source: str) -> Node:
+    return Parser(Scanner(source)).parse()
+
+
+def test_round_trip():
+    program = parse(SOURCE)
+
+    assert dump(loads(dumps(program))) == dump(program)
+
+
+def test_round_trip_of_subtree():
+    statement = parse(SOURCE).statements[0]
+
+    assert dump(loads(dumps(statement))) == dump(statement)
+
+
+def test_round_trip_of_deep_tree():
+    program = parse("(" * 10_000 + "ab" + ")" * 10_000 + "\n")
+
+    assert loads(dumps(program)).statements[0].expr.name == "ab"
+
+
+def test_arena_bytes():
+    arena = Arena()
+    root = Parser(Scanner(SOURCE), ast=arena).parse()
+    copy = Arena.from_bytes(arena.to_bytes())
+
+    assert dump(copy.to_node(root)) == dump(arena.to_node(root))
+    assert copy.values == arena.values
+
+
+def test_dumps_arena():
+    arena = Arena()
+    root = Parser(Scanner(SOURCE), ast=arena).parse()
+
+    assert dump(loads(dumps_arena(arena))) == dump(arena.to_node(root))
+
+
+def entry(*fields) -> bytes:
+    return zlib.compress(marshal.dumps(fields))
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"not an ast",
+        dumps(parse(SOURCE))[:-10],
+        entry(None),
+        # No nodes, a kind out of range, a child that is missing.
+        entry(SIGNATURE, [], b"", ("b", b""), ("B", b""), ("B", b"")),
+        entry(SIGNATURE, [], b"\xff", ("b", b"\0"), ("B", b"\0"), ("B", b"")),
+        entry(SIGNATURE, [], b"\x04", ("b", b"\0"), ("B", b"\0"), ("B", b"\0")),
+    ],
+)
+def test_bad_data(data: bytes):
+    with pytest.raises(ValueError, match="not a serialized tree"):
+        loads(data)
+
+
+def test_other_version():
+    _, *rest = marshal.loads(zlib.decompress(dumps(parse(SOURCE))))
+
+    with pytest.raises(ValueError, match="another version"):
+        loads(entry("0" * 16, *rest))
+
+
+def test_other_arena_version():
+    _, *rest = marshal.loads(Arena().to_bytes())
+
+    with pytest.raises(ValueError, match="another version"):
+        Arena.from_bytes(marshal.dumps(("0" * 16, *rest)))
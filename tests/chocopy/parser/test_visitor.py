@@ -0,0 +1,161 @@
+from chocopy.parser.node import (
+    BinaryExpr,
+    ExprStmt,
+    IfStmt,
+    IntegerLiteral,
+    Node,
+    PassStmt,
+    Program,
+    UnaryExpr,
+    VariableNode,
+)
+from chocopy.parser.parser import Parser
+from chocopy.parser.visitor import (
+    NodeTransformer,
+    NodeVisitor,
+    NodeWalker,
+    child_nodes,
+    walk,
+)
+from chocopy.scanner.scanner import Scanner
+
+SOURCE = """def f(ab: int) -> int:
+    return ab + 1
+
+if f(2) > 1:
+    pass
+    print(ab)
+else:
+    pass
+"""
+
+
+def parse(source: str) -> Program:
+    return Parser(Scanner(source)).parse()
+
+
+class Names(NodeVisitor):
+    def __init__(self):
+        self.names = []
+        self.literals = 0
+
+    def visit_VariableNode(self, node: VariableNode):
+        self.names.append(node.name)
+
+    def visit_Literal(self, node):
+        self.literals += 1
+
+
+def test_visitor_dispatch():
+    visitor = Names()
+    visitor.visit(parse(SOURCE))
+
+    assert visitor.names == ["ab", "f", "print", "ab"]
+    assert visitor.literals == 3
+    assert Names._dispatch[IntegerLiteral] is Names.visit_Literal
+    assert Names._dispatch[IfStmt] is NodeVisitor.generic_visit
+    assert NodeVisitor._dispatch[VariableNode] is NodeVisitor.generic_visit
+
+
+def test_visitor_returns_result():
+    class Depth(NodeVisitor):
+        def generic_visit(self, node: Node) -> int:
+            return 1 + max(map(self.visit, child_nodes(node)), default=0)
+
+    # Program, ExprStmt, UnaryExpr, UnaryExpr, VariableNode
+    assert Depth().visit(parse("not not ab\n")) == 5
+
+
+def test_visitor_for_new_node_class():
+    class Custom(VariableNode):
+        __slots__ = ()
+
+    visitor = Names()
+    visitor.visit(Custom("xy", parse("ab\n").pos))
+
+    assert visitor.names == ["xy"]
+
+
+def test_transformer():
+    class Rewrite(NodeTransformer):
+        def visit_PassStmt(self, node):
+            return None
+
+        def visit_VariableNode(self, node):
+            node.name = node.name.upper()
+            return node
+
+        def visit_ExprStmt(self, node):
+            node = self.generic_visit(node)
+            return [node, node]
+
+    program = Rewrite().visit(parse(SOURCE))
+    branch = program.statements[0]
+
+    assert isinstance(branch, IfStmt)
+    assert [type(s) for s in branch.then_block] == [ExprStmt, ExprStmt]
+    assert branch.then_block[0].expr.args[0].name == "AB"
+    assert branch.else_block == []
+
+
+def test_walk_is_preorder():
+    program = parse("ab = 1 + -xy\n")
+
+    assert [type(node) for node in walk(program)][2:] == [
+        VariableNode,
+        BinaryExpr,
+        IntegerLiteral,
+        UnaryExpr,
+        VariableNode,
+    ]
+
+
+def test_walker_enters_and_leaves():
+    class Trace(NodeWalker):
+        def __init__(self):
+            self.events = []
+
+        def enter_Expr(self, node):
+            self.events.append(("enter", type(node).__name__))
+            return not isinstance(node, UnaryExpr)
+
+        def leave_BinaryExpr(self, node):
+            self.events.append(("leave", "BinaryExpr"))
+
+    walker = Trace()
+    walker.walk(parse("ab = 1 + -xy\n"))
+
+    assert walker.events == [
+        ("enter", "VariableNode"),
+        ("enter", "BinaryExpr"),
+        ("enter", "IntegerLiteral"),
+        ("enter", "UnaryExpr"),
+        ("leave", "BinaryExpr"),
+    ]
+
+
+def test_walker_handles_deep_trees():
+    class Count(NodeWalker):
+        count = 0
+
+        def enter_UnaryExpr(self, node):
+            self.count += 1
+
+    depth = 100_000
+    walker = Count()
+    walker.walk(parse("-" * depth + "ab\n"))
+
+    assert walker.count == depth
+    assert sum(1 for _ in walk(parse("not " * depth + "ab\n"))) == depth + 3
+
+
+def test_unvisited_children_are_left_alone():
+    class Noop(NodeTransformer):
+        pass
+
+    program = parse(SOURCE)
+    before = [type(node) for node in walk(program)]
+
+    assert Noop().visit(program) is program
+    assert [type(node) for node in walk(program)] == before
+    assert PassStmt in before
@@ -0,0 +1,112 @@
+import pytest
+from chocopy.common.errors import LexicalError, SyntaxError
+from chocopy.common.token import TokenType
+from chocopy.parser.node import ClassDefinition, FunctionDefinition, Program
+from chocopy.parser.parser import Parser
+from chocopy.scanner.buffer import TokenBuffer
+from chocopy.scanner.scanner import Scanner
+
+SOURCE = """class A(object):
+    s: str = "Tab:\\t Quote:\\""
+    def f(self: "A") -> int:
+        return 0 # comment
+
+def g(x: int) -> bool:
+    if x >= 1:
+
+        return True
+    return False
+
+print(g(A().f()) and not [1, 2][0] != -3)
+"""
+
+
+def scan_all(source: str) -> list:
+    sc = Scanner(source)
+    tokens = [sc.scan_token()]
+    while tokens[-1].tokentyp != TokenType.EOF:
+        tokens.append(sc.scan_token())
+    return tokens
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_buffer_matches_scanner(fast):
+    buffer = TokenBuffer(SOURCE, fast=fast)
+    tokens = scan_all(SOURCE)
+
+    assert len(buffer) == len(tokens)
+    assert [buffer.token(i) for i in range(len(buffer))] == tokens
+
+
+def test_buffer_offsets():
+    buffer = TokenBuffer("x = 12\nif x:\n    pass")
+
+    spans = [(buffer.starts[i], buffer.ends[i]) for i in range(len(buffer))]
+    assert spans == [
+        (0, 1),
+        (2, 3),
+        (4, 6),
+        (6, 7),
+        (7, 9),
+        (10, 11),
+        (11, 12),
+        (12, 13),
+        (17, 17),
+        (17, 21),
+        (21, 21),
+        (21, 21),
+    ]
+    assert buffer.tokentyp(8) == TokenType.INDENT
+
+
+def test_buffer_keeps_returning_EOF():
+    buffer = TokenBuffer("x")
+
+    assert buffer.scan_token().tokentyp == TokenType.ID
+    for _ in range(3):
+        assert buffer.scan_token().tokentyp == TokenType.EOF
+
+
+def test_buffer_reports_lexical_errors():
+    buffer = TokenBuffer("x = 0123")
+
+    assert [(i, str(error)) for i, error in buffer.errors] == [
+        (2, "[1, 5]: Leading '0' is not allowed!")
+    ]
+    assert buffer.scan_token().lexeme == "x"
+    assert buffer.scan_token().lexeme == "="
+    with pytest.raises(LexicalError, match="Leading '0'"):
+        buffer.scan_token()
+
+
+def test_buffer_reports_errors_in_source_order():
+    source = "x = = 1\nab = $\n"
+
+    with pytest.raises(SyntaxError) as expected:
+        Parser(Scanner(source)).parse()
+    with pytest.raises(SyntaxError) as error:
+        Parser(TokenBuffer(source)).parse()
+    assert str(error.value) == str(expected.value)
+
+
+def test_recovering_parser_reads_past_bad_tokens():
+    source = "x = $ 1\nprint(x)\nab = 0123\n"
+    expected = Parser(Scanner(source), recover=True)
+    expected.parse()
+    parser = Parser(TokenBuffer(source), recover=True)
+    parser.parse()
+
+    assert [str(error) for error in parser.diagnostics] == [
+        str(error) for error in expected.diagnostics
+    ]
+    assert len(parser.diagnostics) == 2
+
+
+def test_parser_consumes_buffer():
+    ast = Parser(TokenBuffer(SOURCE)).parse()
+
+    assert isinstance(ast, Program)
+    assert isinstance(ast.declarations[0], ClassDefinition)
+    assert isinstance(ast.declarations[1], FunctionDefinition)
+    assert ast.declarations[0].var_defs[0].literal.val == 'Tab:\t Quote:"'
+    assert len(ast.statements) == 1
@@ -0,0 +1,147 @@
+import random
+from array import array
+
+import pytest
+from chocopy.common.token import Position, TokenType
+from chocopy.scanner.lines import LazyPosition, LineIndex
+from chocopy.scanner.scanner import Scanner
+
+
+def scan_all(source: str, **options):
+    scanner = Scanner(source, **options)
+    tokens = []
+    try:
+        while True:
+            token = scanner.scan_token()
+            tokens.append(token)
+            if token.tokentyp == TokenType.EOF:
+                return tokens
+    except Exception as e:
+        return tokens, type(e).__name__, str(e), scanner.current
+
+
+PROGRAM = """class Animal(object):
+    name: str = "Tab:\\t Quote:\\" Slash:\\\\"
+    def speak(self: "Animal") -> str:
+        return self.name # comment
+
+def fib(n: int) -> int:
+    if n <= 1:
+        return n
+
+    # blank lines and comments between statements
+
+    return fib(n - 1) + fib(n - 2)
+
+x: [int] = None
+x = [1, 2, 3]
+while x[0] != 0 and not False:
+    x[0] = x[0] // 2 % 7 - -1
+print(fib(10) if x[0] >= 0 else x[0] == 2147483647)
+"""
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "",
+        "\n",
+        "   ",
+        "x",
+        "a\nx = 1",
+        "if True:\n    pass\npass",
+        "if True:\n    if False:\n        pass\npass",
+        "if True:\n\n    # Comment\n    pass",
+        "if True:\n    pass\n  pass",
+        "if True:\n   pass",
+        "x = 1 # trailing\n# only comment",
+        "x\t=\r1\r\n",
+        "\tx",
+        "0",
+        "0123",
+        "2147483647",
+        "2147483648",
+        "123.123",
+        "12abc",
+        "/",
+        "!",
+        "a // b",
+        "a -> b",
+        '"Hallo Welt"',
+        '""',
+        '"Tab:\\t Neu:\\n Backslash:\\\\ Quote:\\""',
+        '"Error \\z"',
+        '"String without termination',
+        '"line 1\nline 2"',
+        '"trailing backslash \\',
+        "café = 1",
+        "x²",
+        "1²",
+        "$",
+        PROGRAM,
+    ],
+)
+def test_fast_engine_matches_default(source):
+    expected = scan_all(source)
+    assert scan_all(source, fast=True) == expected
+    assert scan_all(source, lazy_positions=True) == expected
+
+
+def test_fast_engine_matches_default_on_random_input():
+    alphabet = 'ab_Z09 \t\r\n\n    #"\\/!-<>=+*%()[],:.é²'
+    words = ["if", "True", "pass", "x", "    ", "\n    ", "0", "123", '"s"']
+    rng = random.Random(4711)
+
+    for _ in range(2000):
+        parts = [
+            rng.choice(words) if rng.random() < 0.3 else rng.choice(alphabet)
+            for _ in range(rng.randint(0, 30))
+        ]
+        source = "".join(parts)
+        expected = scan_all(source)
+        assert scan_all(source, fast=True) == expected, source
+        assert scan_all(source, lazy_positions=True) == expected, source
+
+
+def test_lazy_positions_resolve_on_access():
+    source = "x = 1\n\n# comment\nif x:\n    pass"
+    tokens = scan_all(source, lazy_positions=True)
+
+    assert isinstance(tokens[0].position, LazyPosition)
+    assert [(t.position.line, t.position.column) for t in tokens] == [
+        (1, 1),
+        (1, 3),
+        (1, 5),
+        (1, 6),
+        (4, 0),
+        (4, 3),
+        (4, 4),
+        (4, 5),
+        (4, 5),
+        (5, 4),
+        (5, 8),
+        (5, 8),
+    ]
+
+
+def test_lazy_position_resolves_once():
+    lines = LineIndex("ab\ncd")
+    pos = LazyPosition(lines, 4)
+
+    assert pos.line == 2
+    # The line index is not consulted again.
+    lines.starts = array("i")
+    assert (pos.line, pos.column) == (2, 1)
+    assert pos == Position(2, 1)
+    assert Position(2, 1) == pos
+
+
+def test_line_index():
+    lines = LineIndex("ab\n\ncd\n")
+
+    assert list(lines.starts) == [0, 3, 4, 7]
+    assert lines.locate(0) == (1, 1)
+    assert lines.locate(2) == (1, 3)
+    assert lines.locate(3) == (2, 0)
+    assert lines.locate(5) == (3, 1)
+    assert lines.position(7) == Position(4, 0)
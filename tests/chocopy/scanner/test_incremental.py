@@ -0,0 +1,126 @@
+import random
+
+import pytest
+from chocopy.common.errors import LexicalError
+from chocopy.common.token import TokenType
+from chocopy.scanner.buffer import TokenBuffer
+from chocopy.scanner.incremental import IncrementalScanner
+from chocopy.scanner.scanner import Scanner
+
+SOURCE = """class A(object):
+    s: str = "Tab:\\t Quote:\\""
+    def f(self: "A") -> int:
+        return 0 # comment
+
+def g(xs: int) -> bool:
+    if xs >= 1:
+
+        return True
+    return False
+
+print(g(A().f()) and not [1, 2][0] != -3)
+"""
+
+PIECES = ["\n", "    ", " ", "ab", "if True:\n", "#c", "1", '"s"', "(", "==", "pass\n"]
+
+
+def scan(source: str, fast: bool = True) -> tuple[list, list[str]]:
+    """Tokens of ``source`` and its lexical errors, scanning past them."""
+    sc = Scanner(source, fast=fast)
+    tokens = []
+    errors = []
+    while not tokens or tokens[-1].tokentyp != TokenType.EOF:
+        try:
+            tokens.append(sc.scan_token())
+        except LexicalError as error:
+            errors.append(str(error))
+    return tokens, errors
+
+
+def position(source: str, offset: int) -> tuple[int, int]:
+    line_start = source.rfind("\n", 0, offset) + 1
+    return source.count("\n", 0, offset) + 1, offset - line_start
+
+
+def edit(inc: IncrementalScanner, start: int, end: int, text: str):
+    source = inc.source
+    inc.edit(position(source, start), position(source, end), text)
+
+
+def check(inc: IncrementalScanner):
+    tokens, errors = scan(inc.source, inc.fast)
+    assert inc.tokens == tokens
+    assert [str(error) for error in inc.diagnostics] == errors
+    assert inc.offsets == list(TokenBuffer(inc.source).starts)
+
+
+@pytest.mark.parametrize(
+    "start,end,text",
+    [
+        (0, 0, "# header\n"),
+        (0, 5, "class"),
+        (23, 24, "int"),
+        (SOURCE.index("\n"), SOURCE.index("\n"), "\n    t: int = 1"),
+        (len(SOURCE), len(SOURCE), "print(1)\n"),
+        (SOURCE.index("    if"), SOURCE.index("    if"), "    pass\n"),
+        (SOURCE.index("\n\n"), SOURCE.index("\n\n") + 1, ""),
+        (SOURCE.index("return True"), SOURCE.index("return True"), "    "),
+    ],
+)
+def test_edit_matches_full_scan(start, end, text):
+    inc = IncrementalScanner(SOURCE)
+    edit(inc, start, end, text)
+    check(inc)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_random_edits(fast):
+    rng = random.Random(10)
+    for _ in range(100):
+        inc = IncrementalScanner(SOURCE, fast=fast)
+        for _ in range(5):
+            start = rng.randrange(len(inc.source) + 1)
+            end = min(len(inc.source), start + rng.randrange(4))
+            text = "".join(rng.choice(PIECES) for _ in range(rng.randrange(3)))
+            edit(inc, start, end, text)
+            check(inc)
+
+
+def test_edit_relexes_only_the_changed_line():
+    source = "".join(f"value{i} = {i} + {i}\n" for i in range(1000))
+    inc = IncrementalScanner(source)
+    start = source.index("value500")
+
+    edit(inc, start, start + len("value500"), "renamed")
+
+    assert inc.relexed <= 20
+    check(inc)
+
+
+def test_edit_keeps_lines_behind_it():
+    source = "".join(f"value{i} = {i}\n" for i in range(100))
+    inc = IncrementalScanner(source)
+    tail = inc.entries[60]
+
+    edit(inc, source.index("value50"), source.index("value50"), "\n\n")
+
+    assert inc.entries[62] is tail
+    check(inc)
+
+
+def test_invalid_edit_is_applied():
+    inc = IncrementalScanner(SOURCE)
+    typing = '"unclosed'
+    start = SOURCE.index("print")
+
+    edit(inc, start, start, typing)
+    assert inc.source == SOURCE[:start] + typing + SOURCE[start:]
+    assert [str(error) for error in inc.diagnostics] == [
+        "[12, 0]: Unterminated string literal (newline not allowed)"
+    ]
+    check(inc)
+
+    edit(inc, start, start + len(typing), "")
+    assert inc.source == SOURCE
+    assert inc.diagnostics == []
+    check(inc)
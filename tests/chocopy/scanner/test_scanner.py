@@ -1,6 +1,6 @@
 import pytest
 from chocopy.common.errors import LexicalError
-from chocopy.scanner.scanner import Scanner
+from chocopy.scanner.scanner import OPERATOR_TABLE, Scanner, tokenize, tokenize_all
 from chocopy.common.token import TokenType, KEYWORDS
 
 
@@ -360,3 +360,117 @@ def test_comments_and_empty_lines_indentation():
 
     assert TokenType.INDENT in types
     assert types[types.index(TokenType.COLON) + 1] == TokenType.NEW_LINE
+
+
+def test_deep_nesting_dedent_cascade_at_EOF():
+    depth = 40
+    source = "\n".join("    " * level + "if True:" for level in range(depth))
+    source += "\n" + "    " * depth + "pass"
+    scanner = Scanner(source)
+
+    types = []
+    while True:
+        t = scanner.scan_token()
+        types.append(t.tokentyp)
+        if t.tokentyp == TokenType.EOF:
+            break
+
+    assert types.count(TokenType.INDENT) == depth
+    assert types[-depth - 1 :] == [TokenType.DEDENT] * depth + [TokenType.EOF]
+
+
+def test_tokens_are_slotted():
+    token = Scanner("x").scan_token()
+
+    assert not hasattr(token, "__dict__")
+    assert not hasattr(token.position, "__dict__")
+    assert (token.tokentyp, token.lexeme, token.literal) == (TokenType.ID, "x", None)
+    assert (token.position.line, token.position.column) == (1, 1)
+
+
+def test_scanner_is_iterable():
+    types = [t.tokentyp for t in Scanner("if True:\n    pass")]
+
+    assert types == [
+        TokenType.IF,
+        TokenType.TRUE,
+        TokenType.COLON,
+        TokenType.NEW_LINE,
+        TokenType.INDENT,
+        TokenType.PASS,
+        TokenType.DEDENT,
+        TokenType.EOF,
+    ]
+
+
+def test_tokenize_is_lazy():
+    tokens = tokenize("x = 1 $")
+
+    assert next(tokens).lexeme == "x"
+    assert next(tokens).lexeme == "="
+    assert next(tokens).lexeme == "1"
+    with pytest.raises(LexicalError, match="Unknonw token"):
+        next(tokens)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_tokenize_all(fast):
+    source = "def f(x: int) -> int:\n    return x // 2\n"
+    sc = Scanner(source)
+    expected = [sc.scan_token() for _ in range(19)]
+
+    assert tokenize_all(source, fast=fast) == expected
+    assert list(tokenize(source, fast=fast)) == expected
+    assert expected[-1].tokentyp == TokenType.EOF
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_identifier_lexemes_are_interned(fast):
+    source = "count = count + 1\nwhile count:\n    count = 0"
+    tokens = [t for t in Scanner(source, fast=fast) if t.lexeme == "count"]
+    keywords = [t for t in Scanner("while while", fast=fast)][:2]
+
+    assert len(tokens) == 4
+    assert all(t.lexeme is tokens[0].lexeme for t in tokens)
+    assert keywords[0].lexeme is keywords[1].lexeme
+
+
+def test_intern_table_is_shared_across_scanners():
+    names = {}
+    first = Scanner("my_name", names=names).scan_token()
+    second = Scanner("other\nmy_name", names=names, fast=True)
+    second.scan_token()
+    second.scan_token()
+
+    assert second.scan_token().lexeme is first.lexeme
+    assert names.keys() == {"my_name", "other"}
+
+
+def test_operator_table():
+    assert OPERATOR_TABLE["+"] == (TokenType.PLUS, {})
+    assert OPERATOR_TABLE["-"] == (
+        TokenType.MINUS,
+        {">": (TokenType.ARROW, "->")},
+    )
+    assert OPERATOR_TABLE["/"] == (None, {"/": (TokenType.DOUBLE_SLASH, "//")})
+    assert OPERATOR_TABLE["!"] == (None, {"=": (TokenType.NOT_EQUAL, "!=")})
+    assert set(OPERATOR_TABLE) == set("+-*%()[],:.<>=/!")
+
+
+def test_operator_chain():
+    source = "a+b-c*d//e%f<=g>=h==i!=j<k>l"
+    types = [t.tokentyp for t in Scanner(source)][1:-1:2]
+
+    assert types == [
+        TokenType.PLUS,
+        TokenType.MINUS,
+        TokenType.MULTIPLY,
+        TokenType.DOUBLE_SLASH,
+        TokenType.PERCENT,
+        TokenType.LESS_EQUAL,
+        TokenType.GREATER_EQUAL,
+        TokenType.DOUBLE_EQUAL,
+        TokenType.NOT_EQUAL,
+        TokenType.LESS,
+        TokenType.GREATER,
+    ]
@@ -0,0 +1,103 @@
+import io
+
+import pytest
+from chocopy.common.token import TokenType
+from chocopy.scanner.scanner import Scanner
+
+SOURCE = """class A(object):
+    s: str = "café \\t ☃ \\"quoted\\""
+
+    def f(self: "A") -> int:
+        # comment line
+
+
+        return 12345 # trailing comment
+def g(x: int) -> bool:
+    if x >= 1:
+        if x != 2:
+            return True
+    return False
+print(g(A().f()) and not [1, 2][0] != -3)
+"""
+
+
+def scan_all(sc: Scanner):
+    tokens = []
+    try:
+        while True:
+            token = sc.scan_token()
+            tokens.append(token)
+            if token.tokentyp == TokenType.EOF:
+                return tokens
+    except Exception as e:
+        return tokens, type(e).__name__, str(e)
+
+
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_stream_matches_string_source(fast, chunk_size):
+    file = io.BytesIO(SOURCE.encode("utf-8"))
+    sc = Scanner.from_file(file, chunk_size=chunk_size, fast=fast)
+
+    assert scan_all(sc) == scan_all(Scanner(SOURCE, fast=fast))
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "",
+        "x",
+        "x\n",
+        "\n\n\n",
+        "if True:\n    pass\n  pass",
+        '"unterminated\nx',
+        "x = 0123",
+        "y = 1\n\n\n    # comment only at EOF",
+    ],
+)
+def test_stream_edge_cases(source):
+    file = io.BytesIO(source.encode("utf-8"))
+    sc = Scanner.from_file(file, chunk_size=2)
+
+    assert scan_all(sc) == scan_all(Scanner(source))
+
+
+def test_stream_keeps_only_a_window(tmp_path):
+    source = "xy = 1\n" * 10_000
+    path = tmp_path / "big.choco"
+    path.write_text(source)
+
+    sc = Scanner.from_file(path, chunk_size=256)
+    longest = 0
+    while sc.scan_token().tokentyp != TokenType.EOF:
+        longest = max(longest, len(sc.source))
+
+    assert longest < 512
+    assert sc.base + len(sc.source) == len(source)
+    assert sc.closers == []
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_stream_drops_skipped_layout(fast):
+    source = "xy = 1\n" + "# comment\n\n" * 10_000 + "print(xy)\n"
+    sc = Scanner.from_file(io.BytesIO(source.encode()), chunk_size=256, fast=fast)
+    longest = 0
+    newlines = []
+    while True:
+        token = sc.scan_token()
+        longest = max(longest, len(sc.source))
+        if token.tokentyp == TokenType.NEW_LINE:
+            newlines.append(sc.span(token))
+        elif token.tokentyp == TokenType.EOF:
+            break
+
+    assert longest < 1024
+    end = len(source)
+    assert newlines == [(6, 7), (end - 1, end)]
+
+
+def test_stream_from_empty_path(tmp_path):
+    path = tmp_path / "empty.choco"
+    path.write_bytes(b"")
+
+    assert Scanner.from_file(path).scan_token().tokentyp == TokenType.EOF
@@ -0,0 +1,205 @@
+import pytest
+from chocopy.common.errors import SemanticError
+from chocopy.parser.node import BinaryExpr
+from chocopy.parser.parser import Parser
+from chocopy.scanner.scanner import Scanner
+from chocopy.semantic.checker import Checker
+from chocopy.semantic.scope import Scope
+from chocopy.semantic.types import BOOL, INT, STR, ListValueType
+
+VALID = """class Animal(object):
+    name: str = ""
+    legs: int = 4
+    def __init__(self: "Animal") -> object:
+        self.name = "animal"
+    def speak(self: "Animal", times: int) -> str:
+        return self.name if times > 0 else ""
+
+class Bird(Animal):
+    wings: bool = True
+    def speak(self: "Bird", times: int) -> str:
+        return "tweet"
+
+pets: [Animal] = None
+count: int = 0
+
+def total(xs: [int]) -> int:
+    sum: int = 0
+    x: int = 0
+    def bump() -> object:
+        nonlocal sum
+        global count
+        sum = sum + 1
+        count = count + 1
+    for x in xs:
+        sum = sum + x
+        bump()
+    return sum
+
+def sign(n: int) -> int:
+    if n < 0:
+        return -1
+    elif n == 0:
+        return 0
+    else:
+        return 1
+
+pets = [Animal(), Bird()]
+pets[0].legs = total([1, 2, len(pets)])
+print(pets[1].speak(sign(-3)))
+while not (pets[0].name == "") and count > 0:
+    count = count - 1
+print(input() + "!")
+"""
+
+
+def check(source: str, recover: bool = False) -> Checker:
+    checker = Checker(recover=recover)
+    checker.check(Parser(Scanner(source)).parse())
+    return checker
+
+
+def test_valid_program():
+    assert check(VALID).diagnostics == []
+
+
+def test_expression_types():
+    program = Parser(Scanner("ab: [int] = None\nprint(ab[0] + 1 > 2)\n")).parse()
+    checker = Checker()
+    checker.check(program)
+
+    call = program.statements[0].expr
+    comparison = call.args[0]
+    assert isinstance(comparison, BinaryExpr)
+    assert checker.types[comparison] == BOOL
+    assert checker.types[comparison.left] == INT
+    assert checker.types[comparison.left.left.list_obj] == ListValueType(INT)
+
+
+ERRORS = [
+    ("ab: int = True\n", "[1, 11]: Expected type `int`; got type `bool`"),
+    (
+        "ab: Foo = None\n",
+        "[1, 5]: Invalid type annotation; there is no class named: Foo",
+    ),
+    (
+        "ab: int = 1\nab: int = 2\n",
+        "Duplicate declaration of identifier in same scope: ab",
+    ),
+    ("class Ab(Cd):\n    pass\n", "Super-class not defined: Cd"),
+    ("class Ab(int):\n    pass\n", "Cannot extend special class: int"),
+    ("class Ab(print):\n    pass\n", "Super-class must be a class: print"),
+    (
+        "class Ab(object):\n    xy: int = 1\nclass Cd(Ab):\n    xy: int = 2\n",
+        "Cannot re-define attribute: xy",
+    ),
+    (
+        'class Ab(object):\n    def f(self: "Ab") -> int:\n        return 1\n'
+        'class Cd(Ab):\n    def f(self: "Cd") -> bool:\n        return True\n',
+        "Method overridden with different type signature: f",
+    ),
+    (
+        "class Ab(object):\n    def f(xy: int) -> int:\n        return 1\n",
+        "First parameter of the following method must be of the enclosing class: f",
+    ),
+    (
+        "def f() -> int:\n    if True:\n        return 1\n",
+        "All paths in this function/method must have a return statement: f",
+    ),
+    ("def f(int: int) -> object:\n    pass\n", "Cannot shadow class name: int"),
+    ("def f() -> object:\n    global ab\n", "Not a global variable: ab"),
+    ("def f() -> object:\n    nonlocal ab\n", "Not a nonlocal variable: ab"),
+    (
+        "ab: int = 1\ndef f() -> object:\n    ab = 2\n",
+        "Cannot assign to variable that is not explicitly declared in this scope: ab",
+    ),
+    ("return 1\n", "Return statement cannot appear at the top level"),
+    ("def f() -> int:\n    return\n", "Expected type `int`; got `None`"),
+    ("print(ab)\n", "[1, 7]: Not a variable: ab"),
+    ("print(1 + True)\n", "Cannot apply operator `+` on types `int` and `bool`"),
+    ("print(not 1)\n", "Cannot apply operator `not` on type `int`"),
+    ("print(1 is 1)\n", "Cannot apply operator `is` on types `int` and `int`"),
+    ("if 1:\n    pass\n", "Condition expression cannot be of type `int`"),
+    ("print([1][True])\n", "Index is of non-integer type `bool`"),
+    ("print(1[0])\n", "Cannot index into type `int`"),
+    ('ab: str = "x"\nab[0] = "y"\n', "`str` is not a list type"),
+    ("for ab in 1:\n    pass\n", "Cannot iterate over value of type `int`"),
+    ("print(1, 2)\n", "Expected 1 arguments; got 2"),
+    (
+        "def f(xy: int) -> object:\n    pass\nf(True)\n",
+        "Expected type `int`; got type `bool` in parameter 0",
+    ),
+    ("ab: int = 1\nab()\n", "Not a function or class: ab"),
+    ("print(object().xy)\n", "There is no attribute named `xy` in class `object`"),
+    ("print(object().xy())\n", "There is no method named `xy` in class `object`"),
+]
+
+
+@pytest.mark.parametrize("source, message", ERRORS)
+def test_errors(source: str, message: str):
+    with pytest.raises(SemanticError) as info:
+        check(source)
+
+    assert message in str(info.value)
+
+
+def test_methods_see_classes_declared_later():
+    source = (
+        "class Aa(object):\n"
+        '    def f(self: "Aa", bb: "Bb") -> int:\n'
+        "        return bb.g() + bb.xx\n"
+        "class Bb(object):\n"
+        "    xx: int = 1\n"
+        '    def g(self: "Bb") -> int:\n'
+        "        return self.xx\n"
+        "print(Aa().f(Bb()))\n"
+    )
+
+    assert check(source).diagnostics == []
+
+
+def test_recover_collects_all_errors():
+    source = "ab: int = True\nprint(xy)\nif 1:\n    ab = ab + True\n"
+    checker = check(source, recover=True)
+
+    assert [str(error) for error in checker.diagnostics] == [
+        "[1, 11]: Expected type `int`; got type `bool`",
+        "[2, 6]: Not a variable: xy",
+        "[3, 3]: Condition expression cannot be of type `int`",
+        "[4, 12]: Cannot apply operator `+` on types `int` and `bool`",
+    ]
+
+
+def test_list_joins():
+    source = (
+        "class Ab(object):\n    pass\nclass Cd(Ab):\n    pass\n"
+        "class Ef(Ab):\n    pass\n"
+        "xs: [Ab] = None\nys: [object] = None\n"
+        "xs = [Cd(), Ef(), None]\nys = [1, Ab()]\nxs = []\n"
+    )
+
+    assert check(source).diagnostics == []
+    with pytest.raises(SemanticError, match="got type `\\[object\\]`"):
+        check(source + "xs = [1, Ab()]\n")
+
+
+def test_deep_nesting():
+    depth = 3000
+    blocks = "".join("    " * level + "while True:\n" for level in range(depth))
+    expr = "-" * depth + "1"
+    source = f"ab: int = 0\n{blocks}{'    ' * depth}ab = {expr}\n"
+
+    assert check(source).diagnostics == []
+
+
+def test_scope_chain():
+    outer = Scope()
+    outer.declare("ab", INT)
+    inner = Scope(outer, returns=STR)
+
+    assert inner.lookup("ab") == INT
+    assert inner.declare("ab", STR)
+    assert not inner.declare("ab", STR)
+    assert inner.lookup("ab") == STR
+    assert inner.lookup("cd") is None
+    assert inner.globals() is outer
@@ -0,0 +1,215 @@
+import pytest
+from chocopy.parser.parser import Parser
+from chocopy.scanner.scanner import Scanner
+from chocopy.semantic.checker import Checker
+from chocopy.semantic.incremental import IncrementalChecker, Report, summarize
+
+SOURCE = """class Shape(object):
+    size: int = 1
+    def area(self: "Shape") -> int:
+        return self.size * self.size
+
+class Square(Shape):
+    def grow(self: "Square") -> object:
+        self.size = self.size + 1
+
+class Label(object):
+    text: str = ""
+
+first: Square = None
+count: int = 0
+
+def measure(shape: Shape) -> int:
+    return shape.area() + count
+
+def describe(label: Label) -> str:
+    return label.text
+
+def largest(xs: [Square]) -> int:
+    best: int = 0
+    item: Square = None
+    for item in xs:
+        if measure(item) > best:
+            best = measure(item)
+    return best
+
+first = Square()
+print(largest([first, Square()]))
+"""
+
+
+def parse(source: str):
+    return Parser(Scanner(source)).parse()
+
+
+def full(source: str) -> list[str]:
+    checker = Checker(recover=True)
+    checker.check(parse(source))
+    errors = sorted(checker.diagnostics, key=lambda e: (e.pos.line, e.pos.column))
+    return [str(error) for error in errors]
+
+
+class Session:
+    """An IncrementalChecker fed one version of SOURCE after another, with
+    or without the text the program was parsed from."""
+
+    def __init__(self, with_source: bool):
+        self.checker = IncrementalChecker()
+        self.with_source = with_source
+
+    def check(self, source: str) -> Report:
+        text = source if self.with_source else None
+        report = self.checker.check(parse(source), text)
+        assert [str(error) for error in report.diagnostics] == full(source)
+        return report
+
+
+@pytest.fixture(params=[False, True], ids=["nodes", "text"])
+def session(request) -> Session:
+    return Session(request.param)
+
+
+def test_first_check_checks_everything(session: Session):
+    report = session.check(SOURCE)
+    assert report.checked == [
+        "Shape", "Square", "Label", "first", "count", "measure", "describe",
+        "largest",
+    ]  # fmt: skip
+    assert report.skipped == 0
+    assert report.statements_checked
+    assert report.diagnostics == []
+
+
+def test_unchanged_program_is_skipped(session: Session):
+    session.check(SOURCE)
+    report = session.check(SOURCE)
+    assert (report.checked, report.skipped) == ([], 8)
+    assert not report.statements_checked
+
+
+def test_body_edit_checks_only_that_declaration(session: Session):
+    session.check(SOURCE)
+    edited = SOURCE.replace("return label.text", "return label.text + 1")
+    report = session.check(edited)
+    assert (report.checked, report.skipped) == (["describe"], 7)
+    assert [error.message for error in report.diagnostics] == [
+        "Cannot apply operator `+` on types `str` and `int`",
+        "Expected type `str`; got type `int`",
+    ]
+
+    # Fixing it again removes the error without touching anything else.
+    report = session.check(SOURCE)
+    assert (report.checked, report.diagnostics) == (["describe"], [])
+
+
+def test_interface_edit_checks_dependents(session: Session):
+    session.check(SOURCE)
+    # Square and everything that uses it see the change through Shape.
+    edited = SOURCE.replace("size: int = 1", "size: bool = True")
+    report = session.check(edited)
+    assert report.checked == ["Shape", "Square", "first", "measure", "largest"]
+    assert report.skipped == 3
+    assert report.statements_checked
+    assert len(report.diagnostics) == 3
+
+
+def test_signature_edit_checks_callers(session: Session):
+    session.check(SOURCE)
+    edited = SOURCE.replace("(shape: Shape) -> int", "(shape: Shape) -> bool")
+    edited = edited.replace("shape.area() + count", "shape.area() > count")
+    report = session.check(edited)
+    assert report.checked == ["measure", "largest"]
+    assert len(report.diagnostics) == 2
+
+
+def test_removed_and_added_declarations(session: Session):
+    session.check(SOURCE)
+    without = SOURCE.replace('class Label(object):\n    text: str = ""\n\n', "")
+    report = session.check(without)
+    assert report.checked == ["describe"]
+    assert len(report.diagnostics) == 3
+
+    report = session.check(SOURCE)
+    assert report.checked == ["Label", "describe"]
+    assert report.diagnostics == []
+
+
+def test_errors_move_with_their_declarations(session: Session):
+    broken = SOURCE.replace("return label.text", "return label.size")
+    session.check(broken)
+    # Lines added above leave describe unchanged; its error is reused.
+    moved = broken.replace("count: int = 0\n", "count: int = 0\nother: int = 1\n\n")
+    report = session.check(moved)
+    assert report.checked == ["other"]
+    assert [error.pos.line for error in report.diagnostics] == [22, 22]
+
+    # Lines added inside it are a change, though, since its error moves.
+    spaced = moved.replace("-> str:\n", "-> str:\n\n")
+    assert session.check(spaced).checked == ["describe"]
+
+
+def test_summarize_ignores_where_code_starts():
+    program = parse("pass\nab = 1\nprint(ab)\n")
+    moved = parse("pass\npass\n\nab = 1\nprint(ab)\n")
+    digest, names = summarize([program.statements[1:]], 2)
+    assert digest == summarize([moved.statements[2:]], 4)[0]
+    assert digest != summarize([moved.statements[2:]], 3)[0]
+    assert names == {"ab", "print"}
+
+
+def test_reused_classes_follow_their_superclass(session: Session):
+    session.check(SOURCE)
+    edited = SOURCE.replace("self.size * self.size", "self.size + self.size")
+    report = session.check(edited)
+    assert report.checked == ["Shape"]
+
+    # Square is reused but hangs off the Shape that was checked again.
+    hierarchy = session.checker.checker.hierarchy
+    square = hierarchy.classes["Square"]
+    assert square.super_class is hierarchy.classes["Shape"]
+    assert hierarchy.is_subtype(square.type, hierarchy.classes["Shape"].type)
+
+
+def test_reordered_declarations(session: Session):
+    classes = [
+        "class C(object):\n    yy: int = 0\n",
+        "class B(A):\n    zz: int = 0\n",
+        "class A(object):\n    xx: int = 1\n",
+    ]
+    rest = "bb: B = None\nprint(bb.xx)\n"
+    before = "\n".join(classes) + "\n" + rest
+    after = "\n".join([classes[0], classes[2], classes[1]]) + "\n" + rest
+    assert [error.message for error in session.check(before).diagnostics] == [
+        "Super-class not defined: A",
+        "There is no attribute named `xx` in class `B`",
+    ]
+
+    # Nothing but the order changed, which B depends on.
+    report = session.check(after)
+    assert report.checked == ["B", "bb"]
+    assert report.statements_checked
+    assert report.diagnostics == []
+
+    assert len(session.check(before).diagnostics) == 2
+
+
+def test_methods_see_reused_classes_declared_later(session: Session):
+    source = (
+        "class Aa(object):\n"
+        '    def f(self: "Aa", bb: "Bb") -> int:\n'
+        "        return bb.g() + bb.xx\n"
+        "class Bb(object):\n"
+        "    xx: int = 1\n"
+        '    def g(self: "Bb") -> int:\n'
+        "        return self.xx\n"
+    )
+    assert session.check(source).diagnostics == []
+
+    # Bb is reused, with the members it had once declared, as in a full check.
+    report = session.check(source.replace("bb.xx", "bb.yy"))
+    assert report.checked == ["Aa"]
+    assert [error.message for error in report.diagnostics] == [
+        "Cannot apply operator `+` on types `int` and `object`",
+        "There is no attribute named `yy` in class `Bb`",
+    ]
+    assert session.check(source).diagnostics == []
@@ -0,0 +1,108 @@
+import pytest
+from chocopy.semantic.types import (
+    BOOL,
+    EMPTY,
+    INT,
+    JOIN_CACHE_SIZE,
+    NONE,
+    OBJECT,
+    STR,
+    ClassInfo,
+    ClassValueType,
+    Hierarchy,
+    ListValueType,
+)
+
+
+def tree() -> Hierarchy:
+    """object > A > B > C and A > D > E, plus F directly under object."""
+    hierarchy = Hierarchy()
+    parents = {"A": "object", "B": "A", "C": "B", "D": "A", "E": "D", "F": "object"}
+    for name, base in parents.items():
+        hierarchy.add(ClassInfo(name, hierarchy.classes[base]))
+    return hierarchy
+
+
+def t(name: str) -> ClassValueType:
+    return ClassValueType(name)
+
+
+@pytest.mark.parametrize(
+    "sub, sup, expected",
+    [
+        ("C", "A", True),
+        ("C", "B", True),
+        ("E", "A", True),
+        ("A", "C", False),
+        ("C", "D", False),
+        ("E", "B", False),
+        ("F", "A", False),
+        ("int", "object", True),
+        ("bool", "int", False),
+        ("Missing", "A", False),
+        ("A", "Missing", False),
+    ],
+)
+def test_is_subtype(sub, sup, expected):
+    assert tree().is_subtype(t(sub), t(sup)) is expected
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        ("C", "E", "A"),
+        ("E", "C", "A"),
+        ("C", "B", "B"),
+        ("B", "D", "A"),
+        ("C", "F", "object"),
+        ("int", "str", "object"),
+        ("C", "Missing", "object"),
+    ],
+)
+def test_join_classes(a, b, expected):
+    assert tree().join(t(a), t(b)) == t(expected)
+
+
+def test_join_special_types():
+    hierarchy = tree()
+    ints = ListValueType(INT)
+    assert hierarchy.join(NONE, t("C")) == t("C")
+    assert hierarchy.join(INT, NONE) == OBJECT
+    assert hierarchy.join(EMPTY, ints) == ints
+    assert hierarchy.join(ints, ListValueType(BOOL)) == OBJECT
+    assert hierarchy.join(ListValueType(NONE), ListValueType(t("A"))) == (
+        ListValueType(t("A"))
+    )
+    assert hierarchy.join(STR, STR) == STR
+
+
+def test_deep_chain():
+    hierarchy = Hierarchy()
+    base = hierarchy.classes["object"]
+    for i in range(5000):
+        base = ClassInfo(f"C{i}", base)
+        hierarchy.add(base)
+        if i % 100 == 0:
+            hierarchy.add(ClassInfo(f"S{i}", base))
+
+    assert hierarchy.is_subtype(t("C4999"), t("C0"))
+    assert not hierarchy.is_subtype(t("C0"), t("C4999"))
+    assert hierarchy.is_subtype(t("S4900"), t("C17"))
+    assert not hierarchy.is_subtype(t("S4900"), t("C4901"))
+    assert hierarchy.join(t("S4900"), t("C4999")) == t("C4900")
+    assert hierarchy.join(t("S300"), t("S4200")) == t("C300")
+    assert hierarchy.join(t("S0"), t("C0")) == t("C0")
+
+
+def test_join_memo_is_bounded_and_cleared_by_add():
+    hierarchy = tree()
+    hierarchy.join(t("C"), t("E"))
+    hierarchy.join(t("C"), t("E"))
+    info = hierarchy.join.cache_info()
+    assert (info.hits, info.misses, info.maxsize) == (1, 1, JOIN_CACHE_SIZE)
+
+    # A new class can change a join that was already worked out.
+    hierarchy.add(ClassInfo("G", hierarchy.classes["A"]))
+    assert hierarchy.join.cache_info().currsize == 0
+    assert hierarchy.join(t("G"), t("C")) == t("A")
+    assert hierarchy.is_subtype(t("G"), t("A"))
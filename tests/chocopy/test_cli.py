@@ -0,0 +1,161 @@
+import io
+import pstats
+from pathlib import Path
+
+import pytest
+from chocopy.cli import main
+
+SOURCE = "def f(ab: int) -> int:\n    return ab * 2\n\nprint(f(21))\n"
+BROKEN = "ab = = 1\nprint(ab)\nab = 1 $\n"
+
+
+def run(*argv: str) -> tuple[int, str, str]:
+    out = io.StringIO()
+    err = io.StringIO()
+    status = main(list(argv), out, err)
+    return status, out.getvalue(), err.getvalue()
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "ok.choco"
+    path.write_text(SOURCE)
+    return str(path)
+
+
+@pytest.fixture
+def broken(tmp_path):
+    path = tmp_path / "broken.choco"
+    path.write_text(BROKEN)
+    return str(path)
+
+
+def test_no_output_without_dumps(source):
+    assert run(source) == (0, "", "")
+
+
+def test_ast(source):
+    status, out, _ = run("--ast", source)
+
+    assert status == 0
+    assert out.splitlines()[:4] == [
+        "Program [1, 1]",
+        "  declarations:",
+        "    FunctionDefinition [1, 1] name='f'",
+        "      params:",
+    ]
+    assert "          value: BinaryExpr [2, 14] operator='*'" in out
+    assert "      var_defs: []" in out
+
+
+def test_tokens(source):
+    for argv in (["--tokens"], ["--tokens", "--time-phases"]):
+        status, out, _ = run(*argv, source)
+
+        assert status == 0
+        assert out.splitlines()[:2] == ["1:1\tDEF\t'def'", "1:5\tID\t'f'"]
+        assert out.splitlines()[-1].split("\t")[1] == "EOF"
+
+
+def test_errors(source, broken):
+    status, out, err = run("--ast", broken, source)
+
+    assert status == 1
+    assert err == f"{broken}: [1, 6]: Expected cexpr found TokenType.EQUAL\n"
+    assert out.startswith("Program [1, 1]")
+
+
+@pytest.mark.parametrize("phases", [[], ["--time-phases"]])
+def test_recover(broken, phases):
+    status, _, err = run("--recover", *phases, broken)
+
+    assert status == 1
+    assert err.splitlines()[:2] == [
+        f"{broken}: [1, 6]: Expected cexpr found TokenType.EQUAL",
+        f"{broken}: [3, 7]: Unknonw token found",
+    ]
+
+
+@pytest.mark.parametrize("engine", ["closures", "tree"])
+def test_run(source, tmp_path, engine):
+    assert run("--run", "--engine", engine, source) == (0, "42\n", "")
+
+    path = tmp_path / "fails.choco"
+    path.write_text("print(1)\nprint(1 // 0)\nprint(ab)\n")
+    status, out, err = run("--run", "--engine", engine, str(path))
+    assert (status, out) == (1, "")
+    assert err == f"{path}: [3, 6]: Not a variable: ab\n"
+
+    path.write_text("print(1)\nprint(1 // 0)\n")
+    status, out, err = run("--run", "--engine", engine, str(path))
+    assert (status, out) == (1, "1\n")
+    assert err == f"{path}: [2, 8]: Division by zero\n"
+
+
+def test_missing_file(tmp_path):
+    status, _, err = run(str(tmp_path / "missing.choco"))
+
+    assert status == 1
+    assert err.startswith("chocopy: [Errno 2]")
+
+
+@pytest.mark.parametrize("mode", [[], ["--tokens"], ["--time-phases"]])
+def test_undecodable_file(source, tmp_path, mode):
+    path = tmp_path / "binary.choco"
+    path.write_bytes(b"ab = 1\n\xff\n")
+    status, _, err = run(*mode, str(path), source)
+
+    assert status == 1
+    assert err.startswith(f"{path}: 'utf-8' codec can't decode byte 0xff")
+    # One line for the file, and the phase report; the next file is fine.
+    assert err.count("\n") == 1 + 5 * ("--time-phases" in mode)
+
+
+def test_time_phases(source):
+    status, _, err = run("--time-phases", source, source)
+
+    assert status == 0
+    lines = err.splitlines()
+    assert lines[0].split() == ["phase", "ms", "count", "per", "second"]
+    counts = {line.split()[0]: int(line.split()[2]) for line in lines[1:4]}
+    assert counts == {"read": 2 * len(SOURCE), "scan": 2 * 27, "parse": 2 * 15}
+    assert lines[4].startswith("total")
+
+
+def test_profile(source, tmp_path):
+    status, _, err = run("--profile", "--profile-limit", "3", source)
+
+    assert status == 0
+    assert "function calls" in err
+    assert "parser.py" in err
+
+    stats = tmp_path / "parse.prof"
+    assert run(f"--profile={stats}", source) == (0, "", "")
+    assert pstats.Stats(str(stats)).total_calls > 0
+
+
+@pytest.mark.parametrize(
+    "engine, function",
+    [
+        ("closures", ("compiler.py", "call_one")),
+        ("tree", ("interpreter.py", "call_function")),
+    ],
+)
+def test_profile_run(source, tmp_path, engine, function):
+    stats = tmp_path / "run.prof"
+    status, out, _ = run("--run", f"--engine={engine}", f"--profile={stats}", source)
+
+    assert (status, out) == (0, "42\n")
+    # The program runs on a thread of its own, which is profiled too.
+    profiled = pstats.Stats(str(stats)).stats
+    assert function in {(Path(path).name, name) for path, _, name in profiled}
+
+
+def test_deep_ast(tmp_path):
+    path = tmp_path / "deep.choco"
+    path.write_text("-" * 5000 + "ab\n")
+
+    status, out, _ = run("--ast", str(path))
+
+    assert status == 0
+    assert out.count("UnaryExpr") == 5000